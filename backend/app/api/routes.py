@@ -1,14 +1,31 @@
 from fastapi import APIRouter, UploadFile, File, Form, HTTPException
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
 from app.models.schemas import AnalysisResponse, HealthResponse, MissingSkill, KeywordSuggestion, ResumeSection
 from app.services.resume_parser import ResumeParser
 from app.services.matcher import ATSMatcher
+from app.services.scoring_metrics import scoring_stats
+from core.llm_cache import llm_cache_stats, transcript_cache_stats
+from core.embedding_store import embedding_store_stats
+from core.singleflight import singleflight_stats
+from core.routing import routing_stats
+from core.rate_limit import rate_limit_stats
+import json
 import logging
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter()
 resume_parser = ResumeParser()
-ats_matcher = ATSMatcher()
+_ats_matcher = None
+
+
+def get_ats_matcher() -> ATSMatcher:
+    """Matcher built on first request rather than at import"""
+    global _ats_matcher
+    if _ats_matcher is None:
+        _ats_matcher = ATSMatcher()
+    return _ats_matcher
 
 
 @router.get("/health", response_model=HealthResponse)
@@ -20,6 +37,88 @@ async def health_check():
     )
 
 
+@router.get("/metrics")
+async def metrics():
+    """Cache, provider and ATS scoring counters for monitoring"""
+    return {
+        "llm_cache": llm_cache_stats(),
+        "transcript_cache": transcript_cache_stats(),
+        "embedding_store": embedding_store_stats(),
+        "singleflight": singleflight_stats(),
+        "routing": routing_stats(),
+        "rate_limits": rate_limit_stats(),
+        "ats_scoring": scoring_stats(),
+    }
+
+
+def _validate_request(resume: UploadFile, file_content: bytes, job_description: str):
+    """Raise HTTPException for unsupported, empty or underspecified input"""
+    if not resume.filename:
+        raise HTTPException(status_code=400, detail="No filename provided")
+
+    allowed_extensions = ['.pdf', '.docx']
+    file_ext = '.' + resume.filename.split('.')[-1].lower()
+
+    if file_ext not in allowed_extensions:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unsupported file format. Allowed formats: {', '.join(allowed_extensions)}"
+        )
+
+    if len(file_content) == 0:
+        raise HTTPException(status_code=400, detail="Empty file uploaded")
+
+    # Validate job description
+    if not job_description or len(job_description.strip()) < 50:
+        raise HTTPException(
+            status_code=400,
+            detail="Job description is too short. Please provide a detailed job description."
+        )
+
+
+async def _parse_resume_text(file_content: bytes, filename: str) -> str:
+    """Extract and clean resume text off the event loop"""
+    logger.info(f"Parsing resume: {filename}")
+    resume_text = await run_in_threadpool(resume_parser.parse_resume, file_content, filename)
+    resume_text = resume_parser.clean_text(resume_text)
+
+    if not resume_text:
+        raise HTTPException(
+            status_code=400,
+            detail="Could not extract text from resume. Please ensure the file is not corrupted."
+        )
+    return resume_text
+
+
+def _build_analysis_response(analysis_result: dict) -> AnalysisResponse:
+    """Convert the matcher result dict to the response model"""
+    return AnalysisResponse(
+        ats_score=float(analysis_result.get("ats_score", 0)),
+        missing_skills=[
+            MissingSkill(**skill) for skill in analysis_result.get("missing_skills", [])
+        ],
+        keyword_suggestions=[
+            KeywordSuggestion(**kw) for kw in analysis_result.get("keyword_suggestions", [])
+        ],
+        matched_skills=analysis_result.get("matched_skills", []),
+        resume_improvements=[
+            ResumeSection(**section) for section in analysis_result.get("resume_improvements", [])
+        ],
+        overall_feedback=analysis_result.get("overall_feedback", ""),
+        match_summary=analysis_result.get("match_summary", {}),
+        enhanced_resume=analysis_result.get("enhanced_resume"),
+        skill_comparison=analysis_result.get("skill_comparison"),
+        enhanced_ats_score=analysis_result.get("enhanced_ats_score"),
+        ats_keywords=analysis_result.get("ats_keywords"),
+        key_factors=analysis_result.get("key_factors")
+    )
+
+
+def _sse(event: str, data) -> str:
+    """Format one Server-Sent Event"""
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
 @router.post("/analyze", response_model=AnalysisResponse)
 async def analyze_resume(
     resume: UploadFile = File(..., description="Resume file (PDF or DOCX)"),
@@ -36,68 +135,19 @@ async def analyze_resume(
     - Comprehensive ATS analysis including score, missing skills, and suggestions
     """
     try:
-        # Validate file type
-        if not resume.filename:
-            raise HTTPException(status_code=400, detail="No filename provided")
-
-        allowed_extensions = ['.pdf', '.docx']
-        file_ext = '.' + resume.filename.split('.')[-1].lower()
-
-        if file_ext not in allowed_extensions:
-            raise HTTPException(
-                status_code=400,
-                detail=f"Unsupported file format. Allowed formats: {', '.join(allowed_extensions)}"
-            )
-
         # Read file content
         file_content = await resume.read()
-
-        if len(file_content) == 0:
-            raise HTTPException(status_code=400, detail="Empty file uploaded")
+        _validate_request(resume, file_content, job_description)
 
         # Parse resume
-        logger.info(f"Parsing resume: {resume.filename}")
-        resume_text = resume_parser.parse_resume(file_content, resume.filename)
-        resume_text = resume_parser.clean_text(resume_text)
-
-        if not resume_text:
-            raise HTTPException(
-                status_code=400,
-                detail="Could not extract text from resume. Please ensure the file is not corrupted."
-            )
-
-        # Validate job description
-        if not job_description or len(job_description.strip()) < 50:
-            raise HTTPException(
-                status_code=400,
-                detail="Job description is too short. Please provide a detailed job description."
-            )
+        resume_text = await _parse_resume_text(file_content, resume.filename)
 
         # Perform ATS analysis
         logger.info("Performing ATS analysis")
-        analysis_result = ats_matcher.analyze_match(resume_text, job_description)
+        analysis_result = await get_ats_matcher().aanalyze_match(resume_text, job_description)
 
         # Convert to response model
-        response = AnalysisResponse(
-            ats_score=float(analysis_result.get("ats_score", 0)),
-            missing_skills=[
-                MissingSkill(**skill) for skill in analysis_result.get("missing_skills", [])
-            ],
-            keyword_suggestions=[
-                KeywordSuggestion(**kw) for kw in analysis_result.get("keyword_suggestions", [])
-            ],
-            matched_skills=analysis_result.get("matched_skills", []),
-            resume_improvements=[
-                ResumeSection(**section) for section in analysis_result.get("resume_improvements", [])
-            ],
-            overall_feedback=analysis_result.get("overall_feedback", ""),
-            match_summary=analysis_result.get("match_summary", {}),
-            enhanced_resume=analysis_result.get("enhanced_resume"),
-            skill_comparison=analysis_result.get("skill_comparison"),
-            enhanced_ats_score=analysis_result.get("enhanced_ats_score"),
-            ats_keywords=analysis_result.get("ats_keywords"),
-            key_factors=analysis_result.get("key_factors")
-        )
+        response = _build_analysis_response(analysis_result)
 
         logger.info(f"Analysis completed. ATS Score: {response.ats_score}")
         return response
@@ -110,3 +160,50 @@ async def analyze_resume(
             status_code=500,
             detail=f"An error occurred during analysis: {str(e)}"
         )
+
+
+@router.post("/analyze/stream")
+async def analyze_resume_stream(
+    resume: UploadFile = File(..., description="Resume file (PDF or DOCX)"),
+    job_description: str = Form(..., description="Job description text")
+):
+    """
+    Analyze resume against job description, streaming progress as Server-Sent Events
+
+    Events:
+    - stage: pipeline step started (parsing, keyword_extraction, factors, generation,
+      regex_fix, scoring with attempt number, rewrite, skill_comparison, final_scoring, analysis)
+    - token: enhanced resume text delta for the current generation stage
+    - score: ATS score report for a scoring attempt
+    - result: the same payload /analyze returns
+    - error: analysis failed; carries a detail message
+    """
+    file_content = await resume.read()
+    _validate_request(resume, file_content, job_description)
+    filename = resume.filename
+
+    async def event_stream():
+        try:
+            yield _sse("stage", {"stage": "parsing"})
+            resume_text = await _parse_resume_text(file_content, filename)
+
+            logger.info("Performing streaming ATS analysis")
+            async for event in get_ats_matcher().astream_analysis(resume_text, job_description):
+                if event["event"] == "result":
+                    response = _build_analysis_response(event["data"])
+                    logger.info(f"Analysis completed. ATS Score: {response.ats_score}")
+                    yield _sse("result", response.model_dump())
+                else:
+                    yield _sse(event["event"], event["data"])
+
+        except HTTPException as e:
+            yield _sse("error", {"detail": e.detail})
+        except Exception as e:
+            logger.error(f"Error during streaming analysis: {str(e)}")
+            yield _sse("error", {"detail": f"An error occurred during analysis: {str(e)}"})
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
@@ -1,6 +1,9 @@
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from app.api.routes import router
+from core.providers import aclose_providers
+from core.model import preload_STT_model
+import asyncio
 import logging
 import os
 from dotenv import load_dotenv
@@ -84,11 +87,15 @@ async def startup_event():
     else:
         logger.info("✓ OpenAI API key configured")
 
+    # Warm the Whisper model when WHISPER_PRELOAD is set
+    await asyncio.to_thread(preload_STT_model)
+
 
 @app.on_event("shutdown")
 async def shutdown_event():
     """Shutdown event handler"""
     logger.info("Shutting down ATS Resume Matcher API")
+    await aclose_providers()
 
 
 @app.get("/")
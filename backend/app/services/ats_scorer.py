@@ -1,8 +1,14 @@
+import os
 import re
-from typing import List, Dict, Callable
+import time
+import asyncio
+from typing import List, Dict, Callable, Awaitable, Optional
 import numpy as np
-from sklearn.metrics.pairwise import cosine_similarity
 
+from app.services.keyword_matcher import get_keyword_matcher
+from app.services.lexical_relevance import get_jd_term_index
+from app.services.resume_sections import SECTION_ALIASES, section_text, segment_resume
+from app.services.scoring_metrics import ScoreTimer
 
 
 class ATSScorer:
@@ -25,79 +31,54 @@ class ATSScorer:
     # -----------------------------
     # Section detection patterns
     # -----------------------------
-    SECTION_ALIASES = {
-        "SUMMARY": [
-            "summary", "professional summary", "profile", "about"
-        ],
-        "SKILLS": [
-            "skills", "technical skills", "core competencies", "expertise"
-        ],
-        "PROFESSIONAL EXPERIENCE": [
-            "professional experience", "experience", "work experience",
-            "employment history", "career history"
-        ],
-        "EDUCATION": [
-            "education", "academic background"
-        ],
-        "PROJECTS": [
-            "projects", "project experience"
-        ],
-        "CERTIFICATIONS": [
-            "certifications", "licenses"
-        ],
-    }
+    SECTION_ALIASES = SECTION_ALIASES
 
     # -----------------------------
     # Keyword Matching
     # -----------------------------
-    def keyword_match_score(self, resume: str, keywords: List[str]) -> float:
-        if not keywords:
-            return 0.0
-
-        # Flatten keywords if nested lists are present
+    @staticmethod
+    def flat_keyword_list(keywords) -> List[str]:
+        """Flatten keywords if nested lists are present."""
         flat_keywords = []
         for kw in keywords:
             if isinstance(kw, list):
                 flat_keywords.extend(kw)
             elif isinstance(kw, str):
                 flat_keywords.append(kw)
-        
+        return flat_keywords
+
+    def keyword_match_score(self, resume: str, keywords: List[str]) -> float:
+        if not keywords:
+            return 0.0
+
+        flat_keywords = self.flat_keyword_list(keywords)
         if not flat_keywords:
             return 0.0
 
-        hits = sum(
-            1 for kw in flat_keywords
-            if isinstance(kw, str) and re.search(rf"\b{re.escape(kw)}\b", resume, re.I)
-        )
+        found = get_keyword_matcher(flat_keywords).hits(resume)
+        hits = sum(1 for kw in flat_keywords if kw in found)
         return hits / len(flat_keywords)
 
     # -----------------------------
     # Dynamic Section Detection
     # -----------------------------
     def detect_sections(self, resume: str) -> Dict[str, bool]:
-        detected = {}
-
-        for canonical, aliases in self.SECTION_ALIASES.items():
-            detected[canonical] = any(
-                re.search(rf"\b{re.escape(alias)}\b", resume, re.I)
-                for alias in aliases
-            )
-
-        return detected
+        mentions = segment_resume(resume)["mentions"]
+        return {canonical: canonical in mentions for canonical in self.SECTION_ALIASES}
 
     def structure_score(self, resume: str) -> int:
-        detected = self.detect_sections(resume)
+        segments = segment_resume(resume)
         penalty = 0
 
-        if not detected["PROFESSIONAL EXPERIENCE"]:
+        if "PROFESSIONAL EXPERIENCE" not in segments["mentions"]:
             penalty -= 20
-        if not detected["SKILLS"]:
+        if "SKILLS" not in segments["mentions"]:
             penalty -= 15
 
-        if re.search(r"[•◆★▪➤✓✔]", resume):
+        if segments["unicode_bullets"]:
             penalty -= 10
 
-        if resume.count("%") > 8:
+        if segments["percent_count"] > 8:
             penalty -= 8
 
         return penalty
@@ -115,26 +96,16 @@ class ATSScorer:
         """
         penalty = 0
 
-        # Flatten keywords if nested lists are present
-        flat_keywords = []
-        for kw in ats_keywords:
-            if isinstance(kw, list):
-                flat_keywords.extend(kw)
-            elif isinstance(kw, str):
-                flat_keywords.append(kw)
+        flat_keywords = self.flat_keyword_list(ats_keywords)
+        counts = get_keyword_matcher(flat_keywords).counts(resume)
+        # Expected frequency heuristic
+        expected = max(1, len(resume) // 1200)
 
         for kw in flat_keywords:
             if not isinstance(kw, str):
                 continue
-                
-            occurrences = len(
-                re.findall(rf"\b{re.escape(kw)}\b", resume, re.I)
-            )
-
-            # Expected frequency heuristic
-            expected = max(1, len(resume) // 1200)
 
-            if occurrences > expected * self.OVERUSE_MULTIPLIER:
+            if counts.get(kw, 0) > expected * self.OVERUSE_MULTIPLIER:
                 penalty -= 1
 
         return max(self.MAX_OVERUSE_PENALTY, penalty)
@@ -144,41 +115,56 @@ class ATSScorer:
     # -----------------------------
     def extract_ats_text(self, resume: str) -> str:
         """
-        Extract text under detected ATS sections.
+        Extract text under ATS section headings, in canonical section order.
         """
-        extracted = []
-        detected = self.detect_sections(resume)
-
-        for canonical, present in detected.items():
-            if not present:
-                continue
-
-            aliases = self.SECTION_ALIASES[canonical]
-            pattern = "|".join(map(re.escape, aliases))
-
-            match = re.search(
-                rf"({pattern})\s*\n(.+?)(?=\n[A-Z ]{{4,}}|\Z)",
-                resume,
-                re.S | re.I
-            )
-            if match:
-                extracted.append(match.group(2).strip())
-
-        return " ".join(extracted)
+        segments = segment_resume(resume)
+        extracted = [section_text(segments, canonical) for canonical in self.SECTION_ALIASES]
+        return " ".join(text for text in extracted if text)
 
     # -----------------------------
     # Semantic Similarity
     # -----------------------------
+    @staticmethod
+    def embed_texts(
+        texts: List[str],
+        embed_fn: Optional[Callable[[str], List[float]]] = None,
+        embed_batch_fn: Optional[Callable[[List[str]], List[List[float]]]] = None,
+    ) -> List[List[float]]:
+        """
+        Embed texts with one embed_batch_fn call when given, otherwise one
+        embed_fn call per distinct text.
+        """
+        unique = list(dict.fromkeys(texts))
+        vectors = embed_batch_fn(unique) if embed_batch_fn else [embed_fn(t) for t in unique]
+        lookup = dict(zip(unique, vectors))
+        return [lookup[t] for t in texts]
+
+    @staticmethod
+    def normalize_rows(vectors) -> np.ndarray:
+        """Stack vectors into a float32 matrix of unit rows (zero rows stay zero)."""
+        matrix = np.atleast_2d(np.asarray(vectors, dtype=np.float32))
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        return matrix / np.where(norms == 0, 1, norms)
+
+    @classmethod
+    def similarity_matrix(cls, a, b) -> np.ndarray:
+        """Cosine similarity of every row of `a` against every row of `b`, as one matmul."""
+        return cls.normalize_rows(a) @ cls.normalize_rows(b).T
+
+    def lexical_score(self, resume_text: str, jd_text: str) -> float:
+        """BM25 relevance of the ATS text to the JD (0-1), the fast profile's semantic component."""
+        return get_jd_term_index(jd_text).score(self.extract_ats_text(resume_text))
+
     def cosine_score(
         self,
         resume_text: str,
         jd_text: str,
-        embed_fn: Callable[[str], List[float]]
+        embed_fn: Optional[Callable[[str], List[float]]] = None,
+        embed_batch_fn: Optional[Callable[[List[str]], List[List[float]]]] = None,
     ) -> float:
-        r_emb = embed_fn(resume_text)
-        jd_emb = embed_fn(jd_text)
+        r_emb, jd_emb = self.embed_texts([resume_text, jd_text], embed_fn, embed_batch_fn)
 
-        return cosine_similarity([r_emb], [jd_emb])[0][0]
+        return float(self.similarity_matrix([r_emb], [jd_emb])[0, 0])
 
     def embed_resume_chunks(self, resume_text, embed_fn):
         chunks = []
@@ -192,34 +178,32 @@ class ATSScorer:
             if len(c.strip()) > 40
         ]        
     
-    def semantic_score(self, resume_text, jd_text, embed_fn):
-
-        resume_chunks = self.embed_resume_chunks(self.extract_ats_text(resume_text), embed_fn)
-        resume_embs = [embed_fn(c) for c in resume_chunks]
-
-        jd_sentences = [
+    @staticmethod
+    def jd_sentences(jd_text: str) -> List[str]:
+        return [
             s for s in re.split(r"[.\n]", jd_text)
             if len(s.strip()) > 20
         ]
 
-        scores = []
-        for sent in jd_sentences:
-            sent_emb = embed_fn(sent)
-            # sims = [
-            #     cosine_similarity([sent_emb], [r])[0][0]
-            #     for r in resume_chunks
-            # ]
-            best = max(
-                cosine_similarity(
-                    [sent_emb],
-                    [r]
-                )[0][0]
-                for r in resume_embs
-            )            
-            scores.append(best)
+    def semantic_score(self, resume_text, jd_text, embed_fn=None, embed_batch_fn=None):
+        resume_chunks = self.embed_resume_chunks(self.extract_ats_text(resume_text), embed_fn)
+
+        jd_sentences = self.jd_sentences(jd_text)
+
+        # Chunks and sentences are embedded together (one request with a batch fn)
+        vectors = self.embed_texts(resume_chunks + jd_sentences, embed_fn, embed_batch_fn)
+        resume_embs, sent_embs = vectors[:len(resume_chunks)], vectors[len(resume_chunks):]
+
+        if not sent_embs or not resume_embs:
+            return 0.0
+
+        # Best-matching resume chunk for every JD sentence, then the mean of the top 60%
+        scores = self.similarity_matrix(sent_embs, resume_embs).max(axis=1)
 
         top_k = max(3, int(len(scores) * 0.6))
-        return float(np.mean(sorted(scores, reverse=True)[:top_k]))
+        if top_k < len(scores):
+            scores = np.partition(scores, -top_k)[-top_k:]
+        return float(np.mean(scores))
         #return np.mean(scores)    
     
     def flatten_keywords(self, grouped_keywords):
@@ -231,35 +215,76 @@ class ATSScorer:
     # -----------------------------
     # Final ATS Score
     # -----------------------------
+    # "full" scores semantics with embeddings; "fast" uses local BM25 relevance
+    PROFILES = ("full", "fast")
+
+    def scoring_profile(self, profile: Optional[str] = None) -> str:
+        profile = (profile or os.getenv("ATS_SCORING_PROFILE", "full")).lower()
+        if profile not in self.PROFILES:
+            raise ValueError(f"Unknown ATS scoring profile {profile!r}; use one of {self.PROFILES}")
+        return profile
+
     def final_ats_score(
         self,
         resume: str,
         job_description: str,
         ats_keywords: List[str],
-        embed_fn: Callable[[str], List[float]],
+        embed_fn: Optional[Callable[[str], List[float]]] = None,
+        embed_batch_fn: Optional[Callable[[List[str]], List[List[float]]]] = None,
+        profile: Optional[str] = None,
+        include_timings: bool = False,
     ) -> Dict[str, int]:
+        """
+        Score a resume. Component timings go to the scoring metrics sinks and,
+        with include_timings, into the report under "timings".
+        """
+        profile = self.scoring_profile(profile)
+        timer = ScoreTimer(profile)
+        report = self._score_components(
+            resume,
+            job_description,
+            ats_keywords,
+            timer,
+            profile,
+            embed_fn=timer.wrap_embed(embed_fn, batch=False),
+            embed_batch_fn=timer.wrap_embed(embed_batch_fn, batch=True),
+        )
+        timings = timer.finish()
+        if include_timings:
+            report["timings"] = timings
+        return report
+
+    def _score_components(self, resume, job_description, ats_keywords, timer, profile, embed_fn=None, embed_batch_fn=None):
         #print("ats_keywords:", ats_keywords)
 
-        kw_ratio = self.keyword_match_score(resume, ats_keywords)
-        kw_score = kw_ratio * 100
+        with timer.measure("keyword"):
+            kw_ratio = self.keyword_match_score(resume, ats_keywords)
+            kw_score = kw_ratio * 100
 
-        structure_penalty = self.structure_score(resume)
-        structure_score = max(0, 100 + structure_penalty)
+        with timer.measure("structure"):
+            structure_penalty = self.structure_score(resume)
+            structure_score = max(0, 100 + structure_penalty)
 
         #print("extracted_job_description_keywords:", job_description)
 
-        semantic_score = (
-            self.cosine_score(
-                self.extract_ats_text(resume),
-                job_description,
-                embed_fn
-            ) * 100
-        )
-
-        overopt_penalty = self.over_optimization_penalty(
-            resume,
-            ats_keywords
-        )
+        with timer.measure("semantic"):
+            if profile == "fast":
+                semantic_score = self.lexical_score(resume, job_description) * 100
+            else:
+                semantic_score = (
+                    self.cosine_score(
+                        self.extract_ats_text(resume),
+                        job_description,
+                        embed_fn,
+                        embed_batch_fn
+                    ) * 100
+                )
+
+        with timer.measure("overoptimization"):
+            overopt_penalty = self.over_optimization_penalty(
+                resume,
+                ats_keywords
+            )
 
         final = (
             self.WEIGHTS["keyword"] * kw_score +
@@ -275,3 +300,104 @@ class ATSScorer:
             "semantic_score": int(semantic_score),
             "overoptimization_penalty": overopt_penalty,
         }
+
+    async def afinal_ats_score(
+        self,
+        resume: str,
+        job_description: str,
+        ats_keywords: List[str],
+        aembed_fn: Optional[Callable[[str], Awaitable[List[float]]]] = None,
+        aembed_batch_fn: Optional[Callable[[List[str]], Awaitable[List[List[float]]]]] = None,
+        profile: Optional[str] = None,
+        include_timings: bool = False,
+    ) -> Dict[str, int]:
+        """
+        Async variant of final_ats_score. The texts final_ats_score embeds are
+        requested up front (one batch call, or concurrently one by one), then
+        scored synchronously from memory.
+        """
+        profile = self.scoring_profile(profile)
+        if profile == "fast":
+            return self.final_ats_score(resume, job_description, ats_keywords, profile="fast", include_timings=include_timings)
+
+        timer = ScoreTimer(profile)
+        with timer.measure("semantic"):
+            texts = list(dict.fromkeys([self.extract_ats_text(resume), job_description]))
+            start = time.perf_counter()
+            if aembed_batch_fn:
+                vectors = await aembed_batch_fn(texts)
+            else:
+                vectors = await asyncio.gather(*(aembed_fn(t) for t in texts))
+            timer.record_embed(time.perf_counter() - start, len(texts), calls=1 if aembed_batch_fn else len(texts))
+        embeddings = dict(zip(texts, vectors))
+
+        report = self._score_components(
+            resume,
+            job_description,
+            ats_keywords,
+            timer,
+            profile,
+            embed_fn=embeddings.__getitem__,
+        )
+        timings = timer.finish()
+        if include_timings:
+            report["timings"] = timings
+        return report
+
+
+class IncrementalEmbedder:
+    """
+    Batch embed function for an optimization loop. Texts embedded in the
+    previous attempt are reused; only new or changed texts reach
+    embed_batch_fn. Call next_attempt() between attempts.
+
+    Scoring is not covered at chunk level: final_ats_score embeds the whole
+    ATS text, which changes with any edit, so only the JD side is reused.
+    Semantic gaps reuse unchanged resume chunks when SEMANTIC_GAP_CHUNKS is
+    set (otherwise the whole resume is embedded as well).
+    """
+
+    def __init__(self, embed_batch_fn=None, aembed_batch_fn=None):
+        self.embed_batch_fn = embed_batch_fn
+        self.aembed_batch_fn = aembed_batch_fn
+        self._previous = {}
+        self._current = {}
+        self._reused = set()
+        self.history = []
+
+    def _split(self, texts):
+        unique = list(dict.fromkeys(texts))
+        for t in unique:
+            if t not in self._current and t in self._previous:
+                self._current[t] = self._previous[t]
+                self._reused.add(t)
+        return [t for t in unique if t not in self._current]
+
+    def __call__(self, texts: List[str]) -> List[List[float]]:
+        missing = self._split(texts)
+        if missing:
+            self._current.update(zip(missing, self.embed_batch_fn(missing)))
+        return [self._current[t] for t in texts]
+
+    async def acall(self, texts: List[str]) -> List[List[float]]:
+        missing = self._split(texts)
+        if missing:
+            self._current.update(zip(missing, await self.aembed_batch_fn(missing)))
+        return [self._current[t] for t in texts]
+
+    def reuse(self) -> Dict[str, float]:
+        """Texts embedded so far in this attempt and how many came from the previous one."""
+        total = len(self._current)
+        return {
+            "texts": total,
+            "reused": len(self._reused),
+            "reused_fraction": len(self._reused) / total if total else 0.0,
+        }
+
+    def next_attempt(self) -> Dict[str, float]:
+        """Close the current attempt, record its reuse stats (if it embedded anything) and return them."""
+        stats = self.reuse()
+        if stats["texts"]:
+            self.history.append(stats)
+        self._previous, self._current, self._reused = self._current, {}, set()
+        return stats
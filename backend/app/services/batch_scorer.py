@@ -0,0 +1,270 @@
+"""
+Batch ATS scoring: one job description against many resumes.
+
+Everything that depends only on the job description (keyword list, keyword
+matcher, JD embedding, JD sentence embeddings) is prepared once. Resumes are
+then analysed in a process pool (segmentation, keyword counts, structure),
+keyword hits are collected into a sparse resume-by-keyword matrix, and the
+semantic components come from one matrix product over all resumes. Scores
+match ATSScorer.final_ats_score per resume.
+
+Usage:
+    python -m app.services.batch_scorer resumes.jsonl job_description.txt results.jsonl --keywords keywords.json
+
+Each input line: {"resume_id", "resume_text"}; keywords.json is a list (or list of lists) of ATS keywords.
+"""
+import argparse
+import json
+import os
+import sys
+import time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+import numpy as np
+from dotenv import load_dotenv
+
+# Add parent directory to path to import core modules
+sys.path.append(str(Path(__file__).parent.parent.parent))
+
+from core.batch import read_jsonl, write_jsonl
+from core.model import generate_embeddings
+from app.services.ats_scorer import ATSScorer
+from app.services.keyword_matcher import get_keyword_matcher
+from app.services.lexical_relevance import get_jd_term_index
+
+load_dotenv()
+
+# Below this many resumes the pool start-up costs more than it saves
+MIN_POOL_RESUMES = 64
+
+
+def _analyze_resumes(resumes: List[str], keywords: tuple) -> List[tuple]:
+    """
+    CPU side of scoring for a slice of resumes (runs in pool workers):
+    ATS text, semantic chunks, keyword counts, structure penalty and length.
+    """
+    scorer = ATSScorer()
+    matcher = get_keyword_matcher(keywords)
+    analysed = []
+    for resume in resumes:
+        ats_text = scorer.extract_ats_text(resume)
+        counts = matcher.counts(resume)
+        analysed.append((
+            ats_text,
+            scorer.embed_resume_chunks(ats_text, None),
+            {kw: n for kw, n in counts.items() if n},
+            scorer.structure_score(resume),
+            len(resume),
+        ))
+    return analysed
+
+
+class BatchATSScorer:
+    """Scores and ranks many resumes against one job description."""
+
+    def __init__(
+        self,
+        job_description: str,
+        ats_keywords,
+        embed_batch_fn: Optional[Callable[[List[str]], List[List[float]]]] = None,
+        workers: Optional[int] = None,
+        chunked: bool = True,
+        profile: Optional[str] = None,
+    ):
+        self.scorer = ATSScorer()
+        self.job_description = job_description
+        self.embed_batch_fn = embed_batch_fn or generate_embeddings
+        self.workers = workers if workers is not None else int(os.getenv("BATCH_SCORER_WORKERS", str(os.cpu_count() or 1)))
+        # The fast profile scores semantics lexically and embeds nothing
+        self.profile = self.scorer.scoring_profile(profile)
+        self.chunked = chunked and self.profile == "full"
+
+        # Keyword columns: distinct strings; weights carry how often each appears
+        # in the flat list, which is what final_ats_score counts
+        self.flat_keywords = self.scorer.flat_keyword_list(ats_keywords)
+        weights = Counter(kw for kw in self.flat_keywords if isinstance(kw, str))
+        self.keywords = tuple(weights)
+        self.keyword_weights = np.array([weights[kw] for kw in self.keywords], dtype=np.float64)
+        self.keyword_index = {kw: i for i, kw in enumerate(self.keywords)}
+        get_keyword_matcher(self.keywords)
+
+        if self.profile == "fast":
+            self.jd_index = get_jd_term_index(job_description)
+            return
+        self.jd_sentences = self.scorer.jd_sentences(job_description) if self.chunked else []
+        jd_vectors = self.scorer.embed_texts([job_description] + self.jd_sentences, embed_batch_fn=self.embed_batch_fn)
+        self.jd_vector = self.scorer.normalize_rows(jd_vectors[:1])[0]
+        self.sentence_matrix = self.scorer.normalize_rows(jd_vectors[1:]) if self.jd_sentences else None
+
+    # -----------------------------
+    # Resume analysis
+    # -----------------------------
+    def _analyze(self, resumes: List[str]) -> List[tuple]:
+        if self.workers <= 1 or len(resumes) < MIN_POOL_RESUMES:
+            return _analyze_resumes(resumes, self.keywords)
+
+        size = -(-len(resumes) // (self.workers * 4))
+        slices = [resumes[i:i + size] for i in range(0, len(resumes), size)]
+        with ProcessPoolExecutor(max_workers=self.workers) as pool:
+            results = pool.map(_analyze_resumes, slices, [self.keywords] * len(slices))
+            return [item for part in results for item in part]
+
+    def keyword_matrix(self, keyword_counts: List[Dict[str, int]]):
+        """Resume-by-keyword occurrence counts in CSR form: (data, indices, indptr)."""
+        indptr = np.zeros(len(keyword_counts) + 1, dtype=np.int64)
+        indices, data = [], []
+        for row, counts in enumerate(keyword_counts):
+            for kw, n in counts.items():
+                indices.append(self.keyword_index[kw])
+                data.append(n)
+            indptr[row + 1] = len(indices)
+        return np.array(data, dtype=np.float64), np.array(indices, dtype=np.int64), indptr
+
+    # -----------------------------
+    # Vectorized components
+    # -----------------------------
+    def _keyword_components(self, keyword_counts, lengths):
+        """Keyword score and over-optimization penalty for every resume."""
+        data, indices, indptr = self.keyword_matrix(keyword_counts)
+        rows = np.repeat(np.arange(len(keyword_counts)), np.diff(indptr))
+        weights = self.keyword_weights[indices]
+
+        hits = np.bincount(rows, weights=weights, minlength=len(keyword_counts))
+        kw_ratio = hits / len(self.flat_keywords) if self.flat_keywords else np.zeros(len(keyword_counts))
+
+        expected = np.maximum(1, lengths // 1200)
+        overused = data > expected[rows] * self.scorer.OVERUSE_MULTIPLIER
+        overuse = np.bincount(rows[overused], weights=weights[overused], minlength=len(keyword_counts))
+        penalty = np.maximum(self.scorer.MAX_OVERUSE_PENALTY, -overuse).astype(int)
+        return kw_ratio * 100, penalty
+
+    def _semantic_components(self, ats_texts, chunks):
+        """Whole-text cosine (as final_ats_score) and chunked semantic score (as semantic_score)."""
+        flat_chunks = [c for resume_chunks in chunks for c in resume_chunks]
+        texts = [t for t in ats_texts if t] + flat_chunks
+        vectors = dict(zip(texts, self.scorer.embed_texts(texts, embed_batch_fn=self.embed_batch_fn))) if texts else {}
+        dim = len(self.jd_vector)
+
+        # One matmul for every resume's ATS text against the JD
+        text_matrix = self.scorer.normalize_rows(
+            [vectors[t] if t else np.zeros(dim, dtype=np.float32) for t in ats_texts] or np.zeros((0, dim))
+        )
+        semantic = (text_matrix @ self.jd_vector).astype(np.float64) * 100
+
+        chunked = np.zeros(len(ats_texts))
+        if self.sentence_matrix is None or not flat_chunks:
+            return semantic, chunked
+
+        # One matmul for all JD sentences against all resume chunks, then the
+        # best chunk per sentence within each resume and the mean of the top 60%
+        sims = self.sentence_matrix @ self.scorer.normalize_rows([vectors[c] for c in flat_chunks]).T
+        sizes = np.array([len(c) for c in chunks])
+        has_chunks = sizes > 0
+        starts = np.concatenate(([0], np.cumsum(sizes)[:-1]))[has_chunks]
+        best = np.maximum.reduceat(sims, starts, axis=1).T
+
+        top_k = max(3, int(best.shape[1] * 0.6))
+        if top_k < best.shape[1]:
+            best = np.partition(best, -top_k, axis=1)[:, -top_k:]
+        chunked[has_chunks] = best.mean(axis=1) * 100
+        return semantic, chunked
+
+    # -----------------------------
+    # Batch scoring
+    # -----------------------------
+    def score(self, resumes: List[str], resume_ids: Optional[List[str]] = None) -> Dict:
+        """
+        Score every resume and rank them. Returns
+          results  final_ats_score reports plus resume_id, rank and
+                   chunked_semantic_score, best first
+          scores   component arrays in input order
+          stats    resume count, timings and resumes_per_second
+        """
+        resume_ids = [str(i) for i in (resume_ids if resume_ids is not None else range(len(resumes)))]
+        start = time.perf_counter()
+
+        analysed = self._analyze(resumes)
+        analyzed_at = time.perf_counter()
+        ats_texts = [a[0] for a in analysed]
+        chunks = [a[1] if self.chunked else [] for a in analysed]
+        keyword_counts = [a[2] for a in analysed]
+        structure = np.maximum(0, 100 + np.array([a[3] for a in analysed], dtype=np.float64))
+        lengths = np.array([a[4] for a in analysed], dtype=np.int64)
+
+        kw_score, overopt = self._keyword_components(keyword_counts, lengths)
+        if self.profile == "fast":
+            semantic = np.array([self.jd_index.score(t) for t in ats_texts], dtype=np.float64) * 100
+            chunked = np.zeros(len(ats_texts))
+        else:
+            semantic, chunked = self._semantic_components(ats_texts, chunks)
+        weights = self.scorer.WEIGHTS
+        final = np.clip(
+            weights["keyword"] * kw_score + weights["structure"] * structure + weights["semantic"] * semantic + overopt,
+            0, 100,
+        ).astype(int)
+        seconds = time.perf_counter() - start
+
+        order = np.argsort(-final, kind="stable")
+        results = [
+            {
+                "resume_id": resume_ids[i],
+                "rank": rank,
+                "final_score": int(final[i]),
+                "keyword_score": int(kw_score[i]),
+                "structure_score": int(structure[i]),
+                "semantic_score": int(semantic[i]),
+                "overoptimization_penalty": int(overopt[i]),
+                "chunked_semantic_score": int(chunked[i]),
+            }
+            for rank, i in enumerate(order, start=1)
+        ]
+        return {
+            "results": results,
+            "scores": {
+                "final_score": final,
+                "keyword_score": kw_score,
+                "structure_score": structure,
+                "semantic_score": semantic,
+                "overoptimization_penalty": overopt,
+                "chunked_semantic_score": chunked,
+            },
+            "stats": {
+                "resumes": len(resumes),
+                "workers": self.workers if len(resumes) >= MIN_POOL_RESUMES else 1,
+                "analyze_seconds": analyzed_at - start,
+                "seconds": seconds,
+                "resumes_per_second": len(resumes) / seconds if seconds else 0.0,
+            },
+        }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Rank resumes against one job description")
+    parser.add_argument("input", help="JSONL with resume_id and resume_text per line")
+    parser.add_argument("job_description", help="text file with the job description")
+    parser.add_argument("output", help="JSONL with one ranked score report per line")
+    parser.add_argument("--keywords", required=True, help="JSON file with the ATS keywords")
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--no-chunked", action="store_true", help="skip the chunk-level semantic score")
+    parser.add_argument("--profile", choices=ATSScorer.PROFILES, default=None, help="scoring profile (default ATS_SCORING_PROFILE)")
+    args = parser.parse_args()
+
+    rows = read_jsonl(args.input)
+    batch = BatchATSScorer(
+        Path(args.job_description).read_text(),
+        json.loads(Path(args.keywords).read_text()),
+        workers=args.workers,
+        chunked=not args.no_chunked,
+        profile=args.profile,
+    )
+    report = batch.score([r["resume_text"] for r in rows], [r.get("resume_id", i) for i, r in enumerate(rows)])
+    write_jsonl(args.output, report["results"])
+    stats = report["stats"]
+    print(f"Scored {stats['resumes']} resumes in {stats['seconds']:.2f}s ({stats['resumes_per_second']:.0f} resumes/s)")
+
+
+if __name__ == "__main__":
+    main()
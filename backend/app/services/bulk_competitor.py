@@ -0,0 +1,265 @@
+"""
+Offline bulk mode for the AICompetitor pipeline.
+
+Runs the ATS optimization stages for many candidates through provider batch
+jobs (core.batch) instead of one synchronous call per stage: every stage is
+one batch round for all candidates, and the results are fanned back into each
+candidate's pipeline state. Postings shared by several candidates (same job
+description text, whatever their job_id) have their keywords and factors
+extracted once.
+
+Usage:
+    python -m app.services.bulk_competitor candidates.jsonl results.jsonl [--provider local]
+
+Each input line: {"candidate_id", "job_id", "resume_text", "job_description", "difficulty_level"}
+"""
+import argparse
+import hashlib
+import sys
+from pathlib import Path
+from typing import Dict, List
+
+# Add parent directory to path to import core modules
+sys.path.append(str(Path(__file__).parent.parent.parent))
+
+from core.batch import run_batch, get_batch_provider, read_jsonl, write_jsonl
+from core.model import generate_embeddings
+from core.rate_limit import llm_priority
+from core.routing import route_for
+from app.services.ats_scorer import IncrementalEmbedder
+from app.services.generate_ai_competitor import AICompetitor
+
+
+class BulkCandidate:
+    """Pipeline state of one candidate in a bulk run."""
+
+    def __init__(self, candidate_id, job_id, resume_text, job_description, difficulty_level=30):
+        self.candidate_id = str(candidate_id)
+        self.job_id = str(job_id)
+        self.resume_text = resume_text
+        self.job_description = job_description
+        # Postings are keyed by their text: lines reusing a job_id for another JD stay apart
+        self.posting_key = hashlib.sha256(job_description.encode("utf-8")).hexdigest()[:16]
+        self.difficulty_level = difficulty_level
+        self.competitor = None
+        self.resume = None
+        self.skill_comparison = None
+        self.score_reports = []
+        self.semantic_scores = []
+        # Reuses vectors of texts unchanged since the previous attempt
+        self.embedder = IncrementalEmbedder(generate_embeddings)
+        self.status = "pending"
+        self.error = None
+
+    @property
+    def active(self) -> bool:
+        return self.status == "pending"
+
+    def fail(self, stage, error):
+        print(f"Candidate {self.candidate_id} failed at {stage}: {error}")
+        self.status = "failed"
+        self.error = f"{stage}: {error}"
+
+    def to_dict(self) -> Dict:
+        report = self.score_reports[-1] if self.score_reports else {}
+        return {
+            "candidate_id": self.candidate_id,
+            "job_id": self.job_id,
+            "status": self.status,
+            "error": self.error,
+            "final_score": report.get("final_score"),
+            "score_report": report,
+            "attempts": len(self.score_reports),
+            "embedding_reuse": self.embedder.history + [r for r in [self.embedder.reuse()] if r["texts"]],
+            "optimized_resume": self.resume,
+            "skill_comparison": self.skill_comparison,
+        }
+
+
+class BulkCompetitor:
+    def __init__(self, candidates: List[BulkCandidate], provider=None, min_score=85, max_attempts=3):
+        self.candidates = candidates
+        self.provider = provider or get_batch_provider()
+        self.min_score = min_score
+        self.max_attempts = max_attempts
+        # Position in the run keeps custom_ids unique even for repeated candidate_ids
+        self._positions = {id(c): index for index, c in enumerate(candidates)}
+
+    def _active(self):
+        return [c for c in self.candidates if c.active]
+
+    @staticmethod
+    def _request(stage, custom_id, system_prompt, user_prompt, cache=True):
+        return {
+            "custom_id": custom_id,
+            "llm_type": route_for(stage)[0],
+            "system_prompt": system_prompt,
+            "user_prompt": user_prompt,
+            "cache": cache,
+        }
+
+    def _custom_id(self, stage, c, *suffix):
+        return ":".join([stage, str(self._positions[id(c)]), c.candidate_id, *map(str, suffix)])
+
+    def _batch(self, label, requests):
+        if not requests:
+            return {}
+        return run_batch(requests, provider=self.provider, label=label)
+
+    def run(self) -> List[BulkCandidate]:
+        """Run every stage for all candidates, in batch priority."""
+        with llm_priority("batch"):
+            self._extract_postings()
+            self._generate()
+            self._fix_ats_issues()
+            self._optimize()
+        return self.candidates
+
+    def _extract_postings(self):
+        """Keywords and factors, once per posting."""
+        postings = {c.posting_key: c.job_description for c in self._active()}
+        requests = []
+        for key, job_description in postings.items():
+            requests.append(self._request("keywords", f"keywords:{key}", *AICompetitor._ats_keywords_prompts(job_description)))
+            requests.append(self._request("factors", f"factors:{key}", *AICompetitor._factors_prompts(job_description)))
+        results = self._batch("postings", requests)
+
+        for c in self._active():
+            keywords = results[f"keywords:{c.posting_key}"]
+            factors = results[f"factors:{c.posting_key}"]
+            if isinstance(keywords, Exception) or isinstance(factors, Exception):
+                c.fail("postings", keywords if isinstance(keywords, Exception) else factors)
+                continue
+            ats_keywords = AICompetitor.normalize_ats_keywords(AICompetitor.parse_json_safe(keywords))
+            c.competitor = AICompetitor(c.resume_text, c.job_description, c.difficulty_level, ats_keywords=ats_keywords)
+            c.competitor.factors = factors
+
+    def _generate(self):
+        """ATS-safe resume generation and skill comparison per candidate."""
+        requests = []
+        for c in self._active():
+            try:
+                system_prompt, user_prompt = c.competitor._ats_safe_prompts(c.competitor.factors)
+            except Exception as e:
+                c.fail("generation", e)
+                continue
+            requests.append(self._request("generation", self._custom_id("generation", c), system_prompt, user_prompt, cache=False))
+            requests.append(self._request(
+                "skill_comparison", self._custom_id("skill_comparison", c),
+                *c.competitor.skill_comparison._skill_comparison_prompts(),
+            ))
+        results = self._batch("generation", requests)
+
+        for c in self._active():
+            resume = results[self._custom_id("generation", c)]
+            if isinstance(resume, Exception):
+                c.fail("generation", resume)
+                continue
+            c.competitor.generated_resume = c.resume = resume
+            comparison = results[self._custom_id("skill_comparison", c)]
+            c.skill_comparison = None if isinstance(comparison, Exception) else comparison
+
+    def _fix_ats_issues(self):
+        requests, owners = [], {}
+        for c in self._active():
+            issues = c.competitor.ats_regex_rule_pack(c.resume)
+            if issues:
+                fix_prompt = c.competitor._fix_ats_issues_prompt(issues, self.min_score)
+                custom_id = self._custom_id("regex_fix", c)
+                owners[custom_id] = c
+                requests.append(self._request("regex_fix", custom_id, fix_prompt, c.resume))
+        results = self._batch("regex_fix", requests)
+
+        for custom_id, resume in results.items():
+            c = owners[custom_id]
+            if isinstance(resume, Exception):
+                c.fail("regex_fix", resume)
+            else:
+                c.resume = resume
+
+    def _score(self, c) -> Dict:
+        c.embedder.next_attempt()  # each scoring starts a new attempt
+        keywords = ", ".join(c.competitor.flatten_keywords_str(c.competitor.ats_keywords))
+        report = c.competitor.parse_json_safe(c.competitor.ats_score_resume(c.resume, keywords, c.embedder))
+        c.score_reports.append(report)
+        return report
+
+    def _optimize(self):
+        """Score / semantic-gap rewrite loop, one rewrite batch per attempt."""
+        for attempt in range(self.max_attempts):
+            requests, owners = [], {}
+            for c in self._active():
+                try:
+                    report = self._score(c)
+                    if report.get("final_score", 0) >= self.min_score:
+                        c.status = "done"
+                        continue
+
+                    c.semantic_scores.append(report.get("semantic_score", 0))
+                    # Stop once the semantic score stops improving
+                    if attempt > 0 and c.semantic_scores[-1] - c.semantic_scores[-2] < 0.02:
+                        c.status = "done"
+                        continue
+
+                    keywords = ", ".join(c.competitor.flatten_keywords_str(c.competitor.ats_keywords))
+                    gaps = c.competitor.semantic_gap_terms(c.resume, keywords, embed_batch_fn=c.embedder)
+                except Exception as e:
+                    c.fail("scoring", e)
+                    continue
+                gap_prompt = c.competitor._semantic_gap_prompt(gaps)
+                custom_id = self._custom_id("rewrite", c, attempt + 1)
+                owners[custom_id] = c
+                requests.append(self._request("rewrite", custom_id, gap_prompt, c.resume))
+
+            if not requests:
+                break
+            for custom_id, resume in self._batch(f"rewrite-{attempt + 1}", requests).items():
+                c = owners[custom_id]
+                if isinstance(resume, Exception):
+                    c.fail("rewrite", resume)
+                else:
+                    c.resume = resume
+
+        # Report the score of the resume that is actually returned
+        for c in self._active():
+            try:
+                self._score(c)
+                c.status = "done"
+            except Exception as e:
+                c.fail("scoring", e)
+
+
+def load_candidates(path) -> List[BulkCandidate]:
+    return [
+        BulkCandidate(
+            row["candidate_id"], row["job_id"], row["resume_text"], row["job_description"],
+            row.get("difficulty_level", 30),
+        )
+        for row in read_jsonl(path)
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the AICompetitor pipeline for many candidates via batch APIs")
+    parser.add_argument("input", help="JSONL file of candidates")
+    parser.add_argument("output", help="JSONL file to write results to")
+    parser.add_argument("--provider", choices=["openai", "local"], default=None,
+                        help="batch provider (default: LLM_BATCH_PROVIDER or openai)")
+    parser.add_argument("--min-score", type=float, default=85)
+    parser.add_argument("--max-attempts", type=int, default=3)
+    args = parser.parse_args()
+
+    candidates = load_candidates(args.input)
+    bulk = BulkCompetitor(
+        candidates, provider=get_batch_provider(args.provider),
+        min_score=args.min_score, max_attempts=args.max_attempts,
+    )
+    bulk.run()
+    write_jsonl(args.output, [c.to_dict() for c in candidates])
+
+    done = sum(c.status == "done" for c in candidates)
+    print(f"Bulk run finished: {done}/{len(candidates)} candidates done, results in {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,29 +1,31 @@
+import os
 import sys
+import asyncio
 from pathlib import Path
 import re
-from sklearn.metrics.pairwise import cosine_similarity
 import numpy as np
 from typing import List, Dict
 
 # Add parent directory to path to import core modules
 sys.path.append(str(Path(__file__).parent.parent.parent))
 
-from core.model import generate_llm_response, generate_embedding
-from app.services.ats_scorer import ATSScorer
+from core.model import generate_embeddings, agenerate_embeddings
+from core.routing import route_llm_response, aroute_llm_response, astream_route_llm_response
+from app.services.ats_scorer import ATSScorer, IncrementalEmbedder
 from app.services.skill_comparison import SkillComparison
+from app.services.resume_sections import section_text, segment_resume
 from app.services.observability import init_observability
 
-# Initialize observability
-init_observability()
-
 class AICompetitor:
-    def __init__(self, resume_text, job_description, difficulty_level):
+    def __init__(self, resume_text, job_description, difficulty_level, ats_keywords=None):
+        # Tracing is set up on first use instead of at import
+        init_observability()
         self.resume_text = resume_text
         self.job_description = job_description
         self.difficulty_level = int(difficulty_level)
         self.generated_resume = None
         self.factors = None
-        self.ats_keywords = self.extract_ats_keywords(self.job_description)
+        self.ats_keywords = ats_keywords if ats_keywords is not None else self.extract_ats_keywords(self.job_description)
         self.RESUME_OUTPUT_CONTRACT = """
                 CRITICAL OUTPUT RULES (ABSOLUTE):
                 - Return ONLY the resume text
@@ -36,10 +38,18 @@ class AICompetitor:
                 """
         self.skill_comparison = SkillComparison(resume_text, job_description, self.ats_keywords)
 
-    def extract_factors(self):
-        if self.factors:
-            return self.factors
-        
+    @classmethod
+    async def acreate(cls, resume_text, job_description, difficulty_level):
+        """
+        Async constructor: extracts the ATS keywords without blocking the event loop.
+        """
+        SYSTEM_PROMPT, USER_PROMPT = cls._ats_keywords_prompts(job_description)
+        ats_keywords_raw = await aroute_llm_response("keywords", SYSTEM_PROMPT, USER_PROMPT)
+        ats_keywords = cls.normalize_ats_keywords(cls.parse_json_safe(ats_keywords_raw))
+        return cls(resume_text, job_description, difficulty_level, ats_keywords=ats_keywords)
+
+    @staticmethod
+    def _factors_prompts(job_description):
         SYSTEM_PROMPT = """
         You are an expert job analysis AI specialist in distilling job description to their core requirements.  
         Your task is analyze the job description and extract most critical factors that will determmine success in this role.Focous on extracting:
@@ -51,10 +61,25 @@ class AICompetitor:
 
         USER_PROMPT = f"""
         Extract all key factors (each max 2 words) that most strongly infuence the job role describe below.and
-        Job Description: {self.job_description}
+        Job Description: {job_description}
         """
+        return SYSTEM_PROMPT, USER_PROMPT
+
+    def extract_factors(self):
+        if self.factors:
+            return self.factors
 
-        self.factors = generate_llm_response(SYSTEM_PROMPT, USER_PROMPT, llm_type="openai_reasoning")
+        SYSTEM_PROMPT, USER_PROMPT = self._factors_prompts(self.job_description)
+        self.factors = route_llm_response("factors", SYSTEM_PROMPT, USER_PROMPT)
+
+        return self.factors
+
+    async def aextract_factors(self):
+        if self.factors:
+            return self.factors
+
+        SYSTEM_PROMPT, USER_PROMPT = self._factors_prompts(self.job_description)
+        self.factors = await aroute_llm_response("factors", SYSTEM_PROMPT, USER_PROMPT)
 
         return self.factors
     
@@ -109,15 +134,13 @@ class AICompetitor:
         Retun ONLY the enhanced resume with fixed header above and formated consistently with the original resume structure.
         """
 
-        self.generated_resume = generate_llm_response(SYSTEM_PROMPT, USER_PROMPT)
+        self.generated_resume = route_llm_response("generation", SYSTEM_PROMPT, USER_PROMPT, cache=False)
 
         return self.generated_resume
 
     ### ATS Enhancement Methods ###
-    def extract_ats_keywords(self, raw_text):
-        if hasattr(self, "ats_keywords") and self.ats_keywords:
-            return self.ats_keywords
-
+    @staticmethod
+    def _ats_keywords_prompts(raw_text):
         SYSTEM_PROMPT = """
         You are a ATS keyword engine. Convert the following raw job posting or resume text into exactly the JSON schema below:
         — Do not add any extra fields or prose.
@@ -148,22 +171,21 @@ class AICompetitor:
         {raw_text}
         Note: Please output only a valid JSON matching the EXACT schema with no surrounding commentary.
         """
+        return SYSTEM_PROMPT, USER_PROMPT
 
-        ats_keywords_raw = generate_llm_response(SYSTEM_PROMPT, USER_PROMPT, llm_type="openai_reasoning")
+    def extract_ats_keywords(self, raw_text):
+        if hasattr(self, "ats_keywords") and self.ats_keywords:
+            return self.ats_keywords
+
+        SYSTEM_PROMPT, USER_PROMPT = self._ats_keywords_prompts(raw_text)
+        ats_keywords_raw = route_llm_response("keywords", SYSTEM_PROMPT, USER_PROMPT)
         ats_keywords = self.normalize_ats_keywords(self.parse_json_safe(ats_keywords_raw))
         return ats_keywords
 
-    def generate_resume_ats_safe(self, resume_text=None):
-        if self.generated_resume:
-            return self.generated_resume
-
+    def _ats_safe_prompts(self, factors, resume_text=None):
         if not hasattr(self, 'enhancement_descrition'):
             self.determine_enhancement()
 
-        print("Normalized ATS Keywords:", self.ats_keywords)    
-        print()
-        factors = self.extract_factors()
-
         SYSTEM_PROMPT = f"""
         {self.RESUME_OUTPUT_CONTRACT}
         You are an ATS-safe resume enhancer AI specialist tasked with creating a stronger competitor version of candidate's resume.
@@ -225,18 +247,41 @@ class AICompetitor:
         Return ONLY the enhanced resume.
         Preserve original formatting and section layout.
         """
+        return SYSTEM_PROMPT, USER_PROMPT
+
+    def generate_resume_ats_safe(self, resume_text=None):
+        if self.generated_resume:
+            return self.generated_resume
 
-        self.generated_resume = generate_llm_response(SYSTEM_PROMPT, USER_PROMPT)
+        print("Normalized ATS Keywords:", self.ats_keywords)    
+        print()
+        factors = self.extract_factors()
+
+        SYSTEM_PROMPT, USER_PROMPT = self._ats_safe_prompts(factors, resume_text)
+        self.generated_resume = route_llm_response("generation", SYSTEM_PROMPT, USER_PROMPT, cache=False)
+        return self.generated_resume
+
+    async def agenerate_resume_ats_safe(self, resume_text=None):
+        if self.generated_resume:
+            return self.generated_resume
+
+        print("Normalized ATS Keywords:", self.ats_keywords)
+        print()
+        factors = await self.aextract_factors()
+
+        SYSTEM_PROMPT, USER_PROMPT = self._ats_safe_prompts(factors, resume_text)
+        self.generated_resume = await aroute_llm_response("generation", SYSTEM_PROMPT, USER_PROMPT, cache=False)
         return self.generated_resume
 
 
     def ats_regex_rule_pack(self, resume: str):
         issues = []
+        segments = segment_resume(resume)
 
         # -------------------------------
         # 1. Unicode / non-ASCII bullets
         # -------------------------------
-        if re.search(r"[•◆★▪➤✓✔]", resume):
+        if segments["unicode_bullets"]:
             issues.append("Non-ATS Unicode bullet symbols detected")
 
         # -------------------------------
@@ -258,15 +303,16 @@ class AICompetitor:
             "EDUCATION"
         ]
 
+        # Headers must be written out in the standard uppercase form
+        headers = {s["name"] for s in segments["sections"] if s["name"] in s["heading"]}
         for header in REQUIRED_HEADERS:
-            if header not in resume:
+            if header not in headers:
                 issues.append(f"Missing required section header: {header}")
 
         # -------------------------------
         # 4. Metric overuse (LLM fingerprint)
         # -------------------------------
-        percent_count = len(re.findall(r"%", resume))
-        if percent_count > 8:
+        if segments["percent_count"] > 8:
             issues.append("Excessive percentage-based metrics")
 
         # -------------------------------
@@ -293,48 +339,94 @@ class AICompetitor:
         # -------------------------------
         # 8. Skill stuffing detection
         # -------------------------------
-        skill_lines = re.findall(r"SKILLS(.+?)\n\n", resume, re.DOTALL)
-        if skill_lines:
-            skills = skill_lines[0].split(",")
+        skill_text = section_text(segments, "SKILLS")
+        if skill_text:
+            skills = skill_text.split(",")
             if len(skills) > 30:
                 issues.append("Skill list too dense (possible keyword stuffing)")
 
         return issues
 
-    def ats_score_resume(self, resume_text, job_description_keywords):
-        ats_scorer = ATSScorer()
-        ats_keywords_str= self.ats_keywords if self.ats_keywords else list(self.normalize_ats_keywords(
+    def _scoring_keywords(self):
+        return self.ats_keywords if self.ats_keywords else list(self.normalize_ats_keywords(
                 self.parse_json_safe(
                     self.extract_ats_keywords()
                 )
             ).values())
+
+    def ats_score_resume(self, resume_text, job_description_keywords, embed_batch_fn=None):
+        ats_scorer = ATSScorer()
+        ats_keywords_str = self._scoring_keywords()
         final_score = ats_scorer.final_ats_score(
             resume=resume_text,
             job_description=job_description_keywords,
             ats_keywords=ats_keywords_str,
-            embed_fn=generate_embedding
+            embed_batch_fn=embed_batch_fn or generate_embeddings
         )
 
         return final_score
 
-    def semantic_gap_terms(self, resume_text, jd_text, embed_fn, top_k=8):
+    async def aats_score_resume(self, resume_text, job_description_keywords, aembed_batch_fn=None):
+        ats_scorer = ATSScorer()
+        ats_keywords_str = self._scoring_keywords()
+        final_score = await ats_scorer.afinal_ats_score(
+            resume=resume_text,
+            job_description=job_description_keywords,
+            ats_keywords=ats_keywords_str,
+            aembed_batch_fn=aembed_batch_fn or agenerate_embeddings
+        )
+
+        return final_score
+
+    def _gap_sentences(self, jd_text):
+        return [
+            s.strip() for s in re.split(r"[.\n]", jd_text) if len(s.strip()) > 20
+        ]
+
+    @staticmethod
+    def _gap_units(resume_text):
+        """
+        Resume texts the JD sentences are compared against: the whole resume,
+        or (SEMANTIC_GAP_CHUNKS=true) its chunks, each sentence scored by its
+        best-matching chunk. Per-chunk gaps let an IncrementalEmbedder re-embed
+        only the chunks a rewrite changed, but pick different terms.
+        """
+        if os.getenv("SEMANTIC_GAP_CHUNKS", "false").lower() in ("1", "true", "yes"):
+            return ATSScorer().embed_resume_chunks(resume_text, None) or [resume_text]
+        return [resume_text]
+
+    def semantic_gap_terms(self, resume_text, jd_text, embed_fn=None, top_k=8, embed_batch_fn=None):
         """
         Extract JD phrases that are semantically distant from the resume.
+        With embed_batch_fn the resume and all sentences go in one call.
         """
-        jd_sentences = [
-            s.strip() for s in re.split(r"[.\n]", jd_text) if len(s.strip()) > 20
-        ]
+        jd_sentences = self._gap_sentences(jd_text)
+        units = self._gap_units(resume_text)
+
+        vectors = ATSScorer.embed_texts(units + jd_sentences, embed_fn, embed_batch_fn)
+        return self._least_similar(vectors[:len(units)], jd_sentences, vectors[len(units):], top_k)
 
-        resume_emb = embed_fn(resume_text)
-        gaps = []
+    @staticmethod
+    def _least_similar(unit_embs, jd_sentences, sent_embs, top_k):
+        """The top_k JD sentences least similar to the resume (its best unit), most distant first."""
+        if not jd_sentences:
+            return []
+        sims = ATSScorer.similarity_matrix(sent_embs, unit_embs).max(axis=1)
+        return [jd_sentences[i] for i in np.argsort(sims, kind="stable")[:top_k]]
 
-        for sent in jd_sentences:
-            sent_emb = embed_fn(sent)
-            sim = cosine_similarity([resume_emb], [sent_emb])[0][0]
-            gaps.append((sim, sent))
+    async def asemantic_gap_terms(self, resume_text, jd_text, aembed_fn=None, top_k=8, aembed_batch_fn=None):
+        """
+        Async variant of semantic_gap_terms; embeddings are requested in one
+        batch call, or concurrently one by one.
+        """
+        jd_sentences = self._gap_sentences(jd_text)
+        units = self._gap_units(resume_text)
+        if aembed_batch_fn:
+            vectors = await aembed_batch_fn(units + jd_sentences)
+        else:
+            vectors = await asyncio.gather(*(aembed_fn(text) for text in units + jd_sentences))
 
-        gaps.sort(key=lambda x: x[0])
-        return [g[1] for g in gaps[:top_k]]
+        return self._least_similar(vectors[:len(units)], jd_sentences, vectors[len(units):], top_k)
 
 
     def generate_ats_optimized_resume(self, min_score=85, max_attempts=3):
@@ -352,37 +444,186 @@ class AICompetitor:
 
         generate_recommendation = self.skill_comparison.generate_skill_comparison()
 
+        # Texts unchanged since the previous attempt reuse their vectors
+        embedder = IncrementalEmbedder(generate_embeddings)
+        self.embedding_reuse = embedder.history
+
         semantic_score = []
         for attempt in range(max_attempts):
-            score_report_str = self.ats_score_resume(resume, job_description_keywords)
-            print()
-            print(f"ATS Scoring Attempt {attempt+1}: {score_report_str}")
-            print()
-            
-            score_report = self.parse_json_safe(score_report_str)            
-                        
-            if score_report.get("final_score", 0) >= min_score:
-                return resume, generate_recommendation
-
-            semantic_score.append(score_report.get("semantic_score", 0))
-            if attempt > 0:
-                # If semantic score is not improving, break early
-                if semantic_score[-1] - semantic_score[-2] < 0.02:
-                    print("Semantic score not improving, stopping attempts.")
-                    print()
+            try:
+                score_report_str = self.ats_score_resume(resume, job_description_keywords, embedder)
+                print()
+                print(f"ATS Scoring Attempt {attempt+1}: {score_report_str}")
+                print()
+
+                score_report = self.parse_json_safe(score_report_str)
+
+                if score_report.get("final_score", 0) >= min_score:
                     return resume, generate_recommendation
 
+                semantic_score.append(score_report.get("semantic_score", 0))
+                if attempt > 0:
+                    # If semantic score is not improving, break early
+                    if semantic_score[-1] - semantic_score[-2] < 0.02:
+                        print("Semantic score not improving, stopping attempts.")
+                        print()
+                        return resume, generate_recommendation
+
+
+                semantic_gaps = self.semantic_gap_terms(
+                    resume,
+                    job_description_keywords,
+                    embed_batch_fn=embedder
+                )
+            finally:
+                self._report_embedding_reuse(embedder, attempt)
+
+            print("Semantic Gaps Identified:", semantic_gaps)
+            print()
+
+            resume = route_llm_response("rewrite", self._semantic_gap_prompt(semantic_gaps), resume)
+            #resume = self.generate_resume_ats_safe(resume)
+
+        return resume, generate_recommendation
+
+    @staticmethod
+    def _report_embedding_reuse(embedder, attempt):
+        reuse = embedder.next_attempt()
+        print(
+            f"Embedding reuse, attempt {attempt+1}: {reuse['reused']}/{reuse['texts']} texts "
+            f"({reuse['reused_fraction']:.0%})"
+        )
+
+    async def agenerate_ats_optimized_resume(self, min_score=85, max_attempts=3):
+        """
+        Async variant of generate_ats_optimized_resume. The skill comparison
+        runs concurrently with the generate/score loop.
+        """
+        async for event in self.astream_ats_optimized_resume(min_score, max_attempts, stream_tokens=False):
+            if event["event"] == "optimized":
+                return event["data"]["resume"], event["data"]["skill_comparison"]
+
+    async def astream_ats_optimized_resume(self, min_score=85, max_attempts=3, stream_tokens=True):
+        """
+        Run the async ATS optimization loop as a stream of progress events:
+        "stage" for each pipeline step, "token" for resume text deltas
+        (when stream_tokens is set) and "score" per scoring attempt. The last
+        event is "optimized", carrying the final resume and skill comparison.
+        """
+        recommendation_task = asyncio.ensure_future(self.skill_comparison.agenerate_skill_comparison())
+        try:
+            resume = None
+            async for event in self._aoptimize_events(min_score, max_attempts, stream_tokens):
+                if event["event"] == "text":
+                    resume = event["data"]
+                else:
+                    yield event
+
+            yield {"event": "stage", "data": {"stage": "skill_comparison"}}
+            yield {
+                "event": "optimized",
+                "data": {"resume": resume, "skill_comparison": await recommendation_task},
+            }
+        finally:
+            if not recommendation_task.done():
+                recommendation_task.cancel()
+
+    async def _allm_events(self, stage, system_prompt, user_prompt, stream_tokens, **kwargs):
+        """
+        Yield "token" events while the stage's routed LLM streams (if
+        stream_tokens), then one "text" event holding the complete response.
+        """
+        if not stream_tokens:
+            yield {"event": "text", "data": await aroute_llm_response(stage, system_prompt, user_prompt, **kwargs)}
+            return
+
+        yield {"event": "stage", "data": {"stage": stage}}
+        parts = []
+        async for delta in astream_route_llm_response(stage, system_prompt, user_prompt, **kwargs):
+            parts.append(delta)
+            yield {"event": "token", "data": {"stage": stage, "text": delta}}
+        yield {"event": "text", "data": "".join(parts)}
+
+    async def _aoptimize_events(self, min_score, max_attempts, stream_tokens):
+        """Event generator behind astream_ats_optimized_resume; ends with a "text" event."""
+        yield {"event": "stage", "data": {"stage": "factors"}}
+        factors = await self.aextract_factors()
+
+        print("Normalized ATS Keywords:", self.ats_keywords)
+        print()
+        if self.generated_resume:
+            resume = self.generated_resume
+        else:
+            SYSTEM_PROMPT, USER_PROMPT = self._ats_safe_prompts(factors)
+            async for event in self._allm_events("generation", SYSTEM_PROMPT, USER_PROMPT, stream_tokens, cache=False):
+                if event["event"] == "text":
+                    self.generated_resume = resume = event["data"]
+                else:
+                    yield event
+
+        regex_issues = self.ats_regex_rule_pack(resume)
+        print("ATS Regex Issues Detected:", regex_issues)
+        if regex_issues:
+            fix_prompt = self._fix_ats_issues_prompt(regex_issues, min_score)
+            async for event in self._allm_events("regex_fix", fix_prompt, resume, stream_tokens):
+                if event["event"] == "text":
+                    resume = event["data"]
+                else:
+                    yield event
+
+        job_description_keywords_list = self.flatten_keywords_str(self.ats_keywords)
+        job_description_keywords = ", ".join(job_description_keywords_list)
+        print("Job Description Keywords for ATS Optimization:", job_description_keywords_list)
 
-            semantic_gaps = self.semantic_gap_terms(
-                resume,
-                job_description_keywords,
-                generate_embedding
-            )
+        # Texts unchanged since the previous attempt reuse their vectors
+        embedder = IncrementalEmbedder(aembed_batch_fn=agenerate_embeddings)
+        self.embedding_reuse = embedder.history
+
+        semantic_score = []
+        for attempt in range(max_attempts):
+            yield {"event": "stage", "data": {"stage": "scoring", "attempt": attempt + 1}}
+            try:
+                score_report_str = await self.aats_score_resume(resume, job_description_keywords, embedder.acall)
+                print()
+                print(f"ATS Scoring Attempt {attempt+1}: {score_report_str}")
+                print()
+
+                score_report = self.parse_json_safe(score_report_str)
+                yield {"event": "score", "data": {"attempt": attempt + 1, **score_report}}
+
+                if score_report.get("final_score", 0) >= min_score:
+                    break
+
+                semantic_score.append(score_report.get("semantic_score", 0))
+                if attempt > 0:
+                    # If semantic score is not improving, break early
+                    if semantic_score[-1] - semantic_score[-2] < 0.02:
+                        print("Semantic score not improving, stopping attempts.")
+                        print()
+                        break
+
+                semantic_gaps = await self.asemantic_gap_terms(
+                    resume,
+                    job_description_keywords,
+                    aembed_batch_fn=embedder.acall
+                )
+            finally:
+                self._report_embedding_reuse(embedder, attempt)
 
             print("Semantic Gaps Identified:", semantic_gaps)
             print()
 
-            SYSTEM_PROMPT = f"""
+            gap_prompt = self._semantic_gap_prompt(semantic_gaps)
+            async for event in self._allm_events("rewrite", gap_prompt, resume, stream_tokens):
+                if event["event"] == "text":
+                    resume = event["data"]
+                else:
+                    yield event
+
+        yield {"event": "text", "data": resume}
+
+    def _semantic_gap_prompt(self, semantic_gaps):
+        SYSTEM_PROMPT = f"""
             {self.RESUME_OUTPUT_CONTRACT}
 
             You are an ATS resume improvement engine.
@@ -405,13 +646,9 @@ class AICompetitor:
             - Preserve ATS-safe formatting
             - Return ONLY the resume
             """
+        return SYSTEM_PROMPT
 
-            resume = generate_llm_response(SYSTEM_PROMPT, resume)
-            #resume = self.generate_resume_ats_safe(resume)
-
-        return resume, generate_recommendation
-
-    def improve_resume_fixed_ats_issues(self, regex_issue, resume, min_score=85):
+    def _fix_ats_issues_prompt(self, regex_issue, min_score):
         SYSTEM_PROMPT = f"""
         {self.RESUME_OUTPUT_CONTRACT}
         You are an ATS resume improvement engine.
@@ -421,11 +658,18 @@ class AICompetitor:
         Ensure the resume scores at least {min_score} on ATS evaluation.
         Do not add commentary.
         """
+        return SYSTEM_PROMPT
+
+    def improve_resume_fixed_ats_issues(self, regex_issue, resume, min_score=85):
+        regex_fix_resume = route_llm_response("regex_fix", self._fix_ats_issues_prompt(regex_issue, min_score), resume)
+        return regex_fix_resume
 
-        regex_fix_resume = generate_llm_response(SYSTEM_PROMPT, resume)
+    async def aimprove_resume_fixed_ats_issues(self, regex_issue, resume, min_score=85):
+        regex_fix_resume = await aroute_llm_response("regex_fix", self._fix_ats_issues_prompt(regex_issue, min_score), resume)
         return regex_fix_resume
 
-    def normalize_ats_keywords(self, ats_keywords):
+    @staticmethod
+    def normalize_ats_keywords(ats_keywords):
         normalized = {}
         for group, keywords in ats_keywords.items():
             normalized[group] = []
@@ -443,7 +687,8 @@ class AICompetitor:
         #return ", ".join(keyword_list)
         return keyword_list
     
-    def parse_json_safe(self, json_string):
+    @staticmethod
+    def parse_json_safe(json_string):
         import json
         
         # If already a dict, return it
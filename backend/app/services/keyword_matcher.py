@@ -0,0 +1,94 @@
+"""
+Multi-keyword matcher shared by ATSScorer and SkillComparison.
+
+All keywords of a set are compiled into one trie-shaped regex (a prefix tree
+of alternations, so each text position follows a single branch) inside a
+zero-width lookahead. One scan then reports every occurrence with
+(?<!\\w)keyword(?!\\w) word-boundary semantics and case folding, including
+keywords that overlap ("learning" inside "machine learning"). Occurrences of
+the same keyword are counted without overlap, as re.findall would ("a a" is
+found once in "a a a"). Matchers are built once per keyword set and cached.
+"""
+import re
+from collections import Counter
+from functools import lru_cache
+from typing import Dict, Iterable, List, Set
+
+_WORD_CHAR = re.compile(r"\w")
+
+
+def _trie_regex(node) -> str:
+    """Regex for a trie node; longer continuations are tried before ending here."""
+    branches = [re.escape(ch) + _trie_regex(child) for ch, child in sorted(node.items()) if ch]
+    if "" in node:
+        branches.append(r"(?!\w)")
+    return branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+
+
+class KeywordMatcher:
+    """One-pass word-boundary, case-insensitive matcher for a fixed keyword set."""
+
+    def __init__(self, keywords: Iterable[str]):
+        self.keywords: List[str] = list(dict.fromkeys(
+            kw for kw in keywords if isinstance(kw, str) and kw.strip()
+        ))
+        self._originals: Dict[str, List[str]] = {}
+        for kw in self.keywords:
+            self._originals.setdefault(kw.strip().lower(), []).append(kw)
+
+        trie = {}
+        for folded in self._originals:
+            node = trie
+            for ch in folded:
+                node = node.setdefault(ch, {})
+            node[""] = {}
+        self._pattern = re.compile(rf"(?<!\w)(?=({_trie_regex(trie)}))", re.I) if trie else None
+
+        # The scan reports the longest keyword at each position; shorter keywords
+        # ending on a boundary inside it match at the same position too
+        self._nested: Dict[str, List[str]] = {
+            long: [
+                short for short in self._originals
+                if len(short) < len(long) and long.startswith(short) and not _WORD_CHAR.match(long[len(short)])
+            ]
+            for long in self._originals
+        }
+
+    def _folded_counts(self, text: str) -> Counter:
+        counts = Counter()
+        if self._pattern is None:
+            return counts
+        ends: Dict[str, int] = {}  # end of the last counted occurrence per keyword
+        for match in self._pattern.finditer(text):
+            folded = match.group(1).lower()
+            if folded not in self._nested:
+                continue  # IGNORECASE matched a character lower() folds differently
+            start = match.start()
+            for kw in (folded, *self._nested[folded]):
+                if start >= ends.get(kw, 0):
+                    counts[kw] += 1
+                    ends[kw] = start + len(kw)
+        return counts
+
+    def counts(self, text: str) -> Dict[str, int]:
+        """Occurrences of every keyword (0 when absent), keyed as given."""
+        folded = self._folded_counts(text)
+        return {
+            kw: folded.get(key, 0)
+            for key, originals in self._originals.items()
+            for kw in originals
+        }
+
+    def hits(self, text: str) -> Set[str]:
+        """Keywords that occur at least once."""
+        return {kw for kw, n in self.counts(text).items() if n}
+
+
+@lru_cache(maxsize=256)
+def _cached_matcher(keywords: tuple) -> KeywordMatcher:
+    return KeywordMatcher(keywords)
+
+
+def get_keyword_matcher(keywords: Iterable[str]) -> KeywordMatcher:
+    """Shared matcher for a keyword set, built on first use."""
+    return _cached_matcher(tuple(dict.fromkeys(kw for kw in keywords if isinstance(kw, str))))
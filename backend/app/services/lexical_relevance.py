@@ -0,0 +1,62 @@
+"""
+Lexical relevance between a resume and a job description, for ATSScorer's
+"fast" profile (no embeddings, no network).
+
+The job description is indexed once: its sentences are the documents BM25
+estimates IDF from, so terms repeated across the posting count less than
+specific requirements. A resume is scored by the BM25-weighted share of JD
+terms it covers, with the usual term-frequency saturation and resume length
+normalization, on a 0-1 scale. Indexes are cached per job description.
+"""
+import math
+import re
+from collections import Counter
+from functools import lru_cache
+from typing import Dict, List
+
+from core.local_embeddings import STOPWORDS, TOKEN_RE
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercased terms without stopwords; keeps c++, c#, node.js."""
+    return [w for w in (t.rstrip(".") for t in TOKEN_RE.findall(text.lower())) if w and w not in STOPWORDS]
+
+
+class JDTermIndex:
+    """BM25 term statistics of one job description."""
+
+    K1 = 1.2
+    B = 0.75
+    AVG_RESUME_TERMS = 250  # length the resume normalization is relative to
+
+    def __init__(self, jd_text: str):
+        documents = [s for s in re.split(r"[.\n]", jd_text) if len(s.strip()) > 20] or [jd_text]
+        doc_freq = Counter(term for doc in documents for term in set(tokenize(doc)))
+        jd_terms = Counter(tokenize(jd_text))
+
+        n = len(documents)
+        self.weights: Dict[str, float] = {}
+        for term, tf in jd_terms.items():
+            df = doc_freq.get(term, 0)
+            idf = math.log(1 + (n - df + 0.5) / (df + 0.5))
+            self.weights[term] = idf * tf * (self.K1 + 1) / (tf + self.K1)
+        self.total_weight = sum(self.weights.values())
+
+    def score(self, resume_text: str) -> float:
+        """BM25-weighted share of JD terms covered by the resume (0-1)."""
+        if not self.total_weight:
+            return 0.0
+        terms = Counter(tokenize(resume_text))
+        norm = self.K1 * (1 - self.B + self.B * sum(terms.values()) / self.AVG_RESUME_TERMS)
+
+        covered = 0.0
+        for term in terms.keys() & self.weights.keys():
+            tf = terms[term]
+            covered += self.weights[term] * min(1.0, tf * (self.K1 + 1) / (tf + norm))
+        return covered / self.total_weight
+
+
+@lru_cache(maxsize=256)
+def get_jd_term_index(jd_text: str) -> JDTermIndex:
+    """Shared index for a job description, built on first use."""
+    return JDTermIndex(jd_text)
@@ -1,5 +1,5 @@
 import os
-from openai import OpenAI
+import asyncio
 from typing import Dict, List
 import json
 from dotenv import load_dotenv
@@ -9,6 +9,9 @@ from pathlib import Path
 # Add services directory to path to import AICompetitor
 sys.path.append(str(Path(__file__).parent))
 
+from core.providers import get_client, get_async_client, get_semaphore
+from app.services.observability import init_observability
+
 load_dotenv()
 
 
@@ -16,9 +19,13 @@ class ATSMatcher:
     """Service to match resume with job description using OpenAI"""
 
     def __init__(self):
-        self.client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+        init_observability()
         self.model = os.getenv("OPENAI_MODEL", "gpt-4-turbo-preview")
 
+    @property
+    def client(self):
+        return get_client("openai")
+
     def analyze_match(self, resume_text: str, job_description: str, difficulty_level: int = 30) -> Dict:
         """
         Analyze resume against job description and return comprehensive matching results
@@ -51,30 +58,10 @@ class ATSMatcher:
             ats_score_report = ai_competitor.ats_score_resume(enhanced_resume, ats_keywords_str)
 
             # Parse the ATS score
-            try:
-                ats_score_data = ai_competitor.parse_json_safe(ats_score_report)
-                final_ats_score = ats_score_data.get("final_score", 0)
-            except:
-                final_ats_score = 0
+            final_ats_score = self._final_score(ai_competitor, ats_score_report)
 
             # Generate basic analysis using OpenAI for missing skills and suggestions
-            prompt = self._create_analysis_prompt(resume_text, job_description)
-
-            response = self.client.chat.completions.create(
-                model=self.model,
-                messages=[
-                    {
-                        "role": "system",
-                        "content": "You are an expert ATS (Applicant Tracking System) analyzer and resume consultant. Provide detailed, actionable feedback in valid JSON format only."
-                    },
-                    {
-                        "role": "user",
-                        "content": prompt
-                    }
-                ],
-                temperature=0.3,
-                response_format={"type": "json_object"}
-            )
+            response = self.client.chat.completions.create(**self._analysis_request(resume_text, job_description))
 
             result = json.loads(response.choices[0].message.content)
 
@@ -90,6 +77,93 @@ class ATSMatcher:
         except Exception as e:
             raise Exception(f"Analysis error: {str(e)}")
 
+    async def aanalyze_match(self, resume_text: str, job_description: str, difficulty_level: int = 30) -> Dict:
+        """
+        Async variant of analyze_match. Every LLM and embedding call is awaited
+        through the async gateway, so the event loop keeps serving other
+        requests; the ATS-optimized resume and the analysis report run concurrently.
+        """
+        try:
+            async for event in self.astream_analysis(resume_text, job_description, difficulty_level, stream_tokens=False):
+                if event["event"] == "result":
+                    return event["data"]
+        except Exception as e:
+            raise Exception(f"Analysis error: {str(e)}")
+
+    async def astream_analysis(self, resume_text: str, job_description: str, difficulty_level: int = 30, stream_tokens: bool = True):
+        """
+        Run the async analysis as a stream of progress events (see
+        AICompetitor.astream_ats_optimized_resume). The last event is
+        "result", carrying the same dict analyze_match returns.
+        """
+        from app.services.generate_ai_competitor import AICompetitor
+
+        yield {"event": "stage", "data": {"stage": "keyword_extraction"}}
+        ai_competitor = await AICompetitor.acreate(resume_text, job_description, difficulty_level)
+
+        analysis_task = asyncio.ensure_future(self._aanalysis(resume_text, job_description))
+        try:
+            async for event in ai_competitor.astream_ats_optimized_resume(85, 3, stream_tokens):
+                if event["event"] == "optimized":
+                    enhanced_resume = event["data"]["resume"]
+                    skill_recommendations = event["data"]["skill_comparison"]
+                else:
+                    yield event
+
+            yield {"event": "stage", "data": {"stage": "final_scoring"}}
+            ats_keywords_list = ai_competitor.flatten_keywords_str(ai_competitor.ats_keywords)
+            ats_keywords_str = ", ".join(ats_keywords_list)
+            ats_score_report = await ai_competitor.aats_score_resume(enhanced_resume, ats_keywords_str)
+            final_ats_score = self._final_score(ai_competitor, ats_score_report)
+
+            yield {"event": "stage", "data": {"stage": "analysis"}}
+            response = await analysis_task
+        finally:
+            if not analysis_task.done():
+                analysis_task.cancel()
+
+        result = json.loads(response.choices[0].message.content)
+
+        result["enhanced_resume"] = enhanced_resume
+        result["skill_comparison"] = skill_recommendations
+        result["enhanced_ats_score"] = final_ats_score
+        result["ats_keywords"] = ai_competitor.ats_keywords
+        result["key_factors"] = await ai_competitor.aextract_factors()
+
+        yield {"event": "result", "data": result}
+
+    async def _aanalysis(self, resume_text: str, job_description: str):
+        async with get_semaphore("openai"):
+            return await get_async_client("openai").chat.completions.create(
+                **self._analysis_request(resume_text, job_description)
+            )
+
+    def _final_score(self, ai_competitor, ats_score_report) -> float:
+        try:
+            ats_score_data = ai_competitor.parse_json_safe(ats_score_report)
+            return ats_score_data.get("final_score", 0)
+        except:
+            return 0
+
+    def _analysis_request(self, resume_text: str, job_description: str) -> Dict:
+        """Chat completion kwargs for the missing-skills / suggestions report"""
+        prompt = self._create_analysis_prompt(resume_text, job_description)
+        return {
+            "model": self.model,
+            "messages": [
+                {
+                    "role": "system",
+                    "content": "You are an expert ATS (Applicant Tracking System) analyzer and resume consultant. Provide detailed, actionable feedback in valid JSON format only."
+                },
+                {
+                    "role": "user",
+                    "content": prompt
+                }
+            ],
+            "temperature": 0.3,
+            "response_format": {"type": "json_object"},
+        }
+
     def _create_analysis_prompt(self, resume_text: str, job_description: str) -> str:
         """Create detailed prompt for OpenAI analysis"""
         return f"""
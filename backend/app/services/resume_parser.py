@@ -1,6 +1,3 @@
-import PyPDF2
-import pdfplumber
-import docx
 import io
 from typing import Optional
 
@@ -11,6 +8,10 @@ class ResumeParser:
     @staticmethod
     def extract_text_from_pdf(file_content: bytes) -> str:
         """Extract text from PDF file using pdfplumber for better accuracy"""
+        # PDF/DOCX libraries are imported on first use to keep worker start-up fast
+        import pdfplumber
+        import PyPDF2
+
         try:
             with pdfplumber.open(io.BytesIO(file_content)) as pdf:
                 text = ""
@@ -31,6 +32,8 @@ class ResumeParser:
     @staticmethod
     def extract_text_from_docx(file_content: bytes) -> str:
         """Extract text from DOCX file"""
+        import docx
+
         try:
             doc = docx.Document(io.BytesIO(file_content))
             text = "\n".join([paragraph.text for paragraph in doc.paragraphs])
@@ -0,0 +1,133 @@
+"""
+Single-pass resume segmenter shared by ATSScorer, AICompetitor's ATS rule
+pack and SkillComparison.
+
+A resume is split into lines once. Lines that start with a section alias
+(optionally wrapped in markdown) open a section: a bare heading ("## Skills",
+"SKILLS & TOOLS"), a heading followed by a colon ("SKILLS: Python, Go",
+"Professional Summary: ...") or a capitalised heading followed by content
+("Summary Machine Learning Engineer ..."). Inline content is the first line
+of the body; the text up to the next heading follows, with bullet lines
+collected separately. The same pass records which sections are mentioned anywhere
+(what detect_sections reports) and the formatting signals the structure
+checks use. Results are cached per text and must be treated as read-only.
+"""
+import re
+from functools import lru_cache
+from typing import Dict, List
+
+from app.services.keyword_matcher import get_keyword_matcher
+
+SECTION_ALIASES = {
+    "SUMMARY": [
+        "summary", "professional summary", "profile", "about", "overview"
+    ],
+    "SKILLS": [
+        "skills", "technical skills", "core competencies", "expertise"
+    ],
+    "PROFESSIONAL EXPERIENCE": [
+        "professional experience", "experience", "work experience",
+        "employment history", "career history"
+    ],
+    "EDUCATION": [
+        "education", "academic background"
+    ],
+    "PROJECTS": [
+        "projects", "project experience"
+    ],
+    "CERTIFICATIONS": [
+        "certifications", "licenses"
+    ],
+}
+
+ALIAS_TO_SECTION = {alias: canonical for canonical, aliases in SECTION_ALIASES.items() for alias in aliases}
+
+UNICODE_BULLETS = re.compile(r"[•◆★▪➤✓✔]")
+BULLET_LINE = re.compile(r"^(?:[-*•◆★▪➤✓✔]|\d+[.)])\s*")
+
+
+_ALIAS_PATTERN = "|".join(
+    r"\s+".join(map(re.escape, alias.split()))
+    for alias in sorted(ALIAS_TO_SECTION, key=len, reverse=True)
+)
+HEADING_LINE = re.compile(rf"^[#*_\s]*({_ALIAS_PATTERN})(?![\w-])[*_]*(.*)$", re.I)
+
+
+def _heading(line: str):
+    """
+    (canonical section, heading, inline content) for a heading line, else
+    None. "SKILLS & TOOLS" is all heading; "Skills: Python" and "Summary
+    Machine Learning Engineer" carry content. Lowercase continuations
+    ("Experience with Kafka") are body text.
+    """
+    stripped = line.strip()
+    match = HEADING_LINE.match(stripped)
+    if not match:
+        return None
+    name = ALIAS_TO_SECTION[" ".join(match.group(1).lower().split())]
+    rest = match.group(2)
+    title, colon, content = rest.partition(":")
+    if colon and (title.isupper() or not title.strip("#*_ ")):
+        heading = stripped[:len(stripped) - len(rest) + len(title)].strip("#*_ ")
+        return name, heading, content.strip("#*_ ")
+    if title.isupper() or not rest.strip("#*_ "):
+        return name, stripped.strip("#*_: "), ""
+    content = rest.strip()
+    if not rest[:1].isspace() or not match.group(1)[0].isupper() or not content[0].isupper():
+        return None
+    return name, match.group(1), content
+
+
+def _add_line(section: Dict, stripped: str):
+    section["lines"].append(stripped)
+    if BULLET_LINE.match(stripped):
+        section["bullets"].append(BULLET_LINE.sub("", stripped, count=1))
+
+
+@lru_cache(maxsize=256)
+def segment_resume(text: str) -> Dict:
+    """
+    Section map of a resume:
+      sections        [{"name", "heading", "start", "end", "lines", "bullets", "text"}]
+                      in document order; start/end are character offsets of the
+                      section (heading line included), heading is the heading
+                      without inline content, text is the body (inline
+                      content first)
+      mentions        canonical sections whose alias occurs anywhere as a word
+      unicode_bullets whether non-ASCII bullet symbols occur
+      percent_count   number of "%" characters
+    """
+    sections: List[Dict] = []
+    offset = 0
+    for line in text.splitlines(keepends=True):
+        heading = _heading(line)
+        if heading:
+            name, heading_text, content = heading
+            if sections:
+                sections[-1]["end"] = offset
+            sections.append({
+                "name": name, "heading": heading_text, "start": offset, "end": len(text),
+                "lines": [], "bullets": [], "inline": content, "body_start": offset + len(line),
+            })
+            if content:
+                _add_line(sections[-1], content)
+        elif sections and line.strip():
+            _add_line(sections[-1], line.strip())
+        offset += len(line)
+
+    for section in sections:
+        body = text[section.pop("body_start"):section["end"]].strip()
+        section["text"] = "\n".join(part for part in (section.pop("inline"), body) if part)
+
+    mentioned = get_keyword_matcher(ALIAS_TO_SECTION).hits(text)
+    return {
+        "sections": sections,
+        "mentions": frozenset(ALIAS_TO_SECTION[alias] for alias in mentioned),
+        "unicode_bullets": bool(UNICODE_BULLETS.search(text)),
+        "percent_count": text.count("%"),
+    }
+
+
+def section_text(segments: Dict, name: str) -> str:
+    """Body text of every section with this canonical name, in document order."""
+    return "\n".join(s["text"] for s in segments["sections"] if s["name"] == name and s["text"])
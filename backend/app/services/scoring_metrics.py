@@ -0,0 +1,184 @@
+"""
+Per-component timing for ATSScorer.final_ats_score.
+
+Every score is timed by component (keyword, structure, semantic split into
+embed and compute, over-optimization), together with the number of embed
+calls and texts embedded. Finished timings are pushed to the registered
+metrics sinks: callables taking the timing dict. The default sink keeps
+running totals for /metrics; add_metrics_sink plugs in others (StatsD,
+OpenTelemetry, logs). Sink errors are printed and never fail a score.
+
+For profiling, component_profilers() makes every score in the block run
+each component under its own cProfile.Profile.
+"""
+import cProfile
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, List, Optional
+
+COMPONENTS = ("keyword", "structure", "semantic_embed", "semantic_compute", "overoptimization")
+
+
+class ScoreTimer:
+    """Timings of one final_ats_score call."""
+
+    def __init__(self, profile: str):
+        self.profile = profile
+        self.seconds: Dict[str, float] = {}
+        self.embed_seconds = 0.0
+        self.embed_calls = 0
+        self.embedded_texts = 0
+        self._started = time.perf_counter()
+        self._profilers = _profilers
+        self._active = None
+
+    def _switch_profiler(self, name):
+        """Profile into `name`'s profiler from now on; returns the previous one."""
+        previous = self._active
+        if self._profilers is not None:
+            if previous is not None:
+                self._profilers[previous].disable()
+            if name is not None:
+                self._profilers[name].enable()
+        self._active = name
+        return previous
+
+    @contextmanager
+    def measure(self, component: str):
+        # The semantic block profiles as compute; embed calls inside switch over
+        previous = self._switch_profiler("semantic_compute" if component == "semantic" else component)
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.seconds[component] = self.seconds.get(component, 0.0) + time.perf_counter() - start
+            self._switch_profiler(previous)
+
+    def record_embed(self, seconds: float, texts: int, calls: int = 1):
+        self.embed_seconds += seconds
+        self.embed_calls += calls
+        self.embedded_texts += texts
+
+    def wrap_embed(self, fn: Optional[Callable], batch: bool) -> Optional[Callable]:
+        """Embed function that records its calls, texts and time."""
+        if fn is None:
+            return None
+
+        def timed(arg):
+            previous = self._switch_profiler("semantic_embed")
+            start = time.perf_counter()
+            try:
+                return fn(arg)
+            finally:
+                self.record_embed(time.perf_counter() - start, len(arg) if batch else 1)
+                self._switch_profiler(previous)
+        return timed
+
+    def finish(self) -> Dict:
+        """Timing dict (milliseconds), pushed to every metrics sink."""
+        semantic = self.seconds.get("semantic", 0.0)
+        timings = {
+            "profile": self.profile,
+            "total_ms": (time.perf_counter() - self._started) * 1000,
+            "keyword_ms": self.seconds.get("keyword", 0.0) * 1000,
+            "structure_ms": self.seconds.get("structure", 0.0) * 1000,
+            "semantic_ms": semantic * 1000,
+            "semantic_embed_ms": self.embed_seconds * 1000,
+            "semantic_compute_ms": max(0.0, semantic - self.embed_seconds) * 1000,
+            "overoptimization_ms": self.seconds.get("overoptimization", 0.0) * 1000,
+            "embed_calls": self.embed_calls,
+            "embedded_texts": self.embedded_texts,
+        }
+        emit_timings(timings)
+        return timings
+
+
+# -----------------------------
+# Metrics sinks
+# -----------------------------
+class ScoringStats:
+    """Default sink: running count, mean and max per component."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.scores = 0
+            self.embed_calls = 0
+            self.embedded_texts = 0
+            self.total_ms: Dict[str, float] = {}
+            self.max_ms: Dict[str, float] = {}
+
+    def __call__(self, timings: Dict):
+        with self._lock:
+            self.scores += 1
+            self.embed_calls += timings["embed_calls"]
+            self.embedded_texts += timings["embedded_texts"]
+            for key, value in timings.items():
+                if key.endswith("_ms"):
+                    self.total_ms[key] = self.total_ms.get(key, 0.0) + value
+                    self.max_ms[key] = max(self.max_ms.get(key, 0.0), value)
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {
+                "scores": self.scores,
+                "embed_calls": self.embed_calls,
+                "embedded_texts": self.embedded_texts,
+                "mean_ms": {k: v / self.scores for k, v in self.total_ms.items()} if self.scores else {},
+                "max_ms": dict(self.max_ms),
+            }
+
+
+_scoring_stats = ScoringStats()
+_sinks: List[Callable[[Dict], None]] = [_scoring_stats]
+_sinks_lock = threading.Lock()
+
+
+def add_metrics_sink(sink: Callable[[Dict], None]):
+    with _sinks_lock:
+        _sinks.append(sink)
+
+
+def remove_metrics_sink(sink: Callable[[Dict], None]):
+    with _sinks_lock:
+        if sink in _sinks:
+            _sinks.remove(sink)
+
+
+def emit_timings(timings: Dict):
+    with _sinks_lock:
+        sinks = list(_sinks)
+    for sink in sinks:
+        try:
+            sink(timings)
+        except Exception as e:
+            print(f"Scoring metrics sink {sink!r} failed: {e}")
+
+
+def scoring_stats() -> Dict:
+    return _scoring_stats.stats()
+
+
+# -----------------------------
+# Profiling
+# -----------------------------
+_profilers: Optional[Dict[str, cProfile.Profile]] = None
+
+
+@contextmanager
+def component_profilers():
+    """
+    Profile every score inside the block per component. Yields a dict of
+    component -> cProfile.Profile (feed each to pstats.Stats). Single-threaded
+    use only: cProfile allows one active profiler at a time.
+    """
+    global _profilers
+    _profilers = {name: cProfile.Profile() for name in COMPONENTS}
+    try:
+        yield _profilers
+    finally:
+        _profilers = None
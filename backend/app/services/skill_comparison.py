@@ -1,6 +1,8 @@
 from typing import Dict, List
 import re
-from core.model import generate_llm_response, generate_embedding
+from core.routing import route_llm_response, aroute_llm_response
+from app.services.keyword_matcher import get_keyword_matcher
+from app.services.resume_sections import segment_resume
 
 class SkillComparison:
     def __init__(self, resume_text: str, jd_text: str, ats_keywords: Dict[str, List[str]]):
@@ -28,31 +30,25 @@ class SkillComparison:
         jd_processed = self._preprocess_text(jd_text)
 
         stats: List[Dict[str, int|str]] = []
-        jd_keywords = self._flatten_keywords_str(self.ats_keywords)
+        jd_keywords = [keyword.strip().lower() for keyword in self._flatten_keywords_str(self.ats_keywords)]
+
+        # One pass per text for all keywords
+        matcher = get_keyword_matcher(jd_keywords)
+        resume_counts = matcher.counts(resume_processed)
+        job_counts = matcher.counts(jd_processed)
 
         for keyword in jd_keywords:
-            keyword = keyword.strip().lower()
-            pattern = re.compile(rf"(?<!\w){re.escape(keyword)}(?!\w)")
-            resume_mentions = len(pattern.findall(resume_processed))
-            job_mentions = len(pattern.findall(jd_processed))
             stats.append(
                 {
                     "skill": keyword,
-                    "resume_mentions": resume_mentions,
-                    "job_mentions": job_mentions,
+                    "resume_mentions": resume_counts.get(keyword, 0),
+                    "job_mentions": job_counts.get(keyword, 0),
                 }
             )
         return stats
     
     def _has_summary_section(self, resume_text: str) -> bool:
-        heading_pattern = re.compile(
-            r"^\s{0,3}(?:#{1,3}|\*\*|__)?\s*(professional\s+)?(summary|profile|overview)\b",
-            re.IGNORECASE,
-        )
-        for line in resume_text.splitlines():
-            if heading_pattern.search(line.strip()):
-                return True
-        return False
+        return any(s["name"] == "SUMMARY" for s in segment_resume(resume_text)["sections"])
 
     def _build_ats_recommendations(
         self, stats: List[Dict[str, int | str]], resume_text: str
@@ -107,7 +103,7 @@ class SkillComparison:
             )
         return "\n".join(lines)
     
-    def generate_skill_comparison(self) -> str:
+    def _skill_comparison_prompts(self):
         stats = self._build_skill_comparision_set(self.resume_text, self.jd_text)
         recommendations = self._build_ats_recommendations(stats, self.resume_text)
         skill_priority_text = self._build_skill_priority_text(stats)
@@ -128,7 +124,16 @@ class SkillComparison:
 
         Given the skill comparison stats and ATS recommendations, generate a concise summary highlighting the key areas for improvement.
         """
+        return SYSTEM_PROMPT, USER_PROMPT
+
+    def generate_skill_comparison(self) -> str:
+        SYSTEM_PROMPT, USER_PROMPT = self._skill_comparison_prompts()
+        llm_recomendation = route_llm_response("skill_comparison", SYSTEM_PROMPT, USER_PROMPT)
+
+        return llm_recomendation
 
-        llm_recomendation = generate_llm_response(SYSTEM_PROMPT, USER_PROMPT, llm_type="openai_reasoning")
+    async def agenerate_skill_comparison(self) -> str:
+        SYSTEM_PROMPT, USER_PROMPT = self._skill_comparison_prompts()
+        llm_recomendation = await aroute_llm_response("skill_comparison", SYSTEM_PROMPT, USER_PROMPT)
 
-        return llm_recomendation
\ No newline at end of file
+        return llm_recomendation
@@ -0,0 +1,58 @@
+"""
+Bundled sample audio for the transcription benchmarks.
+
+benchmarks/data/sample_speech.wav is a 16 kHz mono clip of speech-like voiced
+segments separated by pauses, so silence splitting and trimming have
+something to work on. It is synthetic (no real words); the benchmarks measure
+latency, not accuracy. Regenerate it with:
+
+    python -m benchmarks.audio_sample
+"""
+import sys
+from pathlib import Path
+
+import numpy as np
+
+sys.path.append(str(Path(__file__).parent.parent))
+
+from core.audio import SAMPLE_RATE, write_wav
+
+SAMPLE_AUDIO = Path(__file__).parent / "data" / "sample_speech.wav"
+
+# (seconds of speech, seconds of pause after it)
+SEGMENTS = [(0.6, 0.0), (2.2, 0.7), (1.6, 1.2), (2.8, 0.5), (1.4, 1.5), (2.0, 0.8)]
+
+
+def _voiced(seconds, rng):
+    """Harmonic tone with a wandering pitch and syllable-rate amplitude envelope."""
+    t = np.arange(int(seconds * SAMPLE_RATE)) / SAMPLE_RATE
+    pitch = 140 + 30 * np.sin(2 * np.pi * rng.uniform(0.3, 0.8) * t)
+    phase = 2 * np.pi * np.cumsum(pitch) / SAMPLE_RATE
+    signal = sum(np.sin(k * phase) / k for k in range(1, 12))
+    syllables = 0.55 + 0.45 * np.sin(2 * np.pi * rng.uniform(3.0, 5.0) * t) ** 2
+    fade = np.minimum(1.0, np.minimum(t, t[-1] - t) / 0.05)
+    return 0.25 * signal * syllables * fade
+
+
+def synth_sample(seed=7) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    parts = [np.zeros(int(0.4 * SAMPLE_RATE))]
+    for speech, pause in SEGMENTS:
+        parts.append(_voiced(speech, rng))
+        parts.append(np.zeros(int(pause * SAMPLE_RATE)))
+    audio = np.concatenate(parts)
+    audio += rng.normal(0, 0.002, audio.shape)  # room noise floor
+    return audio.astype(np.float32)
+
+
+def ensure_sample_audio() -> Path:
+    if not SAMPLE_AUDIO.exists():
+        SAMPLE_AUDIO.parent.mkdir(parents=True, exist_ok=True)
+        write_wav(SAMPLE_AUDIO, synth_sample())
+    return SAMPLE_AUDIO
+
+
+if __name__ == "__main__":
+    SAMPLE_AUDIO.parent.mkdir(parents=True, exist_ok=True)
+    write_wav(SAMPLE_AUDIO, synth_sample())
+    print(f"Wrote {SAMPLE_AUDIO}")
@@ -0,0 +1,74 @@
+"""
+Benchmark: silence trimming before transcription.
+
+For each file, transcribes once with the full decoded audio and once with
+only the detected speech, and reports the seconds removed and the speedup.
+Without --files it uses the bundled sample plus a variant padded with long
+leading/trailing silence and pauses (the shape of typical uploads).
+
+    python -m benchmarks.bench_audio_trim
+    python -m benchmarks.bench_audio_trim --backend whisper --files a.wav b.mp3
+"""
+import argparse
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+import numpy as np
+
+sys.path.append(str(Path(__file__).parent.parent))
+os.environ["TRANSCRIPT_CACHE_ENABLED"] = "false"  # measure transcription, not cache hits
+
+from benchmarks.audio_sample import SAMPLE_RATE, ensure_sample_audio
+from core.audio import load_audio, write_wav
+
+
+def padded_sample(path):
+    """Bundled sample with 20s of lead-in, 10s pauses between repeats and a 30s tail."""
+    sample = load_audio(ensure_sample_audio())
+    rng = np.random.default_rng(3)
+
+    def silence(seconds):
+        return rng.normal(0, 0.002, int(seconds * SAMPLE_RATE)).astype(np.float32)
+
+    write_wav(path, np.concatenate([silence(20), sample, silence(10), sample, silence(30)]))
+    return path
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--backend", default="whisper")
+    parser.add_argument("--model-size", default=None)
+    parser.add_argument("--files", nargs="*")
+    args = parser.parse_args()
+
+    from core.model import transcribe_audio_detailed, load_STT_model
+
+    if args.backend == "whisper":
+        load_STT_model("whisper", args.model_size)  # keep model loading out of the timings
+
+    with tempfile.TemporaryDirectory() as tmp:
+        files = args.files or [str(ensure_sample_audio()), padded_sample(os.path.join(tmp, "padded.wav"))]
+
+        rows = []
+        for path in files:
+            full = transcribe_audio_detailed(path, args.backend, args.model_size, chunked=False, trim=False)
+            trimmed = transcribe_audio_detailed(path, args.backend, args.model_size, chunked=False, trim=True)
+            if not full or not trimmed:
+                print(f"Transcription failed for {path}")
+                continue
+            rows.append((Path(path).name, trimmed, full))
+
+    print()
+    print(f"{'file':<24} {'audio':>8} {'removed':>9} {'full':>8} {'trimmed':>8} {'speedup':>8}")
+    for name, trimmed, full in rows:
+        print(
+            f"{name:<24} {trimmed['original_seconds']:7.1f}s {trimmed['removed_seconds']:8.1f}s "
+            f"{full['transcribe_seconds']:7.2f}s {trimmed['transcribe_seconds']:7.2f}s "
+            f"{full['transcribe_seconds'] / max(trimmed['transcribe_seconds'], 1e-9):7.2f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+"""
+Benchmark: ranking a resume pool against one job description with a loop of
+ATSScorer.final_ats_score (+ semantic_score) calls versus BatchATSScorer.
+
+Generates a synthetic pool from the sample resumes (shuffled skills and
+bullets, varied metrics), checks that both paths produce the same report
+for every resume, and reports resumes scored per second. Uses the offline
+local embedding backend so the numbers measure the scoring work.
+
+    python -m benchmarks.bench_batch_scoring --resumes 2000 --workers 1,4
+"""
+import argparse
+import os
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).parent.parent))
+os.environ["EMBEDDING_STORE_ENABLED"] = "false"  # every path embeds its own texts
+
+from benchmarks.bench_embedding_precision import KEYWORDS, RESUMES
+from benchmarks.load_test_async import SAMPLE_JD
+
+SKILLS = ["Python", "PyTorch", "SQL", "Docker", "Kubernetes", "AWS", "React", "TypeScript", "Airflow", "Spark", "Terraform", "pandas"]
+BULLETS = [
+    "- Built demand forecasting models serving millions of users",
+    "- Led migration of training pipelines to Kubernetes and cut costs by 20%",
+    "- Shipped a feature store used by six product teams",
+    "- Reduced p95 latency of the ranking service by 35%",
+    "- Mentored four engineers and ran the on-call rotation",
+    "- Automated data quality checks for nightly Spark jobs on AWS",
+]
+
+
+def synthetic_pool(n, seed=7):
+    rng = random.Random(seed)
+    bases = list(RESUMES.values())
+    pool = []
+    for i in range(n):
+        skills = ", ".join(rng.sample(SKILLS, rng.randint(4, 9)))
+        bullets = "\n".join(rng.sample(BULLETS, rng.randint(2, 5)))
+        pool.append(
+            f"{bases[i % len(bases)]}\nSKILLS\n{skills}\n\nPROJECTS\n{bullets}\n"
+            f"- Candidate {i} improved throughput by {rng.randint(5, 60)}%\n"
+        )
+    return pool
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--resumes", type=int, default=2000)
+    parser.add_argument("--workers", default=f"1,{os.cpu_count() or 1}")
+    parser.add_argument("--loop-sample", type=int, default=200, help="resumes scored with the per-resume loop")
+    args = parser.parse_args()
+
+    from app.services.ats_scorer import ATSScorer
+    from app.services.batch_scorer import BatchATSScorer
+    from core.model import generate_embeddings
+
+    def embed_batch_fn(texts):
+        return generate_embeddings(texts, llm_type="local")
+
+    pool = synthetic_pool(args.resumes)
+    scorer = ATSScorer()
+
+    sample = pool[:args.loop_sample]
+    start = time.perf_counter()
+    expected = []
+    for resume in sample:
+        report = scorer.final_ats_score(resume, SAMPLE_JD, KEYWORDS, embed_batch_fn=embed_batch_fn)
+        report["chunked_semantic_score"] = int(scorer.semantic_score(resume, SAMPLE_JD, embed_batch_fn=embed_batch_fn) * 100)
+        expected.append(report)
+    loop_rate = len(sample) / (time.perf_counter() - start)
+
+    batch = BatchATSScorer(SAMPLE_JD, KEYWORDS, embed_batch_fn=embed_batch_fn, workers=1)
+    scores = batch.score(sample)["scores"]
+    mismatches = [
+        (i, field, report[field], int(scores[field][i]))
+        for i, report in enumerate(expected)
+        for field in report
+        if report[field] != int(scores[field][i])
+    ]
+    print(f"Report mismatches vs final_ats_score on {len(sample)} resumes: {mismatches[:5] or 'none'}\n")
+
+    print(f"{'path':<22} {'resumes':>8} {'seconds':>8} {'resumes/s':>10}")
+    print(f"{'final_ats_score loop':<22} {len(sample):>8} {len(sample) / loop_rate:8.2f} {loop_rate:10.0f}")
+    for workers in (int(w) for w in args.workers.split(",")):
+        start = time.perf_counter()
+        batch = BatchATSScorer(SAMPLE_JD, KEYWORDS, embed_batch_fn=embed_batch_fn, workers=workers)
+        stats = batch.score(pool)["stats"]
+        seconds = time.perf_counter() - start
+        print(f"{f'batch, {workers} worker(s)':<22} {len(pool):>8} {seconds:8.2f} {len(pool) / seconds:10.0f}"
+              f"   (analysis {stats['analyze_seconds']:.2f}s)")
+
+
+if __name__ == "__main__":
+    main()
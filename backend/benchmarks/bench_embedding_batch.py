@@ -0,0 +1,76 @@
+"""
+Benchmark: embedding round trips and wall time per scoring call, one text per
+request (embed_fn=generate_embedding) versus batched requests
+(embed_batch_fn=generate_embeddings), against the local stub provider.
+
+Covers ATSScorer.final_ats_score, ATSScorer.semantic_score and
+AICompetitor.semantic_gap_terms on the load-test sample resume and JD.
+
+    python -m benchmarks.bench_embedding_batch --latency-ms 50 --calls 20
+"""
+import argparse
+import os
+import sys
+import time
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).parent.parent))
+
+from benchmarks.load_test_async import SAMPLE_JD, SAMPLE_RESUME
+from benchmarks.stub_server import start_stub_server
+
+KEYWORDS = [["Python", "PyTorch", "Kubernetes", "AWS", "MLOps", "data pipelines"]]
+
+
+def measure(server, fn, calls):
+    """(round trips per call, ms per call)"""
+    fn()  # warm-up (imports, first connection)
+    server.request_count = 0
+    start = time.perf_counter()
+    for _ in range(calls):
+        fn()
+    elapsed = time.perf_counter() - start
+    return server.request_count / calls, elapsed / calls * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--calls", type=int, default=20)
+    parser.add_argument("--latency-ms", type=float, default=50.0)
+    args = parser.parse_args()
+
+    server, base_url = start_stub_server(latency=args.latency_ms / 1000)
+    os.environ["OPENAI_BASE_URL"] = base_url
+    os.environ["OPENAI_API_KEY"] = "stub-key"
+    os.environ["OPENAI_EMBEDDING_MODEL"] = "stub-embedding"
+    os.environ["EMBEDDING_STORE_ENABLED"] = "false"  # measure requests, not store hits
+    os.environ.pop("PHOENIX_API_KEY", None)
+
+    from app.services.ats_scorer import ATSScorer
+    from app.services.generate_ai_competitor import AICompetitor
+    from core.model import generate_embedding, generate_embeddings
+
+    scorer = ATSScorer()
+    competitor = AICompetitor(SAMPLE_RESUME, SAMPLE_JD, 1, ats_keywords=KEYWORDS)
+    cases = {
+        "final_ats_score": lambda **embed: scorer.final_ats_score(SAMPLE_RESUME, SAMPLE_JD, KEYWORDS, **embed),
+        "semantic_score": lambda **embed: scorer.semantic_score(SAMPLE_RESUME, SAMPLE_JD, **embed),
+        "semantic_gap_terms": lambda **embed: competitor.semantic_gap_terms(SAMPLE_RESUME, SAMPLE_JD, **embed),
+    }
+
+    print(f"Stub provider at {base_url}, {args.latency_ms:.0f} ms per request\n")
+    print(f"{'call':<20} {'trips before':>12} {'trips after':>12} {'ms before':>10} {'ms after':>10} {'speedup':>8}")
+    try:
+        for name, case in cases.items():
+            trips_before, ms_before = measure(server, lambda: case(embed_fn=generate_embedding), args.calls)
+            trips_after, ms_after = measure(server, lambda: case(embed_batch_fn=generate_embeddings), args.calls)
+            print(
+                f"{name:<20} {trips_before:12.1f} {trips_after:12.1f} {ms_before:10.1f} {ms_after:10.1f} "
+                f"{ms_before / max(ms_after, 1e-9):7.2f}x"
+            )
+    finally:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,142 @@
+"""
+Evaluation: ATS score drift of compact embeddings versus full precision.
+
+Embeds a fixed resume/JD set once at full width and float32, then rescores
+every pair with the vectors reduced to fewer dimensions (truncated and
+renormalized, which is what the API's `dimensions` option returns for
+text-embedding-3 models) and/or stored as float16 / int8. Reports bytes
+per vector, the mean and max absolute drift of the semantic components and
+final score (points on the 0-100 scale), and how often the best-matching JD
+per resume changes.
+
+    python -m benchmarks.bench_embedding_precision                   # offline, local backend
+    python -m benchmarks.bench_embedding_precision --backend openai  # real embeddings
+"""
+import argparse
+import os
+import sys
+from pathlib import Path
+
+import numpy as np
+
+sys.path.append(str(Path(__file__).parent.parent))
+os.environ["EMBEDDING_STORE_ENABLED"] = "false"  # compare encodings, not store hits
+
+from benchmarks.bench_local_embeddings import UNRELATED_JD
+from benchmarks.load_test_async import SAMPLE_JD, SAMPLE_RESUME
+
+RESUMES = {
+    "ml_engineer": SAMPLE_RESUME,
+    "frontend": """Jane Roe
+Frontend Engineer
+
+SUMMARY
+Frontend engineer building accessible, fast web applications for e-commerce teams.
+
+SKILLS
+TypeScript, React, Next.js, CSS, GraphQL, Jest, Webpack
+
+PROFESSIONAL EXPERIENCE
+- Rebuilt the checkout flow in React and cut page load time by forty percent
+- Introduced a shared component library and visual regression tests in CI
+
+EDUCATION
+BSc Computer Science
+""",
+    "data_analyst": """Sam Lee
+Data Analyst
+
+SUMMARY
+Analyst turning product and marketing data into dashboards and experiment readouts.
+
+SKILLS
+SQL, Python, pandas, Tableau, A/B testing, dbt, Excel
+
+PROFESSIONAL EXPERIENCE
+- Built weekly revenue dashboards in Tableau used by the executive team
+- Designed and analysed pricing experiments across three markets
+
+EDUCATION
+BA Economics
+""",
+}
+
+JDS = {
+    "ml_engineer": SAMPLE_JD,
+    "frontend": """We need a Frontend Engineer to own our React and TypeScript storefront.
+You will build reusable components, improve Core Web Vitals and write tests with Jest.
+Experience with Next.js, GraphQL and design systems is a strong plus.
+""",
+    "pastry_chef": UNRELATED_JD,
+}
+
+KEYWORDS = [["Python", "React", "TypeScript", "SQL", "Kubernetes", "AWS"]]
+
+
+def truncate(matrix, dim):
+    if not dim or dim >= matrix.shape[1]:
+        return matrix
+    reduced = matrix[:, :dim]
+    norms = np.linalg.norm(reduced, axis=1, keepdims=True)
+    return reduced / np.where(norms == 0, 1, norms)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--backend", default="local", help="embedding backend for the reference vectors (local or openai)")
+    parser.add_argument("--dims", default="512,256", help="reduced widths to evaluate")
+    args = parser.parse_args()
+
+    from app.services.ats_scorer import ATSScorer
+    from core.embedding_store import quantize_vectors
+    from core.model import generate_embeddings
+
+    scorer = ATSScorer()
+    reference = {}
+
+    def full(texts):
+        missing = [t for t in dict.fromkeys(texts) if t not in reference]
+        if missing:
+            reference.update(zip(missing, generate_embeddings(missing, llm_type=args.backend)))
+        return np.asarray([reference[t] for t in texts], dtype=np.float32)
+
+    def variant(dim, dtype):
+        def embed_batch_fn(texts):
+            return list(quantize_vectors(truncate(full(texts), dim), dtype))
+        return embed_batch_fn
+
+    def score_all(embed_batch_fn):
+        results = {}
+        for r_name, resume in RESUMES.items():
+            for j_name, jd in JDS.items():
+                report = scorer.final_ats_score(resume, jd, KEYWORDS, embed_batch_fn=embed_batch_fn)
+                chunked = scorer.semantic_score(resume, jd, embed_batch_fn=embed_batch_fn) * 100
+                results[r_name, j_name] = (report["semantic_score"], chunked, report["final_score"])
+        return results
+
+    def best_jd(results):
+        return {r: max(JDS, key=lambda j: results[r, j][1]) for r in RESUMES}
+
+    baseline = score_all(variant(None, "float32"))
+    width = len(next(iter(reference.values())))
+    variants = [(None, "float16"), (None, "int8")]
+    for dim in (int(d) for d in args.dims.split(",") if int(d) < width):
+        variants += [(dim, "float32"), (dim, "int8")]
+
+    print(f"Backend: {args.backend}, {width} dims, {len(RESUMES)} resumes x {len(JDS)} JDs\n")
+    print(f"{'encoding':<16} {'bytes':>6} {'cosine drift':>14} {'chunked drift':>15} {'final drift':>13} {'best JD kept':>13}")
+    print(f"{'':<16} {'':>6} {'mean':>6} {'max':>7} {'mean':>7} {'max':>7} {'mean':>6} {'max':>6}")
+    for dim, dtype in [(None, "float32")] + variants:
+        results = score_all(variant(dim, dtype))
+        drift = np.abs(np.array([results[k] for k in baseline]) - np.array([baseline[k] for k in baseline]))
+        kept = sum(a == b for a, b in zip(best_jd(results).values(), best_jd(baseline).values()))
+        label = f"{dim or width}d {dtype}"
+        print(
+            f"{label:<16} {(dim or width) * np.dtype(dtype).itemsize:>6} "
+            f"{drift[:, 0].mean():6.2f} {drift[:, 0].max():7.2f} {drift[:, 1].mean():7.2f} {drift[:, 1].max():7.2f} "
+            f"{drift[:, 2].mean():6.2f} {drift[:, 2].max():6.2f} {kept:>8}/{len(RESUMES)}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+"""
+Benchmark: ATSScorer.final_ats_score with the "fast" (lexical BM25) profile
+versus the "full" (embedding) profile.
+
+Times fast scoring per resume over a synthetic pool of distinct resumes (so
+the segmenter cache does not help) with the JD index warm, then compares the
+semantic component of both profiles on the fixed resume/JD set: the scores
+side by side and whether the best-matching JD per resume agrees.
+
+    python -m benchmarks.bench_fast_profile                   # full profile on the local backend
+    python -m benchmarks.bench_fast_profile --backend openai  # full profile on real embeddings
+"""
+import argparse
+import os
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+sys.path.append(str(Path(__file__).parent.parent))
+os.environ["EMBEDDING_STORE_ENABLED"] = "false"
+
+from benchmarks.bench_batch_scoring import synthetic_pool
+from benchmarks.bench_embedding_precision import JDS, KEYWORDS, RESUMES
+from benchmarks.load_test_async import SAMPLE_JD
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--resumes", type=int, default=2000)
+    parser.add_argument("--backend", default="local", help="embedding backend for the full profile (local or openai)")
+    args = parser.parse_args()
+
+    from app.services.ats_scorer import ATSScorer
+    from app.services.lexical_relevance import get_jd_term_index
+    from core.model import generate_embeddings
+
+    scorer = ATSScorer()
+    pool = synthetic_pool(args.resumes, seed=11)
+
+    start = time.perf_counter()
+    get_jd_term_index(SAMPLE_JD)
+    index_ms = (time.perf_counter() - start) * 1000
+
+    timings = []
+    for resume in pool:
+        start = time.perf_counter()
+        scorer.final_ats_score(resume, SAMPLE_JD, KEYWORDS, profile="fast")
+        timings.append((time.perf_counter() - start) * 1000)
+    timings = np.array(timings)
+    print(f"JD index build: {index_ms:.2f}ms")
+    print(f"fast final_ats_score over {len(pool)} resumes: "
+          f"mean {timings.mean():.3f}ms  p50 {np.percentile(timings, 50):.3f}ms  p99 {np.percentile(timings, 99):.3f}ms\n")
+
+    def embed_batch_fn(texts):
+        return generate_embeddings(texts, llm_type=args.backend)
+
+    print(f"{'resume':<14} {'JD':<14} {'full semantic':>14} {'fast semantic':>14}")
+    full, fast = {}, {}
+    for r_name, resume in RESUMES.items():
+        for j_name, jd in JDS.items():
+            full[r_name, j_name] = scorer.final_ats_score(resume, jd, KEYWORDS, embed_batch_fn=embed_batch_fn, profile="full")["semantic_score"]
+            fast[r_name, j_name] = scorer.final_ats_score(resume, jd, KEYWORDS, profile="fast")["semantic_score"]
+            print(f"{r_name:<14} {j_name:<14} {full[r_name, j_name]:>14} {fast[r_name, j_name]:>14}")
+
+    agree = sum(
+        max(JDS, key=lambda j: full[r, j]) == max(JDS, key=lambda j: fast[r, j])
+        for r in RESUMES
+    )
+    print(f"\nBest JD per resume agrees: {agree}/{len(RESUMES)}")
+
+
+if __name__ == "__main__":
+    main()
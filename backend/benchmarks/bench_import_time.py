@@ -0,0 +1,110 @@
+"""
+Import-time benchmark for worker cold start, driven by `python -X importtime`.
+
+Imports each target module in a fresh interpreter, reports its cumulative
+import time and the heaviest modules it pulled in, and fails (exit 1) when a
+target exceeds its budget or imports a dependency that must stay lazy.
+
+    python -m benchmarks.bench_import_time
+    python -m benchmarks.bench_import_time --target app.main --budget-ms 800 --repeat 5
+"""
+import argparse
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).parent.parent
+
+# API worker and CLI entry points, with their cold-start budgets (ms)
+DEFAULT_TARGETS = {
+    "app.main": 1500,
+    "core.model": 600,
+    "app.services.generate_ai_competitor": 800,
+    "resume_match.generate_ai_competitor": 800,
+}
+
+# Heavy dependencies that must only load on first use
+LAZY_MODULES = [
+    "whisper",
+    "torch",
+    "sklearn",
+    "scipy",
+    "pdfplumber",
+    "PyPDF2",
+    "docx",
+    "fpdf",
+    "opentelemetry.exporter",
+    "openinference",
+]
+
+
+def parse_importtime(stderr):
+    """[(module, self_us, cumulative_us)] from -X importtime output."""
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        rows.append((name.strip(), int(self_us), int(cumulative_us)))
+    return rows
+
+
+def measure(target):
+    """Import `target` in a fresh interpreter; returns (cumulative_ms, rows)."""
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {target}"],
+        cwd=BACKEND_DIR,
+        capture_output=True,
+        text=True,
+    )
+    rows = parse_importtime(proc.stderr)
+    if proc.returncode != 0:
+        errors = [line for line in proc.stderr.splitlines() if not line.startswith("import time:")]
+        raise RuntimeError(f"import {target} failed:\n" + "\n".join(errors[-5:]))
+    cumulative = next(c for name, _, c in reversed(rows) if name == target)
+    return cumulative / 1000, rows
+
+
+def lazy_violations(rows):
+    names = {name for name, _, _ in rows}
+    return sorted(
+        lazy for lazy in LAZY_MODULES
+        if any(name == lazy or name.startswith(lazy + ".") for name in names)
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--target", action="append", help="module to import (repeatable)")
+    parser.add_argument("--budget-ms", type=float, help="budget for every --target")
+    parser.add_argument("--repeat", type=int, default=3, help="fresh interpreters per target (median is reported)")
+    parser.add_argument("--top", type=int, default=10, help="heaviest modules to list")
+    args = parser.parse_args()
+
+    targets = {t: args.budget_ms or DEFAULT_TARGETS.get(t, 1000) for t in args.target} if args.target else dict(DEFAULT_TARGETS)
+    failed = False
+
+    for target, budget in targets.items():
+        samples = []
+        rows = []
+        for _ in range(args.repeat):
+            elapsed, rows = measure(target)
+            samples.append(elapsed)
+        median = statistics.median(samples)
+        violations = lazy_violations(rows)
+        ok = median <= budget and not violations
+        failed |= not ok
+
+        print(f"{target:<36} {median:8.1f} ms  (budget {budget:.0f} ms, {len(rows)} modules)  {'OK' if ok else 'FAIL'}")
+        for name, self_us, cumulative_us in sorted(rows, key=lambda r: r[1], reverse=True)[:args.top]:
+            print(f"    {self_us / 1000:8.1f} ms self  {cumulative_us / 1000:8.1f} ms cumulative  {name}")
+        if violations:
+            print(f"    eagerly imported (should be lazy): {', '.join(violations)}")
+        print()
+
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+"""
+Micro-benchmark: keyword counting with one regex scan per keyword (previous
+ATSScorer / SkillComparison code) versus the shared one-pass KeywordMatcher.
+
+Checks that both report the same counts under (?<!\\w)kw(?!\\w) semantics,
+then times a keyword_match_score + over_optimization_penalty worth of work
+for 60 and 100 keywords.
+
+    python -m benchmarks.bench_keyword_matching --keywords 60,100
+"""
+import argparse
+import re
+import sys
+import time
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).parent.parent))
+
+from benchmarks.load_test_async import SAMPLE_RESUME
+from app.services.keyword_matcher import KeywordMatcher, get_keyword_matcher
+
+VOCABULARY = [
+    "python", "pytorch", "tensorflow", "docker", "kubernetes", "aws", "sql", "machine learning",
+    "learning", "deep learning", "data pipelines", "pipelines", "mlops", "c++", "c#", "node.js",
+    "ci/cd", "react", "typescript", "spark", "airflow", "kafka", "terraform", "gcp", "azure",
+    "forecasting", "demand forecasting", "models", "training pipelines", "production ml",
+    "experiment tracking", "feature store", "a/b testing", "statistics", "pandas", "numpy",
+    "scikit-learn", "xgboost", "llm", "nlp", "computer vision", "recommendation systems",
+    "microservices", "rest apis", "graphql", "postgresql", "redis", "linux", "bash", "git",
+    "agile", "scrum", "leadership", "mentoring", "cost optimization", "marketplace", "mathematics",
+    "bsc", "engineer", "migration", "monitoring", "observability", "grafana", "prometheus",
+    "snowflake", "dbt", "tableau", "looker", "excel", "java", "scala", "go", "rust", "ray",
+    "onnx", "triton", "cuda", "gpu", "distributed training", "feature engineering", "etl",
+    "data modeling", "dashboards", "security", "compliance", "hipaa", "gdpr", "serverless",
+    "lambda", "s3", "ec2", "sagemaker", "vertex ai", "bigquery", "databricks", "delta lake",
+    "iceberg", "flink", "beam", "hadoop", "hive", "presto",
+]
+
+RESUME = SAMPLE_RESUME * 4 + "Also C++, C#, Node.js and CI/CD; ci/cd pipelines on AWS (aws-cdk).\n"
+
+
+def per_keyword_counts(keywords, text):
+    return {
+        kw: len(re.findall(rf"(?<!\w){re.escape(kw)}(?!\w)", text, re.I))
+        for kw in keywords
+    }
+
+
+def old_scoring(keywords, text):
+    # keyword_match_score + over_optimization_penalty before the shared matcher
+    hits = sum(1 for kw in keywords if re.search(rf"\b{re.escape(kw)}\b", text, re.I))
+    counts = [len(re.findall(rf"\b{re.escape(kw)}\b", text, re.I)) for kw in keywords]
+    return hits, counts
+
+
+def new_scoring(keywords, text):
+    counts = get_keyword_matcher(keywords).counts(text)
+    return sum(1 for kw in keywords if counts[kw]), [counts[kw] for kw in keywords]
+
+
+def per_call_ms(fn, calls):
+    start = time.perf_counter()
+    for _ in range(calls):
+        fn()
+    return (time.perf_counter() - start) / calls * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--keywords", default="60,100")
+    parser.add_argument("--calls", type=int, default=200)
+    args = parser.parse_args()
+
+    counts = KeywordMatcher(VOCABULARY).counts(RESUME)
+    mismatches = {
+        kw: (expected, counts[kw])
+        for kw, expected in per_keyword_counts(VOCABULARY, RESUME).items()
+        if counts[kw] != expected
+    }
+    print(f"Count mismatches vs per-keyword regex: {mismatches or 'none'}\n")
+
+    print(f"{'keywords':>8} {'per-keyword':>12} {'one pass':>10} {'build':>9} {'speedup':>8}")
+    for n in (int(k) for k in args.keywords.split(",")):
+        keywords = VOCABULARY[:n]
+        re.purge()
+        before = per_call_ms(lambda: old_scoring(keywords, RESUME), args.calls)
+        start = time.perf_counter()
+        KeywordMatcher(keywords)
+        build = (time.perf_counter() - start) * 1000
+        after = per_call_ms(lambda: new_scoring(keywords, RESUME), args.calls)
+        print(f"{n:>8} {before:10.3f}ms {after:8.3f}ms {build:7.2f}ms {before / max(after, 1e-9):7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
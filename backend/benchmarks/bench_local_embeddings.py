@@ -0,0 +1,70 @@
+"""
+Benchmark: offline local embedding backend (EMBEDDING_BACKEND=local).
+
+Reports per-chunk embedding latency one text at a time and in batches, the
+wall time of a fully offline ATSScorer.final_ats_score / semantic_score, and
+a sanity check that the sample resume sits closer to its JD than to an
+unrelated one.
+
+    python -m benchmarks.bench_local_embeddings --chunks 1000
+"""
+import argparse
+import os
+import sys
+import time
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).parent.parent))
+os.environ["EMBEDDING_BACKEND"] = "local"
+
+from benchmarks.load_test_async import SAMPLE_JD, SAMPLE_RESUME
+
+UNRELATED_JD = """We are looking for a pastry chef to run our bakery kitchen.
+You will prepare croissants, cakes and seasonal desserts and manage food safety.
+Experience with laminated doughs and wholesale orders is a plus.
+"""
+KEYWORDS = [["Python", "PyTorch", "Kubernetes", "AWS", "MLOps", "data pipelines"]]
+
+
+def per_call_ms(fn, calls):
+    start = time.perf_counter()
+    for _ in range(calls):
+        fn()
+    return (time.perf_counter() - start) / calls * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--chunks", type=int, default=1000)
+    parser.add_argument("--calls", type=int, default=200)
+    args = parser.parse_args()
+
+    from app.services.ats_scorer import ATSScorer
+    from core.model import generate_embedding, generate_embeddings
+
+    scorer = ATSScorer()
+    lines = [line for line in (SAMPLE_RESUME + SAMPLE_JD).splitlines() if len(line) > 20]
+    chunks = [f"{lines[i % len(lines)]} ({i})" for i in range(args.chunks)]
+
+    start = time.perf_counter()
+    for chunk in chunks:
+        generate_embedding(chunk)
+    single = (time.perf_counter() - start) / len(chunks) * 1000
+    start = time.perf_counter()
+    generate_embeddings(chunks)
+    batched = (time.perf_counter() - start) / len(chunks) * 1000
+
+    print(f"Backend: local ({len(chunks)} chunks)\n")
+    print(f"{'per chunk, one at a time':<32} {single:8.3f} ms")
+    print(f"{'per chunk, one batch':<32} {batched:8.3f} ms")
+    print(f"{'final_ats_score':<32} {per_call_ms(lambda: scorer.final_ats_score(SAMPLE_RESUME, SAMPLE_JD, KEYWORDS, embed_batch_fn=generate_embeddings), args.calls):8.3f} ms")
+    print(f"{'semantic_score':<32} {per_call_ms(lambda: scorer.semantic_score(SAMPLE_RESUME, SAMPLE_JD, embed_batch_fn=generate_embeddings), args.calls):8.3f} ms")
+
+    related = scorer.cosine_score(SAMPLE_RESUME, SAMPLE_JD, embed_batch_fn=generate_embeddings)
+    unrelated = scorer.cosine_score(SAMPLE_RESUME, UNRELATED_JD, embed_batch_fn=generate_embeddings)
+    print(f"\ncosine(resume, matching JD)   {related:.3f}")
+    print(f"cosine(resume, unrelated JD)  {unrelated:.3f}")
+
+
+if __name__ == "__main__":
+    main()
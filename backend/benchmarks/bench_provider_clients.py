@@ -0,0 +1,73 @@
+"""
+Micro-benchmark: per-call overhead of a fresh SDK client per request versus
+the pooled client registry in core.providers.
+
+    python -m benchmarks.bench_provider_clients --calls 200
+"""
+import argparse
+import os
+import sys
+import time
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).parent.parent))
+
+from benchmarks.stub_server import start_stub_server
+
+
+def run(label, fn, calls):
+    fn()  # warm-up (imports, first connection)
+    start = time.perf_counter()
+    for _ in range(calls):
+        fn()
+    elapsed = time.perf_counter() - start
+    per_call_ms = elapsed / calls * 1000
+    print(f"{label:<28} {calls:>6} calls  {elapsed:8.3f}s  {per_call_ms:8.3f} ms/call")
+    return per_call_ms
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--calls", type=int, default=200)
+    parser.add_argument("--latency-ms", type=float, default=0.0)
+    args = parser.parse_args()
+
+    server, base_url = start_stub_server(latency=args.latency_ms / 1000)
+    os.environ["OPENAI_BASE_URL"] = base_url
+    os.environ["OPENAI_API_KEY"] = "stub-key"
+    os.environ["OPENAI_EMBEDDING_MODEL"] = "stub-embedding"
+    os.environ["EMBEDDING_STORE_ENABLED"] = "false"  # measure requests, not store hits
+
+    from openai import OpenAI
+    from core.model import generate_embedding
+    from core.providers import reset_providers
+
+    def fresh_client_call():
+        # Previous behaviour: new client (and connection) per call
+        client = OpenAI()
+        client.embeddings.create(model="stub-embedding", input="resume chunk")
+
+    def pooled_client_call():
+        generate_embedding("resume chunk")
+
+    print(f"Stub provider at {base_url}\n")
+
+    server.connections.clear()
+    before = run("fresh client per call", fresh_client_call, args.calls)
+    before_conns = len(server.connections)
+
+    reset_providers()
+    server.connections.clear()
+    after = run("pooled registry client", pooled_client_call, args.calls)
+    after_conns = len(server.connections)
+
+    print()
+    print(f"TCP connections opened: before={before_conns}, after={after_conns}")
+    print(f"Per-call overhead saved: {before - after:.3f} ms ({before / after:.1f}x faster)")
+
+    reset_providers()
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+"""
+Benchmark: where the time of ATSScorer.final_ats_score goes, per component
+(keyword, structure, semantic embed vs compute, over-optimization), with
+embed calls and texts per score.
+
+Embeddings come from the stub provider (with --latency-ms per request) or
+the offline local backend. --profile additionally runs every component
+under its own cProfile profiler and prints the top functions per component
+(--profile-dir also writes <component>.prof files for snakeviz/pstats).
+
+    python -m benchmarks.bench_score_components --calls 50 --latency-ms 50
+    python -m benchmarks.bench_score_components --backend local --profile
+"""
+import argparse
+import os
+import pstats
+import sys
+from pathlib import Path
+
+import numpy as np
+
+sys.path.append(str(Path(__file__).parent.parent))
+
+from benchmarks.bench_batch_scoring import synthetic_pool
+from benchmarks.bench_embedding_batch import KEYWORDS
+from benchmarks.load_test_async import SAMPLE_JD
+from benchmarks.stub_server import start_stub_server
+
+TIMING_KEYS = [
+    "keyword_ms", "structure_ms", "semantic_ms", "semantic_embed_ms",
+    "semantic_compute_ms", "overoptimization_ms", "total_ms",
+]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--calls", type=int, default=50)
+    parser.add_argument("--backend", default="stub", help="stub (OpenAI path against the stub server) or local")
+    parser.add_argument("--latency-ms", type=float, default=50.0)
+    parser.add_argument("--scoring-profile", default="full", help="ATS scoring profile (full or fast)")
+    parser.add_argument("--profile", action="store_true", help="dump cProfile output per component")
+    parser.add_argument("--profile-top", type=int, default=12)
+    parser.add_argument("--profile-dir", default=None)
+    args = parser.parse_args()
+
+    os.environ["EMBEDDING_STORE_ENABLED"] = "false"  # every call embeds
+    os.environ.pop("PHOENIX_API_KEY", None)
+    server = None
+    if args.backend == "stub":
+        server, base_url = start_stub_server(latency=args.latency_ms / 1000)
+        os.environ["OPENAI_BASE_URL"] = base_url
+        os.environ["OPENAI_API_KEY"] = "stub-key"
+        os.environ["OPENAI_EMBEDDING_MODEL"] = "stub-embedding"
+        llm_type = "openai"
+    else:
+        llm_type = args.backend
+
+    from app.services.ats_scorer import ATSScorer
+    from app.services.scoring_metrics import component_profilers
+    from core.model import generate_embeddings
+
+    def embed_batch_fn(texts):
+        return generate_embeddings(texts, llm_type=llm_type)
+
+    scorer = ATSScorer()
+    pool = synthetic_pool(args.calls, seed=3)
+    scorer.final_ats_score(pool[0], SAMPLE_JD, KEYWORDS, embed_batch_fn=embed_batch_fn)  # warm-up
+
+    def run():
+        return [
+            scorer.final_ats_score(
+                resume, SAMPLE_JD, KEYWORDS, embed_batch_fn=embed_batch_fn,
+                profile=args.scoring_profile, include_timings=True,
+            )["timings"]
+            for resume in pool
+        ]
+
+    try:
+        if args.profile:
+            with component_profilers() as profilers:
+                timings = run()
+        else:
+            timings = run()
+    finally:
+        if server:
+            server.shutdown()
+
+    print(f"{len(timings)} scores, backend {args.backend}, profile {args.scoring_profile}\n")
+    print(f"{'component':<22} {'mean ms':>9} {'p95 ms':>9} {'share':>7}")
+    total = np.mean([t["total_ms"] for t in timings])
+    for key in TIMING_KEYS:
+        values = np.array([t[key] for t in timings])
+        print(f"{key[:-3]:<22} {values.mean():9.3f} {np.percentile(values, 95):9.3f} {values.mean() / total:6.1%}")
+    print(f"\nembed calls per score: {np.mean([t['embed_calls'] for t in timings]):.1f}, "
+          f"texts embedded per score: {np.mean([t['embedded_texts'] for t in timings]):.1f}")
+
+    if args.profile:
+        out_dir = Path(args.profile_dir) if args.profile_dir else None
+        if out_dir:
+            out_dir.mkdir(parents=True, exist_ok=True)
+        for component, profiler in profilers.items():
+            print(f"\n===== cProfile: {component} =====")
+            if not profiler.getstats():
+                print("(no calls)")
+                continue
+            stats = pstats.Stats(profiler, stream=sys.stdout).strip_dirs().sort_stats("cumulative")
+            stats.print_stats(args.profile_top)
+            if out_dir:
+                stats.dump_stats(out_dir / f"{component}.prof")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+"""
+Micro-benchmark: semantic_score similarity step, per-pair sklearn
+cosine_similarity loop (previous implementation) versus one matmul over
+pre-normalized matrices (ATSScorer.similarity_matrix).
+
+Embeddings are random unit vectors, so only the similarity math is timed.
+
+    python -m benchmarks.bench_similarity --chunks 10,100,1000 --sentences 20 --dim 1536
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+sys.path.append(str(Path(__file__).parent.parent))
+
+from app.services.ats_scorer import ATSScorer
+
+
+def loop_score(sent_embs, resume_embs):
+    """The previous semantic_score body: one 1x1 cosine_similarity call per pair."""
+    from sklearn.metrics.pairwise import cosine_similarity
+
+    scores = []
+    for sent_emb in sent_embs:
+        best = max(cosine_similarity([sent_emb], [r])[0][0] for r in resume_embs)
+        scores.append(best)
+    top_k = max(3, int(len(scores) * 0.6))
+    return float(np.mean(sorted(scores, reverse=True)[:top_k]))
+
+
+def matrix_score(sent_embs, resume_embs):
+    scores = ATSScorer.similarity_matrix(sent_embs, resume_embs).max(axis=1)
+    top_k = max(3, int(len(scores) * 0.6))
+    if top_k < len(scores):
+        scores = np.partition(scores, -top_k)[-top_k:]
+    return float(np.mean(scores))
+
+
+def timed(fn, repeats):
+    best = float("inf")
+    for _ in range(repeats):
+        start = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--chunks", default="10,100,1000")
+    parser.add_argument("--sentences", type=int, default=20)
+    parser.add_argument("--dim", type=int, default=1536)
+    parser.add_argument("--repeats", type=int, default=3)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    sent_embs = rng.normal(size=(args.sentences, args.dim)).tolist()
+
+    print(f"{args.sentences} JD sentences, {args.dim}-dim embeddings\n")
+    print(f"{'chunks':>7} {'loop':>10} {'matmul':>10} {'speedup':>9} {'|diff|':>9}")
+    for chunks in (int(c) for c in args.chunks.split(",")):
+        resume_embs = rng.normal(size=(chunks, args.dim)).tolist()
+        loop_seconds, before = timed(lambda: loop_score(sent_embs, resume_embs), 1 if chunks >= 1000 else args.repeats)
+        matrix_seconds, after = timed(lambda: matrix_score(sent_embs, resume_embs), args.repeats)
+        print(
+            f"{chunks:>7} {loop_seconds * 1000:8.1f}ms {matrix_seconds * 1000:8.2f}ms "
+            f"{loop_seconds / max(matrix_seconds, 1e-9):8.0f}x {abs(before - after):9.1e}"
+        )
+
+
+if __name__ == "__main__":
+    main()
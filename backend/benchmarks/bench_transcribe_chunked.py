@@ -0,0 +1,73 @@
+"""
+Benchmark: real-time factor of chunked Whisper transcription versus worker
+(core) count.
+
+Builds a long recording by repeating the bundled sample, transcribes it once
+serially and then in silence-aligned chunks with 1, 2, 4, ... pool workers.
+RTF = processing seconds / audio seconds (lower is better). Each pool is
+warmed up with one untimed run so model loading is not counted.
+
+    python -m benchmarks.bench_transcribe_chunked --minutes 10 --workers 1,2,4
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+
+sys.path.append(str(Path(__file__).parent.parent))
+os.environ["TRANSCRIPT_CACHE_ENABLED"] = "false"  # measure transcription, not cache hits
+
+from benchmarks.audio_sample import SAMPLE_RATE, ensure_sample_audio, write_wav
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--minutes", type=float, default=10)
+    parser.add_argument("--workers", default=None, help="comma-separated worker counts (default: powers of 2 up to cores)")
+    parser.add_argument("--model-size", default=None)
+    parser.add_argument("--chunk-seconds", type=float, default=None)
+    args = parser.parse_args()
+
+    from core.audio import load_audio
+    from core.model import transcribe_audio, transcribe_audio_chunked, shutdown_stt_pool
+
+    cores = os.cpu_count() or 1
+    if args.workers:
+        worker_counts = [int(w) for w in args.workers.split(",")]
+    else:
+        worker_counts = [w for w in (1, 2, 4, 8, 16, 32, 64) if w <= cores] or [1]
+
+    sample = load_audio(ensure_sample_audio())
+    repeats = max(1, int(args.minutes * 60 * SAMPLE_RATE / len(sample)))
+    audio = np.tile(sample, repeats)
+    seconds = len(audio) / SAMPLE_RATE
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "long.wav")
+        write_wav(path, audio)
+
+        print(f"Audio: {seconds / 60:.1f} min, {cores} cores\n")
+        transcribe_audio(str(ensure_sample_audio()), "whisper", model_size=args.model_size, chunked=False)
+        start = time.perf_counter()
+        transcribe_audio(path, "whisper", model_size=args.model_size, chunked=False)
+        serial = time.perf_counter() - start
+        print(f"{'serial':<12} {serial:8.2f}s  RTF {serial / seconds:.3f}")
+
+        for workers in worker_counts:
+            os.environ["WHISPER_WORKERS"] = str(workers)
+            shutdown_stt_pool()
+            transcribe_audio_chunked(audio, args.model_size, args.chunk_seconds)  # warm every worker
+            start = time.perf_counter()
+            transcribe_audio_chunked(load_audio(path), args.model_size, args.chunk_seconds)
+            elapsed = time.perf_counter() - start
+            print(f"{workers:>3} workers  {elapsed:8.2f}s  RTF {elapsed / seconds:.3f}  speedup {serial / elapsed:.2f}x")
+
+    shutdown_stt_pool()
+
+
+if __name__ == "__main__":
+    main()
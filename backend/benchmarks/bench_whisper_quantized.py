@@ -0,0 +1,122 @@
+"""
+Benchmark: float32 versus int8 dynamic-quantized Whisper on CPU.
+
+Transcribes a fixed local sample set (every WAV in benchmarks/data, or
+--files) with each mode and torch thread count, and reports load time, model
+weight size, real-time factor and word error rate. WER is measured against
+<name>.txt next to the audio when it exists, otherwise against the float32
+transcript (so it shows how far quantization moves the output).
+
+    python -m benchmarks.bench_whisper_quantized --model-size base --threads 1,2,4
+    python -m benchmarks.bench_whisper_quantized --files a.wav b.wav --repeats 3
+"""
+import argparse
+import os
+import re
+import sys
+import time
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).parent.parent))
+os.environ["TRANSCRIPT_CACHE_ENABLED"] = "false"  # measure transcription, not cache hits
+
+from benchmarks.audio_sample import ensure_sample_audio
+
+MODES = {"fp32": "false", "int8": "true"}
+
+
+def word_error_rate(reference, hypothesis):
+    """Word-level Levenshtein distance divided by the reference length."""
+    ref = re.findall(r"\w+", reference.lower())
+    hyp = re.findall(r"\w+", hypothesis.lower())
+    if not ref:
+        return 0.0 if not hyp else 1.0
+    previous = list(range(len(hyp) + 1))
+    for i, r in enumerate(ref, 1):
+        current = [i]
+        for j, h in enumerate(hyp, 1):
+            current.append(min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (r != h)))
+        previous = current
+    return previous[-1] / len(ref)
+
+
+def weight_megabytes(model):
+    """Size of the model's weights, counting packed int8 Linear weights too."""
+    total = 0
+    try:
+        for value in model.state_dict().values():
+            for tensor in value if isinstance(value, tuple) else (value,):
+                if hasattr(tensor, "element_size"):
+                    total += tensor.numel() * tensor.element_size()
+    except Exception:
+        return None
+    return total / 1e6
+
+
+def sample_set(files):
+    if files:
+        return [Path(f) for f in files]
+    ensure_sample_audio()
+    return sorted((Path(__file__).parent / "data").glob("*.wav"))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--model-size", default=None)
+    parser.add_argument("--threads", default=None, help="comma-separated torch thread counts (default: all cores)")
+    parser.add_argument("--modes", default="fp32,int8")
+    parser.add_argument("--repeats", type=int, default=1)
+    parser.add_argument("--files", nargs="*")
+    args = parser.parse_args()
+
+    from core.audio import duration_seconds, load_audio
+    from core.model import load_STT_model, transcribe_audio_detailed, unload_STT_models
+
+    files = sample_set(args.files)
+    audio_seconds = sum(duration_seconds(load_audio(f)) for f in files) * args.repeats
+    references = {f: f.with_suffix(".txt").read_text() for f in files if f.with_suffix(".txt").exists()}
+    thread_counts = [int(t) for t in args.threads.split(",")] if args.threads else [os.cpu_count() or 1]
+
+    os.environ["WHISPER_DEVICE"] = "cpu"
+    baseline = {}
+    rows = []
+    for mode in args.modes.split(","):
+        os.environ["WHISPER_QUANTIZE"] = MODES[mode]
+        for threads in thread_counts:
+            os.environ["WHISPER_TORCH_THREADS"] = str(threads)
+            unload_STT_models()
+            start = time.perf_counter()
+            model = load_STT_model("whisper", args.model_size)
+            load_seconds = time.perf_counter() - start
+            if model is None:
+                print(f"Could not load the {mode} model")
+                return 1
+
+            texts = {}
+            elapsed = 0.0
+            for _ in range(args.repeats):
+                for f in files:
+                    result = transcribe_audio_detailed(str(f), "whisper", args.model_size, chunked=False, trim=False)
+                    elapsed += result["transcribe_seconds"]
+                    texts[f] = result["text"]
+            if mode == "fp32":
+                baseline.setdefault(threads, texts)
+
+            reference = {f: references.get(f, baseline.get(threads, {}).get(f)) for f in files}
+            scored = [word_error_rate(reference[f], texts[f]) for f in files if reference[f] is not None]
+            wer = sum(scored) / len(scored) if scored else None
+            rows.append((mode, threads, load_seconds, weight_megabytes(model), elapsed, wer))
+
+    print(f"\n{len(files)} files, {audio_seconds:.1f}s of audio per run; WER vs {'references' if references else 'fp32'}")
+    print(f"{'mode':<6} {'threads':>7} {'load':>7} {'weights':>9} {'RTF':>7} {'audio s/s':>10} {'WER':>7}")
+    for mode, threads, load_seconds, megabytes, elapsed, wer in rows:
+        size = f"{megabytes:7.1f}MB" if megabytes is not None else f"{'n/a':>9}"
+        print(
+            f"{mode:<6} {threads:>7} {load_seconds:6.2f}s {size} {elapsed / audio_seconds:7.3f} "
+            f"{audio_seconds / max(elapsed, 1e-9):10.1f} {wer if wer is not None else float('nan'):7.3f}"
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,60 @@
+"""
+Benchmark: first-call versus warm-call Whisper transcription latency.
+
+The first call pays for loading the checkpoint; later calls reuse the cached
+process-wide model. The "reload per call" row reproduces the previous
+behaviour by dropping the cache before every call.
+
+    python -m benchmarks.bench_whisper_warm --calls 5 --model-size base
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).parent.parent))
+os.environ["TRANSCRIPT_CACHE_ENABLED"] = "false"  # measure transcription, not cache hits
+
+from benchmarks.audio_sample import ensure_sample_audio
+
+
+def timed(fn):
+    start = time.perf_counter()
+    fn()
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--calls", type=int, default=5)
+    parser.add_argument("--model-size", default=None, help="Whisper size (default: WHISPER_MODEL_SIZE or base)")
+    parser.add_argument("--audio", default=None, help="audio file (default: bundled sample)")
+    args = parser.parse_args()
+
+    from core.model import transcribe_audio, unload_STT_models
+
+    audio = args.audio or str(ensure_sample_audio())
+
+    def call():
+        transcribe_audio(audio, "whisper", model_size=args.model_size)
+
+    unload_STT_models()
+    first = timed(call)
+    warm = [timed(call) for _ in range(args.calls)]
+
+    reload = []
+    for _ in range(args.calls):
+        unload_STT_models()
+        reload.append(timed(call))
+
+    print(f"\nAudio: {audio}")
+    print(f"{'first call (cold load)':<28} {first:8.3f}s")
+    print(f"{'warm call (median)':<28} {statistics.median(warm):8.3f}s  over {args.calls} calls")
+    print(f"{'reload per call (median)':<28} {statistics.median(reload):8.3f}s  over {args.calls} calls")
+    print(f"Saved per warm call: {statistics.median(reload) - statistics.median(warm):.3f}s")
+
+
+if __name__ == "__main__":
+    main()
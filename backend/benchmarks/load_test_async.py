@@ -0,0 +1,105 @@
+"""
+Load test for the async analysis pipeline against a stubbed provider.
+
+Runs ATSMatcher.aanalyze_match (the code path behind /api/analyze) from N
+concurrent clients on a single event loop and reports analyses per second.
+Pass --sync to run the old blocking analyze_match on the loop for comparison.
+
+    python -m benchmarks.load_test_async --latency-ms 50 --duration 10
+"""
+import argparse
+import asyncio
+import contextlib
+import io
+import os
+import sys
+import time
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).parent.parent))
+
+from benchmarks.stub_server import start_stub_server
+
+SAMPLE_RESUME = """John Doe
+Machine Learning Engineer
+
+SUMMARY
+Machine learning engineer with eight years of experience building production ML systems.
+
+SKILLS
+Python, PyTorch, TensorFlow, Docker, Kubernetes, AWS, SQL
+
+PROFESSIONAL EXPERIENCE
+- Built demand forecasting models for a photo marketplace serving millions of users
+- Led migration of training pipelines to Kubernetes and cut costs by a fifth
+
+EDUCATION
+BSc Mathematics
+"""
+
+SAMPLE_JD = """We are hiring a Senior Machine Learning Engineer to design, train and deploy models.
+You will build data pipelines in Python and operate services on Kubernetes and AWS.
+Experience with PyTorch, MLOps tooling and experiment tracking is required.
+"""
+
+
+async def run_level(matcher, concurrency, duration, use_sync):
+    completed = 0
+    deadline = time.perf_counter() + duration
+
+    async def client():
+        nonlocal completed
+        while time.perf_counter() < deadline:
+            if use_sync:
+                matcher.analyze_match(SAMPLE_RESUME, SAMPLE_JD)
+            else:
+                await matcher.aanalyze_match(SAMPLE_RESUME, SAMPLE_JD)
+            completed += 1
+
+    start = time.perf_counter()
+    await asyncio.gather(*(client() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - start
+    return completed, elapsed
+
+
+async def main_async(args):
+    from app.services.matcher import ATSMatcher
+
+    matcher = ATSMatcher()
+    mode = "sync (blocking)" if args.sync else "async"
+    print(f"Mode: {mode}, provider latency: {args.latency_ms:.0f} ms, "
+          f"max concurrency per provider: {os.environ['LLM_MAX_CONCURRENCY']}\n")
+    print(f"{'clients':>8} {'analyses':>9} {'seconds':>8} {'req/s':>8}")
+
+    for concurrency in args.levels:
+        with contextlib.redirect_stdout(io.StringIO()):
+            completed, elapsed = await run_level(matcher, concurrency, args.duration, args.sync)
+        print(f"{concurrency:>8} {completed:>9} {elapsed:>8.2f} {completed / elapsed:>8.2f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--levels", type=int, nargs="+", default=[1, 10, 50])
+    parser.add_argument("--duration", type=float, default=10.0)
+    parser.add_argument("--latency-ms", type=float, default=50.0)
+    parser.add_argument("--max-concurrency", type=int, default=64)
+    parser.add_argument("--sync", action="store_true")
+    args = parser.parse_args()
+
+    server, base_url = start_stub_server(latency=args.latency_ms / 1000)
+    os.environ["OPENAI_BASE_URL"] = base_url
+    os.environ["OPENAI_API_KEY"] = "stub-key"
+    os.environ.setdefault("OPENAI_MODEL", "stub-model")
+    os.environ.setdefault("OPENAI_REASONING_MODEL", "stub-reasoning")
+    os.environ.setdefault("OPENAI_EMBEDDING_MODEL", "stub-embedding")
+    os.environ["LLM_MAX_CONCURRENCY"] = str(args.max_concurrency)
+    os.environ.pop("PHOENIX_API_KEY", None)
+
+    try:
+        asyncio.run(main_async(args))
+    finally:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
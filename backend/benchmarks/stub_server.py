@@ -0,0 +1,211 @@
+"""
+Local OpenAI-compatible stub server used by the benchmarks.
+
+Serves /v1/responses, /v1/chat/completions (plain and streamed) and
+/v1/embeddings with canned, deterministic payloads so provider overhead can
+be measured without network access or API keys.
+
+Run standalone:
+    python -m benchmarks.stub_server --port 8765 --latency-ms 50
+"""
+import argparse
+import hashlib
+import json
+import math
+import socket
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+EMBEDDING_DIM = 64
+STUB_TEXT = "SUMMARY\nStub response from the local benchmark server."
+STUB_JSON = json.dumps({
+    "skills": ["machine learning", "data pipelines"],
+    "tools": ["Docker", "Kubernetes"],
+    "technologies": ["Python", "PyTorch", "AWS"],
+    "methodologies": ["MLOps"],
+    "certifications": [],
+    "job_titles": ["Machine Learning Engineer"],
+})
+
+
+def stub_reply(request) -> str:
+    """JSON-looking prompts get an ATS keyword object, everything else plain text."""
+    if request.get("response_format") or "JSON" in json.dumps(request.get("messages") or request.get("input")):
+        return STUB_JSON
+    return STUB_TEXT
+
+
+def stub_embedding(text: str, dim: int = EMBEDDING_DIM):
+    """Deterministic bag-of-words embedding so similar texts stay similar."""
+    vec = [0.0] * dim
+    for word in text.lower().split():
+        digest = hashlib.md5(word.encode("utf-8")).digest()
+        idx = int.from_bytes(digest[:4], "little") % dim
+        vec[idx] += 1.0 if digest[4] & 1 else -1.0
+    norm = math.sqrt(sum(v * v for v in vec)) or 1.0
+    return [v / norm for v in vec]
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def setup(self):
+        super().setup()
+        # Avoid Nagle/delayed-ACK stalls on keep-alive connections
+        self.connection.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send_json(self, payload, status=200):
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _send_stream(self, events):
+        """Send SSE events with chunked transfer encoding, pacing tokens."""
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+        for event in events:
+            body = f"data: {json.dumps(event) if not isinstance(event, str) else event}\n\n".encode("utf-8")
+            self.wfile.write(f"{len(body):x}\r\n".encode("ascii") + body + b"\r\n")
+            self.wfile.flush()
+            if self.server.token_latency:
+                time.sleep(self.server.token_latency)
+        self.wfile.write(b"0\r\n\r\n")
+
+    def _stream_events(self, request, model, now):
+        words = [w + " " for w in stub_reply(request).split(" ")]
+        if self.path.endswith("/responses"):
+            yield {"type": "response.created", "sequence_number": 0,
+                   "response": {"id": "resp_stub", "object": "response", "created_at": now, "model": model,
+                                "status": "in_progress", "output": [], "parallel_tool_calls": False,
+                                "tool_choice": "auto", "tools": []}}
+            for i, word in enumerate(words):
+                yield {"type": "response.output_text.delta", "sequence_number": i + 1, "item_id": "msg_stub",
+                       "output_index": 0, "content_index": 0, "delta": word, "logprobs": []}
+            yield {"type": "response.completed", "sequence_number": len(words) + 1,
+                   "response": {"id": "resp_stub", "object": "response", "created_at": now, "model": model,
+                                "status": "completed", "output": [], "parallel_tool_calls": False,
+                                "tool_choice": "auto", "tools": []}}
+        else:
+            for word in words:
+                yield {"id": "chatcmpl_stub", "object": "chat.completion.chunk", "created": now, "model": model,
+                       "choices": [{"index": 0, "delta": {"content": word}, "finish_reason": None}]}
+            yield {"id": "chatcmpl_stub", "object": "chat.completion.chunk", "created": now, "model": model,
+                   "choices": [{"index": 0, "delta": {}, "finish_reason": "stop"}]}
+            yield "[DONE]"
+
+    def do_POST(self):
+        server = self.server
+        length = int(self.headers.get("Content-Length") or 0)
+        request = json.loads(self.rfile.read(length) or b"{}")
+
+        with server.stats_lock:
+            server.request_count += 1
+            server.connections.add(self.client_address)
+
+        if server.latency:
+            time.sleep(server.latency)
+
+        now = int(time.time())
+        model = request.get("model") or "stub-model"
+        usage = {"input_tokens": 10, "output_tokens": 10, "total_tokens": 20}
+
+        if request.get("stream"):
+            self._send_stream(self._stream_events(request, model, now))
+        elif self.path.endswith("/responses"):
+            self._send_json({
+                "id": "resp_stub",
+                "object": "response",
+                "created_at": now,
+                "completed_at": now,
+                "model": model,
+                "status": "completed",
+                "parallel_tool_calls": False,
+                "tool_choice": "auto",
+                "tools": [],
+                "output": [{
+                    "type": "message",
+                    "id": "msg_stub",
+                    "status": "completed",
+                    "role": "assistant",
+                    "content": [{"type": "output_text", "text": stub_reply(request), "annotations": []}],
+                }],
+                "usage": {
+                    **usage,
+                    "input_tokens_details": {"cached_tokens": 0},
+                    "output_tokens_details": {"reasoning_tokens": 0},
+                },
+            })
+        elif self.path.endswith("/chat/completions"):
+            self._send_json({
+                "id": "chatcmpl_stub",
+                "object": "chat.completion",
+                "created": now,
+                "model": model,
+                "choices": [{
+                    "index": 0,
+                    "finish_reason": "stop",
+                    "message": {"role": "assistant", "content": stub_reply(request)},
+                }],
+                "usage": {"prompt_tokens": 10, "completion_tokens": 10, "total_tokens": 20},
+            })
+        elif self.path.endswith("/embeddings"):
+            inputs = request.get("input")
+            if isinstance(inputs, str):
+                inputs = [inputs]
+            dim = int(request.get("dimensions") or EMBEDDING_DIM)
+            self._send_json({
+                "object": "list",
+                "model": model,
+                "data": [
+                    {"object": "embedding", "index": i, "embedding": stub_embedding(text, dim)}
+                    for i, text in enumerate(inputs or [])
+                ],
+                "usage": {"prompt_tokens": 10, "total_tokens": 10},
+            })
+        else:
+            self._send_json({"error": {"message": f"Unknown path {self.path}"}}, status=404)
+
+
+def start_stub_server(host="127.0.0.1", port=0, latency=0.0, token_latency=0.0):
+    """
+    Start the stub server on a background thread. latency delays the first
+    byte of every response; token_latency paces streamed deltas.
+    Returns (server, base_url); call server.shutdown() when done.
+    """
+    server = ThreadingHTTPServer((host, port), StubHandler)
+    server.daemon_threads = True
+    server.latency = latency
+    server.token_latency = token_latency
+    server.request_count = 0
+    server.connections = set()
+    server.stats_lock = threading.Lock()
+
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    base_url = f"http://{host}:{server.server_address[1]}/v1"
+    return server, base_url
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="OpenAI-compatible stub server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency-ms", type=float, default=0.0)
+    args = parser.parse_args()
+
+    server, base_url = start_stub_server(args.host, args.port, args.latency_ms / 1000)
+    print(f"Stub provider listening on {base_url}")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.shutdown()
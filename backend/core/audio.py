@@ -0,0 +1,257 @@
+"""
+Audio decoding and silence detection for the transcription backends.
+
+Audio is decoded once to 16 kHz mono float32 (what Whisper expects): WAV
+files are read directly, anything else goes through ffmpeg. Silence is found
+with a frame-energy detector whose threshold adapts to the file's noise floor;
+it drives both chunk splitting and silence trimming before transcription.
+"""
+import hashlib
+import os
+import subprocess
+import wave
+from typing import Dict, List, Tuple
+
+import numpy as np
+
+SAMPLE_RATE = 16000
+
+
+# -----------------------------
+# Decoding
+# -----------------------------
+def _resample(audio, source_rate, target_rate=SAMPLE_RATE):
+    if source_rate == target_rate:
+        return audio
+    try:
+        from math import gcd
+        from scipy.signal import resample_poly
+
+        g = gcd(source_rate, target_rate)
+        return resample_poly(audio, target_rate // g, source_rate // g).astype(np.float32)
+    except ImportError:
+        duration = len(audio) / source_rate
+        target = np.arange(int(duration * target_rate)) / target_rate
+        return np.interp(target, np.arange(len(audio)) / source_rate, audio).astype(np.float32)
+
+
+def _load_wav(path):
+    with wave.open(str(path), "rb") as f:
+        channels, width, rate = f.getnchannels(), f.getsampwidth(), f.getframerate()
+        frames = f.readframes(f.getnframes())
+    if width != 2:
+        raise ValueError(f"unsupported WAV sample width: {width * 8} bits")
+    audio = np.frombuffer(frames, "<i2").astype(np.float32) / 32768.0
+    if channels > 1:
+        audio = audio.reshape(-1, channels).mean(axis=1)
+    return _resample(audio, rate)
+
+
+def _load_ffmpeg(path, sample_rate):
+    cmd = [
+        "ffmpeg", "-nostdin", "-threads", "0", "-i", str(path),
+        "-f", "s16le", "-ac", "1", "-acodec", "pcm_s16le", "-ar", str(sample_rate), "-",
+    ]
+    out = subprocess.run(cmd, capture_output=True, check=True).stdout
+    return np.frombuffer(out, "<i2").astype(np.float32) / 32768.0
+
+
+def load_audio(path, sample_rate=SAMPLE_RATE) -> np.ndarray:
+    """Decode an audio file to mono float32 at `sample_rate`."""
+    if str(path).lower().endswith(".wav"):
+        try:
+            audio = _load_wav(path)
+            return audio if sample_rate == SAMPLE_RATE else _resample(audio, SAMPLE_RATE, sample_rate)
+        except (wave.Error, ValueError):
+            pass  # compressed or unusual WAV: let ffmpeg handle it
+    return _load_ffmpeg(path, sample_rate)
+
+
+def hash_audio_file(path, chunk_size=1 << 20) -> str:
+    """SHA-256 of the file's bytes, read in chunks so large files never sit in memory."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(chunk_size), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def duration_seconds(audio, sample_rate=SAMPLE_RATE) -> float:
+    return len(audio) / sample_rate
+
+
+def write_wav(path, audio, sample_rate=SAMPLE_RATE):
+    """Write float audio as 16-bit PCM mono WAV."""
+    pcm = (np.clip(audio, -1, 1) * 32767).astype("<i2")
+    with wave.open(str(path), "wb") as f:
+        f.setnchannels(1)
+        f.setsampwidth(2)
+        f.setframerate(sample_rate)
+        f.writeframes(pcm.tobytes())
+
+
+def write_mp3(path, audio, sample_rate=SAMPLE_RATE, bitrate="48k"):
+    """Encode float audio as mono MP3 with ffmpeg (48 kbps speech is ~0.35 MB/min vs ~1.9 MB/min WAV)."""
+    pcm = (np.clip(audio, -1, 1) * 32767).astype("<i2")
+    cmd = [
+        "ffmpeg", "-nostdin", "-y", "-loglevel", "error",
+        "-f", "s16le", "-ac", "1", "-ar", str(sample_rate), "-i", "-",
+        "-b:a", bitrate, str(path),
+    ]
+    subprocess.run(cmd, input=pcm.tobytes(), capture_output=True, check=True)
+
+
+# -----------------------------
+# Silence detection
+# -----------------------------
+def frame_energy_db(audio, frame) -> np.ndarray:
+    """RMS energy (dB) of consecutive frames of `frame` samples."""
+    n = len(audio) // frame
+    if n == 0:
+        return np.zeros(0)
+    frames = audio[:n * frame].reshape(n, frame)
+    return 10 * np.log10(np.mean(frames ** 2, axis=1) + 1e-12)
+
+
+def speech_segments(
+    audio,
+    sample_rate=SAMPLE_RATE,
+    frame_ms=30,
+    threshold_db=None,
+    min_silence_ms=300,
+    min_speech_ms=200,
+    pad_ms=150,
+) -> List[Tuple[int, int]]:
+    """
+    (start, end) sample ranges containing speech. Frames louder than the
+    threshold count as speech; pauses shorter than min_silence_ms are bridged,
+    blips shorter than min_speech_ms dropped, and each range padded by pad_ms.
+    The default threshold sits 30% of the way from the noise floor to the peak
+    (at least 6 dB above the floor); AUDIO_VAD_THRESHOLD_DB overrides it.
+    """
+    frame = int(sample_rate * frame_ms / 1000)
+    energy = frame_energy_db(audio, frame)
+    if not len(energy):
+        return []
+
+    if threshold_db is None and os.getenv("AUDIO_VAD_THRESHOLD_DB"):
+        threshold_db = float(os.getenv("AUDIO_VAD_THRESHOLD_DB"))
+    if threshold_db is None:
+        floor, peak = np.percentile(energy, 10), np.percentile(energy, 99)
+        threshold_db = floor + max(6.0, 0.3 * (peak - floor))
+
+    voiced = energy > threshold_db
+    runs = []
+    start = None
+    for i, v in enumerate(voiced):
+        if v and start is None:
+            start = i
+        elif not v and start is not None:
+            runs.append([start, i])
+            start = None
+    if start is not None:
+        runs.append([start, len(voiced)])
+
+    # Bridge short pauses, then drop short blips
+    merged = []
+    for run in runs:
+        if merged and (run[0] - merged[-1][1]) * frame_ms < min_silence_ms:
+            merged[-1][1] = run[1]
+        else:
+            merged.append(run)
+    merged = [r for r in merged if (r[1] - r[0]) * frame_ms >= min_speech_ms]
+
+    pad = int(sample_rate * pad_ms / 1000)
+    segments = []
+    for s, e in merged:
+        s, e = max(0, s * frame - pad), min(len(audio), e * frame + pad)
+        if segments and s <= segments[-1][1]:
+            segments[-1] = (segments[-1][0], e)
+        else:
+            segments.append((s, e))
+    return segments
+
+
+def silence_gaps(audio, sample_rate=SAMPLE_RATE, **kwargs) -> List[Tuple[int, int]]:
+    """(start, end) sample ranges between speech segments."""
+    segments = speech_segments(audio, sample_rate, **kwargs)
+    gaps = []
+    position = 0
+    for s, e in segments:
+        if s > position:
+            gaps.append((position, s))
+        position = e
+    if position < len(audio):
+        gaps.append((position, len(audio)))
+    return gaps
+
+
+def split_on_silence(
+    audio,
+    sample_rate=SAMPLE_RATE,
+    chunk_seconds=60.0,
+    max_chunk_seconds=None,
+    overlap_seconds=1.0,
+) -> List[Tuple[int, int, int]]:
+    """
+    Split audio into chunks of about chunk_seconds, cutting in the middle of
+    the silence gap nearest the target length. If no gap falls between half
+    and max_chunk_seconds (default 1.5x), the chunk is cut hard and the next
+    one starts overlap_seconds earlier. Returns (start, end, overlap) in
+    samples, where overlap is how much of the chunk repeats the previous one.
+    """
+    target = int(chunk_seconds * sample_rate)
+    longest = int((max_chunk_seconds or chunk_seconds * 1.5) * sample_rate)
+    overlap = int(overlap_seconds * sample_rate)
+    cuts = [(s + e) // 2 for s, e in silence_gaps(audio, sample_rate)]
+
+    chunks = []
+    start, carried = 0, 0
+    while start < len(audio):
+        if len(audio) - start <= longest:
+            chunks.append((start, len(audio), carried))
+            break
+        window = [c for c in cuts if start + target // 2 <= c <= start + longest]
+        if window:
+            end = min(window, key=lambda c: abs(c - (start + target)))
+            chunks.append((start, end, carried))
+            start, carried = end, 0
+        else:
+            end = start + target
+            chunks.append((start, end, carried))
+            start, carried = end - overlap, overlap
+    return chunks
+
+
+# -----------------------------
+# Silence trimming
+# -----------------------------
+def trim_silence(audio, sample_rate=SAMPLE_RATE, join_ms=200, **kwargs) -> Tuple[np.ndarray, List[Dict]]:
+    """
+    Keep only the speech segments, joined by short pauses. Returns the trimmed
+    audio and one {"start", "end", "offset"} entry (seconds) per segment:
+    start/end in the original recording, offset where it begins in the
+    trimmed audio. Audio with no detectable speech is returned unchanged.
+    """
+    segments = speech_segments(audio, sample_rate, **kwargs)
+    if not segments:
+        return audio, [{"start": 0.0, "end": len(audio) / sample_rate, "offset": 0.0}]
+
+    join = np.zeros(int(sample_rate * join_ms / 1000), dtype=audio.dtype)
+    parts, mapping, position = [], [], 0
+    for i, (s, e) in enumerate(segments):
+        if i:
+            parts.append(join)
+            position += len(join)
+        parts.append(audio[s:e])
+        mapping.append({"start": s / sample_rate, "end": e / sample_rate, "offset": position / sample_rate})
+        position += e - s
+    return np.concatenate(parts), mapping
+
+
+def original_time(t, segments) -> float:
+    """Map a time in the trimmed audio back to the original recording."""
+    for segment in reversed(segments):
+        if t >= segment["offset"]:
+            return min(segment["end"], segment["start"] + t - segment["offset"])
+    return t
@@ -0,0 +1,324 @@
+"""
+Offline bulk execution of chat completions through provider batch APIs.
+
+run_batch() takes a list of completion requests, serves what it can from the
+completion cache, writes the rest as JSONL batch request files (one per
+llm type), submits them, polls until the jobs finish and returns each
+request's text keyed by its custom_id.
+
+Providers:
+- "openai": the OpenAI Batch API, for the llm types served by OpenAI itself
+  (LLM_BATCH_LLM_TYPES, default openai and openai_reasoning). Other
+  OpenAI-compatible endpoints (deepseek, groq, Google) mostly have no
+  /batches.
+- "local": a file-based stand-in that answers request files on disk, so the
+  whole flow can run offline.
+
+Requests for llm types the provider cannot batch (e.g. claude, groq) fall
+back to regular synchronous calls. A group whose submission fails resolves
+to errors without affecting the other groups.
+"""
+import json
+import os
+import re
+import time
+import uuid
+from collections import Counter
+from pathlib import Path
+from typing import Callable, Dict, List
+from dotenv import load_dotenv
+
+from core.providers import get_client
+from core.model import (
+    LLMProviderError,
+    generate_llm_response,
+    _chat_request,
+    _request_key,
+    _cache_get,
+    _cache_store,
+)
+
+load_dotenv()
+
+DEFAULT_BATCH_DIR = str(Path(__file__).parent.parent / ".cache" / "batches")
+
+BATCH_ENDPOINTS = {
+    "responses": "/v1/responses",
+    "chat": "/v1/chat/completions",
+}
+
+TERMINAL_STATUSES = ("completed", "failed", "expired", "cancelled")
+
+
+# -----------------------------
+# Request / result files
+# -----------------------------
+def batch_request_line(request: Dict) -> Dict:
+    """One JSONL line of a batch request file for a run_batch request."""
+    endpoint, body = _chat_request(
+        request["system_prompt"], request["user_prompt"], request["llm_type"],
+        request.get("temperature", 0.7), request.get("max_tokens", 500),
+    )
+    return {"custom_id": request["custom_id"], "method": "POST", "url": BATCH_ENDPOINTS[endpoint], "body": body}
+
+
+def write_jsonl(path, rows):
+    Path(path).parent.mkdir(parents=True, exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        for row in rows:
+            f.write(json.dumps(row, ensure_ascii=False) + "\n")
+
+
+def read_jsonl(path_or_text, is_text=False):
+    text = path_or_text if is_text else Path(path_or_text).read_text(encoding="utf-8")
+    return [json.loads(line) for line in text.splitlines() if line.strip()]
+
+
+def result_text(body: Dict) -> str:
+    """Completion text from a /v1/responses or /v1/chat/completions response body."""
+    if "choices" in body:
+        return body["choices"][0]["message"]["content"]
+    parts = []
+    for item in body.get("output", []):
+        if item.get("type") != "message":
+            continue
+        for content in item.get("content", []):
+            if content.get("type") == "output_text":
+                parts.append(content["text"])
+    return "".join(parts)
+
+
+# -----------------------------
+# Providers
+# -----------------------------
+class OpenAIBatchProvider:
+    """OpenAI Batch API, for the llm types in LLM_BATCH_LLM_TYPES."""
+
+    name = "openai"
+
+    def __init__(self, completion_window: str = None, llm_types: List[str] = None):
+        self.completion_window = completion_window or os.getenv("LLM_BATCH_COMPLETION_WINDOW", "24h")
+        self.llm_types = llm_types or [
+            t.strip() for t in os.getenv("LLM_BATCH_LLM_TYPES", "openai,openai_reasoning").split(",") if t.strip()
+        ]
+
+    def supports(self, llm_type: str) -> bool:
+        return llm_type in self.llm_types
+
+    def submit(self, llm_type: str, path: str, endpoint: str) -> Dict:
+        client = get_client(llm_type)
+        with open(path, "rb") as f:
+            uploaded = client.files.create(file=f, purpose="batch")
+        batch = client.batches.create(
+            input_file_id=uploaded.id,
+            endpoint=endpoint,
+            completion_window=self.completion_window,
+        )
+        return {"id": batch.id, "llm_type": llm_type}
+
+    def status(self, job: Dict) -> str:
+        batch = get_client(job["llm_type"]).batches.retrieve(job["id"])
+        job["output_file_id"] = batch.output_file_id
+        job["error_file_id"] = batch.error_file_id
+        return batch.status
+
+    def results(self, job: Dict) -> List[Dict]:
+        client = get_client(job["llm_type"])
+        rows = []
+        for file_id in (job.get("output_file_id"), job.get("error_file_id")):
+            if file_id:
+                rows.extend(read_jsonl(client.files.content(file_id).text, is_text=True))
+        return rows
+
+
+def _top_terms(text, limit):
+    terms = re.findall(r"[A-Za-z][A-Za-z0-9+#.]{2,}", text)
+    counts = Counter(t.strip(".") for t in terms if t[0].isupper() or not t.isalpha())
+    return [term for term, _ in counts.most_common(limit)]
+
+
+def echo_reply(system_prompt: str, user_prompt: str) -> str:
+    """
+    Deterministic offline answer used by LocalBatchProvider: JSON prompts get
+    the keyword schema filled with the user prompt's most frequent proper
+    terms, list prompts get a JSON list of them, anything else is echoed back
+    (for resume rewrites the user prompt is the resume itself).
+    """
+    if "JSON" in system_prompt:
+        terms = _top_terms(user_prompt, 12)
+        return json.dumps({
+            "skills": terms, "tools": [], "technologies": [],
+            "methodologies": [], "certifications": [], "job_titles": [],
+        })
+    if "valid list" in system_prompt:
+        return json.dumps(_top_terms(user_prompt, 5))
+    match = re.search(r"Original Resume:\s*(.*?)\s*Job Description:", user_prompt, re.DOTALL)
+    return match.group(1) if match else user_prompt.strip()
+
+
+class LocalBatchProvider:
+    """
+    File-based stand-in for a provider batch API. Submitted request files are
+    copied into <root>/<job id>/ and answered by `responder` the first time
+    the job is polled after `latency` seconds; results use the OpenAI batch
+    output format.
+    """
+
+    name = "local"
+
+    def __init__(self, root: str = None, responder: Callable[[str, str], str] = echo_reply, latency: float = 0.0):
+        self.root = Path(root or os.getenv("LLM_BATCH_DIR", DEFAULT_BATCH_DIR)) / "local"
+        self.responder = responder
+        self.latency = latency
+
+    def supports(self, llm_type: str) -> bool:
+        return True
+
+    def submit(self, llm_type: str, path: str, endpoint: str) -> Dict:
+        job_id = f"local-{uuid.uuid4().hex[:12]}"
+        job_dir = self.root / job_id
+        job_dir.mkdir(parents=True, exist_ok=True)
+        (job_dir / "input.jsonl").write_bytes(Path(path).read_bytes())
+        return {"id": job_id, "llm_type": llm_type, "submitted_at": time.time()}
+
+    def _answer(self, line):
+        body = line["body"]
+        messages = body.get("input") or body.get("messages") or []
+        system = next((m["content"] for m in messages if m["role"] == "system"), "")
+        user = next((m["content"] for m in messages if m["role"] == "user"), "")
+        text = self.responder(system, user)
+        if line["url"] == BATCH_ENDPOINTS["chat"]:
+            response = {"choices": [{"index": 0, "message": {"role": "assistant", "content": text}}]}
+        else:
+            response = {"output": [{"type": "message", "content": [{"type": "output_text", "text": text}]}]}
+        return {
+            "id": f"batch_req_{uuid.uuid4().hex[:12]}",
+            "custom_id": line["custom_id"],
+            "response": {"status_code": 200, "body": response},
+            "error": None,
+        }
+
+    def status(self, job: Dict) -> str:
+        job_dir = self.root / job["id"]
+        output = job_dir / "output.jsonl"
+        if output.exists():
+            return "completed"
+        if time.time() - job["submitted_at"] < self.latency:
+            return "in_progress"
+        write_jsonl(output, [self._answer(line) for line in read_jsonl(job_dir / "input.jsonl")])
+        return "completed"
+
+    def results(self, job: Dict) -> List[Dict]:
+        return read_jsonl(self.root / job["id"] / "output.jsonl")
+
+
+BATCH_PROVIDERS = {
+    "openai": OpenAIBatchProvider,
+    "local": LocalBatchProvider,
+}
+
+
+def get_batch_provider(name: str = None):
+    name = name or os.getenv("LLM_BATCH_PROVIDER", "openai")
+    if name not in BATCH_PROVIDERS:
+        raise ValueError(f"Unknown batch provider: {name}")
+    return BATCH_PROVIDERS[name]()
+
+
+# -----------------------------
+# Running a batch
+# -----------------------------
+def _parse_result(row):
+    """(custom_id, text or LLMProviderError) for one result line."""
+    custom_id = row.get("custom_id")
+    response = row.get("response") or {}
+    if row.get("error") or response.get("status_code") != 200:
+        detail = row.get("error") or response.get("body")
+        return custom_id, LLMProviderError("batch", f"{custom_id} failed: {detail}")
+    text = result_text(response.get("body") or {})
+    if not text:
+        return custom_id, LLMProviderError("batch", f"{custom_id}: empty response")
+    return custom_id, text
+
+
+def run_batch(requests: List[Dict], provider=None, label: str = "batch", poll_seconds: float = None, timeout: float = None) -> Dict:
+    """
+    Run completion requests as provider batch jobs.
+
+    Each request is a dict with custom_id, llm_type, system_prompt,
+    user_prompt and optional temperature, max_tokens and cache (default True).
+    Returns {custom_id: text}; failed requests map to an LLMProviderError.
+    """
+    provider = provider or get_batch_provider()
+    poll_seconds = poll_seconds if poll_seconds is not None else float(os.getenv("LLM_BATCH_POLL_SECONDS", "30"))
+    timeout = timeout if timeout is not None else float(os.getenv("LLM_BATCH_TIMEOUT_SECONDS", str(24 * 3600)))
+    batch_dir = Path(os.getenv("LLM_BATCH_DIR", DEFAULT_BATCH_DIR))
+
+    results = {}
+    keys = {}
+    groups = {}
+    for request in requests:
+        custom_id = request["custom_id"]
+        if request.get("cache", True):
+            keys[custom_id] = _request_key(
+                request["system_prompt"], request["user_prompt"], request["llm_type"],
+                request.get("temperature", 0.7), request.get("max_tokens", 500),
+            )
+            cached = _cache_get(keys[custom_id])
+            if cached is not None:
+                results[custom_id] = cached
+                continue
+
+        endpoint, _ = _chat_request("", "", request["llm_type"], 0, 0)
+        if endpoint not in BATCH_ENDPOINTS or not provider.supports(request["llm_type"]):
+            # No file batch endpoint for this llm type: call it directly
+            try:
+                results[custom_id] = generate_llm_response(
+                    request["system_prompt"], request["user_prompt"], llm_type=request["llm_type"],
+                    temperature=request.get("temperature", 0.7), max_tokens=request.get("max_tokens", 500),
+                    cache=request.get("cache", True),
+                )
+            except LLMProviderError as e:
+                results[custom_id] = e
+            continue
+        groups.setdefault(request["llm_type"], []).append(batch_request_line(request))
+
+    jobs = []
+    stamp = time.strftime("%Y%m%d-%H%M%S")
+    for llm_type, lines in groups.items():
+        path = batch_dir / f"{label}-{llm_type}-{stamp}-{uuid.uuid4().hex[:6]}.jsonl"
+        write_jsonl(path, lines)
+        try:
+            job = provider.submit(llm_type, str(path), lines[0]["url"])
+        except Exception as e:
+            print(f"Could not submit {provider.name} batch for {llm_type}: {e}")
+            for line in lines:
+                results[line["custom_id"]] = LLMProviderError(llm_type, f"batch submission failed: {e}")
+            continue
+        job["custom_ids"] = [line["custom_id"] for line in lines]
+        print(f"Submitted {provider.name} batch {job['id']}: {len(lines)} {label} requests ({llm_type})")
+        jobs.append(job)
+
+    deadline = time.monotonic() + timeout
+    pending = list(jobs)
+    while pending:
+        for job in list(pending):
+            status = provider.status(job)
+            if status in TERMINAL_STATUSES:
+                print(f"Batch {job['id']} {status}")
+                for row in provider.results(job):
+                    custom_id, value = _parse_result(row)
+                    results[custom_id] = value
+                    if not isinstance(value, Exception):
+                        _cache_store(keys.get(custom_id), value)
+                pending.remove(job)
+        if pending:
+            if time.monotonic() > deadline:
+                print(f"Timed out waiting for {len(pending)} batch jobs")
+                break
+            time.sleep(poll_seconds)
+
+    for job in jobs:
+        for custom_id in job["custom_ids"]:
+            results.setdefault(custom_id, LLMProviderError("batch", f"{custom_id}: no result from batch {job['id']}"))
+    return results
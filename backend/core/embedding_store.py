@@ -0,0 +1,224 @@
+"""
+Persistent embedding store shared by all worker processes.
+
+Vectors live in memory-mapped NumPy files (one per dimension, float32,
+float16 or int8, a fixed number of rows) and a SQLite index maps a SHA-256 of
+(model, whitespace-normalized text) to a row. Every process shares the same
+pages; lookups copy rows out under the index's write lock, so a row evicted
+and overwritten later never changes a vector already returned. When a file
+is full the least recently used row is overwritten.
+"""
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import numpy as np
+from dotenv import load_dotenv
+
+load_dotenv()
+
+DEFAULT_STORE_DIR = str(Path(__file__).parent.parent / ".cache" / "embeddings")
+STORE_DTYPES = ("float32", "float16", "int8")
+
+
+def normalize_text(text: str) -> str:
+    return " ".join(text.split())
+
+
+def quantize_vectors(vectors, dtype) -> np.ndarray:
+    """
+    Encode vectors in a storage dtype. float16 is a plain cast; int8 scales
+    each row so its largest component is +-127. The per-row scale does not
+    change cosine similarity; the magnitude is dropped (embeddings are unit
+    length anyway) and restored by dequantize_vectors.
+    """
+    matrix = np.atleast_2d(np.asarray(vectors, dtype=np.float32))
+    if np.dtype(dtype) == np.int8:
+        peak = np.abs(matrix).max(axis=1, keepdims=True)
+        return np.round(matrix * (127 / np.where(peak == 0, 1, peak))).astype(np.int8)
+    return matrix.astype(dtype)
+
+
+def dequantize_vectors(matrix) -> np.ndarray:
+    """float32 rows from a storage dtype; int8 rows are rescaled to unit length."""
+    matrix = np.atleast_2d(matrix)
+    rows = matrix.astype(np.float32)
+    if matrix.dtype == np.int8:
+        norms = np.linalg.norm(rows, axis=1, keepdims=True)
+        rows /= np.where(norms == 0, 1, norms)
+    return rows
+
+
+class EmbeddingStore:
+    """Memory-mapped vector files plus a SQLite slot index, LRU-evicted at max_vectors."""
+
+    def __init__(self, root: str, max_vectors: int, dtype: str = "float32"):
+        if dtype not in STORE_DTYPES:
+            raise ValueError(f"Unsupported embedding store dtype {dtype!r}; use one of {STORE_DTYPES}")
+        self.root = Path(root)
+        self.max_vectors = max_vectors
+        self.dtype = np.dtype(dtype)
+        self._arrays = {}
+        self._lock = threading.Lock()
+        self._counters = {"hits": 0, "misses": 0, "stores": 0, "evictions": 0}
+
+        self.root.mkdir(parents=True, exist_ok=True)
+        # Autocommit mode: writes take an explicit BEGIN IMMEDIATE so slot
+        # allocation is serialized across processes
+        self._conn = sqlite3.connect(self.root / f"index-{self.dtype.name}.sqlite3", check_same_thread=False, timeout=30, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS embeddings (
+                key TEXT PRIMARY KEY,
+                dim INTEGER NOT NULL,
+                slot INTEGER NOT NULL,
+                accessed_at REAL NOT NULL,
+                UNIQUE (dim, slot)
+            )
+            """
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_embeddings_accessed ON embeddings(dim, accessed_at)")
+
+    @staticmethod
+    def make_key(model: str, text: str) -> str:
+        return hashlib.sha256(f"{model}\0{normalize_text(text)}".encode("utf-8")).hexdigest()
+
+    def _array(self, dim: int, create: bool = False) -> Optional[np.ndarray]:
+        array = self._arrays.get(dim)
+        if array is None:
+            path = self.root / f"vectors-{dim}-{self.dtype.name}.npy"
+            if path.exists():
+                array = np.lib.format.open_memmap(path, mode="r+")
+            elif create:
+                # Only called inside a write transaction, so one process creates the file
+                array = np.lib.format.open_memmap(path, mode="w+", dtype=self.dtype, shape=(self.max_vectors, dim))
+            else:
+                return None
+            self._arrays[dim] = array
+        return array
+
+    def get_many(self, keys: List[str]) -> Dict[str, np.ndarray]:
+        """
+        Stored vectors for the keys that are present, as float32 whatever the
+        storage dtype. Rows are copied out of the mapped file inside a write
+        transaction, so no process can evict and overwrite a slot while it is
+        read, and callers may keep them.
+        """
+        if not keys:
+            return {}
+        unique = list(dict.fromkeys(keys))
+        found = {}
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                for start in range(0, len(unique), 500):
+                    batch = unique[start:start + 500]
+                    rows = self._conn.execute(
+                        f"SELECT key, dim, slot FROM embeddings WHERE key IN ({','.join('?' * len(batch))})", batch
+                    ).fetchall()
+                    for key, dim, slot in rows:
+                        array = self._array(dim)
+                        if array is not None:
+                            found[key] = dequantize_vectors(array[slot])[0]
+                if found:
+                    now = time.time()
+                    self._conn.executemany("UPDATE embeddings SET accessed_at = ? WHERE key = ?", [(now, k) for k in found])
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+            self._counters["hits"] += len(found)
+            self._counters["misses"] += len(unique) - len(found)
+        return found
+
+    def get(self, key: str) -> Optional[np.ndarray]:
+        return self.get_many([key]).get(key)
+
+    def put_many(self, items: Dict[str, List[float]]):
+        if not items:
+            return
+        now = time.time()
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                for key, vector in items.items():
+                    vector = quantize_vectors(vector, self.dtype)[0]
+                    if self._conn.execute("SELECT 1 FROM embeddings WHERE key = ?", (key,)).fetchone():
+                        continue  # stored meanwhile by another process
+                    dim = len(vector)
+                    array = self._array(dim, create=True)
+                    slot = self._conn.execute("SELECT COUNT(*) FROM embeddings WHERE dim = ?", (dim,)).fetchone()[0]
+                    if slot >= len(array):
+                        slot = self._evict(dim)
+                    array[slot] = vector
+                    self._conn.execute(
+                        "INSERT INTO embeddings (key, dim, slot, accessed_at) VALUES (?, ?, ?, ?)",
+                        (key, dim, slot, now),
+                    )
+                    self._counters["stores"] += 1
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+
+    def put(self, key: str, vector: List[float]):
+        self.put_many({key: vector})
+
+    def _evict(self, dim: int) -> int:
+        """Free the least recently used row of this dimension and return its slot."""
+        key, slot = self._conn.execute(
+            "SELECT key, slot FROM embeddings WHERE dim = ? ORDER BY accessed_at ASC LIMIT 1", (dim,)
+        ).fetchone()
+        self._conn.execute("DELETE FROM embeddings WHERE key = ?", (key,))
+        self._counters["evictions"] += 1
+        return slot
+
+    def clear(self):
+        with self._lock:
+            self._conn.execute("DELETE FROM embeddings")
+
+    def stats(self) -> Dict[str, float]:
+        with self._lock:
+            entries = self._conn.execute("SELECT COUNT(*) FROM embeddings").fetchone()[0]
+            counters = dict(self._counters)
+        files = list(self.root.glob(f"vectors-*-{self.dtype.name}.npy"))
+
+        lookups = counters["hits"] + counters["misses"]
+        return {
+            **counters,
+            "hit_rate": counters["hits"] / lookups if lookups else 0.0,
+            "entries": entries,
+            "max_vectors": self.max_vectors,
+            "dtype": self.dtype.name,
+            "bytes": sum(f.stat().st_size for f in files),
+        }
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_embedding_store() -> Optional[EmbeddingStore]:
+    """Return the process-wide store, or None when EMBEDDING_STORE_ENABLED is off."""
+    global _store
+    if os.getenv("EMBEDDING_STORE_ENABLED", "true").lower() not in ("1", "true", "yes"):
+        return None
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                _store = EmbeddingStore(
+                    root=os.getenv("EMBEDDING_STORE_DIR", DEFAULT_STORE_DIR),
+                    max_vectors=int(os.getenv("EMBEDDING_STORE_MAX_VECTORS", "100000")),
+                    dtype=os.getenv("EMBEDDING_STORE_DTYPE", "float32"),
+                )
+    return _store
+
+
+def embedding_store_stats() -> Dict[str, float]:
+    store = get_embedding_store()
+    return store.stats() if store else {"enabled": False}
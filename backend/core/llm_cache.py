@@ -0,0 +1,194 @@
+"""
+Content-addressed, disk-backed cache for LLM completions (and, in a separate
+file, audio transcripts).
+
+Entries are keyed on a SHA-256 of (provider, model, system prompt, user
+prompt, temperature, max_tokens) and stored in a SQLite file shared by all
+worker processes. Entries expire after a TTL and the file is kept under a
+byte budget by evicting the least recently used entries.
+"""
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Optional
+from dotenv import load_dotenv
+
+load_dotenv()
+
+DEFAULT_CACHE_PATH = str(Path(__file__).parent.parent / ".cache" / "llm_cache.sqlite3")
+DEFAULT_TRANSCRIPT_CACHE_PATH = str(Path(__file__).parent.parent / ".cache" / "transcripts.sqlite3")
+
+
+class LLMCache:
+    """SQLite LRU cache for completion text with TTL and size cap."""
+
+    def __init__(self, path: str, ttl_seconds: float, max_bytes: int):
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._counters = {"hits": 0, "misses": 0, "expired": 0, "stores": 0, "evictions": 0}
+
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=30)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS completions (
+                key TEXT PRIMARY KEY,
+                value TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                created_at REAL NOT NULL,
+                accessed_at REAL NOT NULL
+            )
+            """
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_completions_accessed ON completions(accessed_at)")
+        self._conn.commit()
+
+    @staticmethod
+    def make_key(provider, model, system_prompt, user_prompt, temperature, max_tokens=None) -> str:
+        payload = json.dumps(
+            [provider, model, system_prompt, user_prompt, temperature, max_tokens],
+            ensure_ascii=False,
+        )
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Optional[str]:
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value, created_at FROM completions WHERE key = ?", (key,)
+            ).fetchone()
+
+            if row is None:
+                self._counters["misses"] += 1
+                return None
+
+            value, created_at = row
+            if self.ttl_seconds and now - created_at > self.ttl_seconds:
+                self._conn.execute("DELETE FROM completions WHERE key = ?", (key,))
+                self._conn.commit()
+                self._counters["expired"] += 1
+                self._counters["misses"] += 1
+                return None
+
+            self._conn.execute("UPDATE completions SET accessed_at = ? WHERE key = ?", (now, key))
+            self._conn.commit()
+            self._counters["hits"] += 1
+            return value
+
+    def set(self, key: str, value: str):
+        now = time.time()
+        size = len(value.encode("utf-8"))
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO completions (key, value, size, created_at, accessed_at) VALUES (?, ?, ?, ?, ?)",
+                (key, value, size, now, now),
+            )
+            self._counters["stores"] += 1
+            self._evict()
+            self._conn.commit()
+
+    def _evict(self):
+        """Drop expired entries, then least recently used ones until under budget."""
+        if self.ttl_seconds:
+            cursor = self._conn.execute(
+                "DELETE FROM completions WHERE created_at < ?", (time.time() - self.ttl_seconds,)
+            )
+            self._counters["evictions"] += max(cursor.rowcount, 0)
+
+        total = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM completions").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+
+        rows = self._conn.execute("SELECT key, size FROM completions ORDER BY accessed_at ASC").fetchall()
+        doomed = []
+        for key, size in rows:
+            if total <= self.max_bytes:
+                break
+            doomed.append((key,))
+            total -= size
+        self._conn.executemany("DELETE FROM completions WHERE key = ?", doomed)
+        self._counters["evictions"] += len(doomed)
+
+    def clear(self):
+        with self._lock:
+            self._conn.execute("DELETE FROM completions")
+            self._conn.commit()
+
+    def stats(self) -> Dict[str, float]:
+        with self._lock:
+            entries, total = self._conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM completions"
+            ).fetchone()
+            counters = dict(self._counters)
+
+        lookups = counters["hits"] + counters["misses"]
+        return {
+            **counters,
+            "hit_rate": counters["hits"] / lookups if lookups else 0.0,
+            "entries": entries,
+            "bytes": total,
+            "max_bytes": self.max_bytes,
+        }
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def cache_enabled() -> bool:
+    return os.getenv("LLM_CACHE_ENABLED", "true").lower() in ("1", "true", "yes")
+
+
+def get_llm_cache() -> Optional[LLMCache]:
+    """Return the process-wide cache, or None when LLM_CACHE_ENABLED is off."""
+    global _cache
+    if not cache_enabled():
+        return None
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = LLMCache(
+                    path=os.getenv("LLM_CACHE_PATH", DEFAULT_CACHE_PATH),
+                    ttl_seconds=float(os.getenv("LLM_CACHE_TTL_SECONDS", str(7 * 24 * 3600))),
+                    max_bytes=int(os.getenv("LLM_CACHE_MAX_BYTES", str(64 * 1024 * 1024))),
+                )
+    return _cache
+
+
+def llm_cache_stats() -> Dict[str, float]:
+    cache = get_llm_cache()
+    return cache.stats() if cache else {"enabled": False}
+
+
+_transcript_cache = None
+
+
+def get_transcript_cache() -> Optional[LLMCache]:
+    """
+    Process-wide transcript cache (same LRU store, own file and budget), or
+    None when TRANSCRIPT_CACHE_ENABLED is off.
+    """
+    global _transcript_cache
+    if os.getenv("TRANSCRIPT_CACHE_ENABLED", "true").lower() not in ("1", "true", "yes"):
+        return None
+    if _transcript_cache is None:
+        with _cache_lock:
+            if _transcript_cache is None:
+                _transcript_cache = LLMCache(
+                    path=os.getenv("TRANSCRIPT_CACHE_PATH", DEFAULT_TRANSCRIPT_CACHE_PATH),
+                    ttl_seconds=float(os.getenv("TRANSCRIPT_CACHE_TTL_SECONDS", str(30 * 24 * 3600))),
+                    max_bytes=int(os.getenv("TRANSCRIPT_CACHE_MAX_BYTES", str(256 * 1024 * 1024))),
+                )
+    return _transcript_cache
+
+
+def transcript_cache_stats() -> Dict[str, float]:
+    cache = get_transcript_cache()
+    return cache.stats() if cache else {"enabled": False}
@@ -0,0 +1,88 @@
+"""
+Offline embedding backend: hashed n-gram features projected to a fixed size.
+
+Each text becomes word unigrams and bigrams plus character trigrams of every
+word (so "deploy", "deployed" and "deployment" overlap). Features are hashed
+with CRC32 into `dim` signed buckets, weighted by sublinear term frequency,
+and rows are L2-normalized, so the dot product is a TF-weighted cosine.
+There is no corpus to estimate IDF from; a stopword list drops the terms IDF
+would zero out. Needs no network or model files and embeds a batch with one
+scatter-add.
+"""
+import math
+import os
+import re
+import threading
+import zlib
+from collections import Counter
+from typing import List
+
+import numpy as np
+
+TOKEN_RE = re.compile(r"[a-z0-9][a-z0-9+#.]*")  # keeps c++, c#, node.js
+
+STOPWORDS = frozenset(
+    "a an and are as at be been by for from has have in into is it its of on or our that the their "
+    "this to was we were will with you your they them he she his her who which what when where how "
+    "all any can also more most other some such than then there these those through over under "
+    "about after before while using used use within across per via etc".split()
+)
+
+# Relative weights: whole words dominate, trigrams add fuzzy matching
+WORD_WEIGHT = 1.0
+BIGRAM_WEIGHT = 1.0
+TRIGRAM_WEIGHT = 0.5
+
+
+def _features(text):
+    words = [w.rstrip(".") for w in TOKEN_RE.findall(text.lower())]
+    words = [w for w in words if w and w not in STOPWORDS]
+    features = Counter()
+    for w in words:
+        features[w, WORD_WEIGHT] += 1
+        padded = f"<{w}>"
+        for i in range(len(padded) - 2):
+            features[padded[i:i + 3], TRIGRAM_WEIGHT] += 1
+    for a, b in zip(words, words[1:]):
+        features[f"{a} {b}", BIGRAM_WEIGHT] += 1
+    return features
+
+
+class LocalEmbedder:
+    """Hashed n-gram TF projection; deterministic across processes and restarts."""
+
+    def __init__(self, dim: int = 512):
+        self.dim = dim
+
+    @property
+    def model(self) -> str:
+        return f"local-hash-{self.dim}"
+
+    def embed(self, texts: List[str]) -> np.ndarray:
+        """(len(texts), dim) float32 matrix of unit rows (all zero for texts with no terms)."""
+        rows, cols, values = [], [], []
+        for i, text in enumerate(texts):
+            for (feature, weight), tf in _features(text).items():
+                h = zlib.crc32(feature.encode("utf-8"))
+                rows.append(i)
+                cols.append(h % self.dim)
+                # High hash bit picks the sign so bucket collisions cancel out on average
+                values.append(weight * (1 + math.log(tf)) * (1.0 if h & 0x80000000 else -1.0))
+
+        matrix = np.zeros((len(texts), self.dim), dtype=np.float32)
+        np.add.at(matrix, (rows, cols), values)
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        return matrix / np.where(norms == 0, 1, norms)
+
+
+_embedder = None
+_embedder_lock = threading.Lock()
+
+
+def get_local_embedder() -> LocalEmbedder:
+    global _embedder
+    if _embedder is None:
+        with _embedder_lock:
+            if _embedder is None:
+                _embedder = LocalEmbedder(dim=int(os.getenv("LOCAL_EMBEDDING_DIM", "512")))
+    return _embedder
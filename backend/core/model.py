@@ -1,284 +1,780 @@
 import os
+import hashlib
+import json
+import asyncio
 from typing import List
 from dotenv import load_dotenv
 from tqdm import tqdm
+import re
 import time
+import threading
+import subprocess
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from core.providers import get_client, get_async_client, get_semaphore, get_model, LLM_TYPES
+from core.llm_cache import LLMCache, get_llm_cache, get_transcript_cache
+from core.singleflight import llm_flight, embedding_flight
+from core.embedding_store import EmbeddingStore, get_embedding_store
+from core.local_embeddings import get_local_embedder
+from core.provider_health import get_health
+from core.rate_limit import get_limiter, estimate_tokens
 # Load environment variables
 load_dotenv()
 
-def generate_llm_response(system_prompt, user_prompt, llm_type="openai", temperature=0.7, max_tokens=500): 
+LLM_LABELS = {
+    "openai": "OpenAI",
+    "openai_reasoning": "OpenAI Reasoning",
+    "claude": "Claude",
+    "google": "Google",
+    "deepseek": "Deepseek",
+    "groq": "groq",
+}
 
-    import inspect
-    caller_frame = inspect.currentframe().f_back
-    caller_name = caller_frame.f_code.co_name
-    
-    # Create a progress bar for the LLM call
-    # with tqdm(total=100, desc=f"🤖 {llm_type} ({caller_name})", ncols=80, bar_format='{l_bar}{bar}| {elapsed}') as pbar:
-    #     pbar.update(10)  # Starting
 
-    if llm_type == "openai":
-        try:
-            print("Using OpenAI LLM")
-            from openai import OpenAI
 
-            model = os.getenv("OPENAI_MODEL")
-            client = OpenAI()
-            #pbar.update(20)  # Client initialized
+class LLMProviderError(Exception):
+    """A provider call failed or returned no text."""
 
-            messages = [
-                {"role": "system", "content": system_prompt},
-                {"role": "user", "content": user_prompt}
-            ]
+    def __init__(self, llm_type, message):
+        super().__init__(f"{llm_type}: {message}")
+        self.llm_type = llm_type
 
-            #pbar.update(10)  # Messages prepared
-            response = client.responses.create(
-                model=model,
-                input=messages,
-            )
-            #pbar.update(40)  # Response received
-            
-            ## Print response number of token used and execution time
-            try:
-                usage = response.usage
-                # Check available attributes
-                if hasattr(usage, 'input_tokens'):
-                    print(f"Tokens used: input={usage.input_tokens}, output={usage.output_tokens}, total={usage.total_tokens}")
-                elif hasattr(usage, 'prompt_tokens'):
-                    print(f"Tokens used: prompt={usage.prompt_tokens}, completion={usage.completion_tokens}, total={usage.total_tokens}")
-                else:
-                    print(f"Usage info: {usage}")
-                
-                if hasattr(usage, 'total_cost'):
-                    print(f"Cost: ${usage.total_cost:.6f}")
-
-                if hasattr(response, 'created_at'):
-                    created_time = response.created_at
-                if hasattr(response, 'completed_at'):
-                    completed_time = response.completed_at
-                total_time = (completed_time - created_time) if (hasattr(response, 'created_at') and hasattr(response, 'completed_at')) else 0
-                print(f"Total execution time - openai: {total_time} seconds")
 
-            except Exception as e:
-                print(f"Could not retrieve usage stats: {e}")
+# -----------------------------
+# Provider request helpers
+# -----------------------------
+def _chat_request(system_prompt, user_prompt, llm_type, temperature, max_tokens):
+    """Return (endpoint, kwargs) for one chat call to the given provider."""
+    model = get_model(llm_type)
+    messages = [
+        {"role": "system", "content": system_prompt},
+        {"role": "user", "content": user_prompt}
+    ]
 
-            #pbar.update(20)  # Complete
-            # print("Response: ", response.output_text)
-            print("---------------------------------")
-            print()
-            return response.output_text
-        except Exception as e:
-            #pbar.update(100)  # Complete on error
-            print(f"Error generating LLM response: {e}")
-            return "Error generating LLM response."    
-    elif llm_type == "openai_reasoning":
-        try:
-            print("Using OpenAI Reasoning LLM")
-            from openai import OpenAI
+    if llm_type in ("openai", "openai_reasoning"):
+        return "responses", {"model": model, "input": messages}
+    if llm_type == "claude":
+        return "messages", {
+            "model": model,
+            "system": system_prompt,
+            "messages": [{"role": "user", "content": user_prompt}],
+            "max_tokens": max_tokens,
+            "temperature": temperature,
+        }
+    return "chat", {"model": model, "messages": messages}
 
-            model = os.getenv("OPENAI_REASONING_MODEL")
-            client = OpenAI()
-            #pbar.update(20)  # Client initialized
 
-            messages = [
-                {"role": "system", "content": system_prompt},
-                {"role": "user", "content": user_prompt}
-            ]
+def _create(client, endpoint, request):
+    """Dispatch a request on a sync or async client (async returns a coroutine)."""
+    if endpoint == "responses":
+        return client.responses.create(**request)
+    if endpoint == "messages":
+        return client.messages.create(**request)
+    return client.chat.completions.create(**request)
 
-            #pbar.update(10)  # Messages prepared
-            response = client.responses.create(
-                model=model,
-                input=messages,
-            )
-            #pbar.update(40)  # Response received
 
-            ## Print response number of token used and execution time
-            try:
-                usage = response.usage
-                # Check available attributes
-                if hasattr(usage, 'input_tokens'):
-                    print(f"Tokens used: input={usage.input_tokens}, output={usage.output_tokens}, total={usage.total_tokens}")
-                elif hasattr(usage, 'prompt_tokens'):
-                    print(f"Tokens used: prompt={usage.prompt_tokens}, completion={usage.completion_tokens}, total={usage.total_tokens}")
-                else:
-                    print(f"Usage info: {usage}")
-                
-                if hasattr(usage, 'total_cost'):
-                    print(f"Cost: ${usage.total_cost:.6f}")
-
-                if hasattr(response, 'created_at'):
-                    created_time = response.created_at
-                if hasattr(response, 'completed_at'):
-                    completed_time = response.completed_at
-                total_time = (completed_time - created_time) if (hasattr(response, 'created_at') and hasattr(response, 'completed_at')) else 0
-                print(f"Total execution time - openai reasoning: {total_time} seconds")
+def _response_text(endpoint, response):
+    if endpoint == "responses":
+        return response.output_text
+    if endpoint == "messages":
+        return response.content[0].text.strip()
+    return response.choices[0].message.content
 
-            except Exception as e:
-                print(f"Could not retrieve usage stats: {e}")
 
-            #pbar.update(20)  # Complete
-            print("Response: ", response.output_text)
-            print("---------------------------------")
-            print()
-            return response.output_text
-        except Exception as e:
-            #pbar.update(100)  # Complete on error
-            print(f"Error generating LLM response: {e}")
-            return "Error generating LLM response."    
-    elif llm_type == "claude":
-        print("Using Claude LLM")
-        from anthropic import Anthropic
-        model=os.getenv("CLAUDE_MODEL")
-        api_key=os.getenv("ANTHROPIC_API_KEY")
-        #pbar.update(30)
-        client = Anthropic(api_key=api_key)
-        response = client.messages.create(
-            model=model,
-            system=system_prompt,
-            messages=[{"role": "user", "content": user_prompt}],
-            max_tokens=max_tokens,
-            temperature=temperature,
-        )
-        #pbar.update(60)
-        return response.content[0].text.strip()
-    elif llm_type == "google":
-        print("Using Google LLM")
-        from google import genai
-        model=os.getenv("GOOGLE_MODEL")
-        api_key=os.getenv("GOOGLE_API_KEY")
+def _log_usage(llm_type, response):
+    """Print token usage and execution time reported by the provider."""
+    try:
+        usage = response.usage
+        # Check available attributes
+        if hasattr(usage, 'input_tokens'):
+            print(f"Tokens used: input={usage.input_tokens}, output={usage.output_tokens}, total={getattr(usage, 'total_tokens', None)}")
+        elif hasattr(usage, 'prompt_tokens'):
+            print(f"Tokens used: prompt={usage.prompt_tokens}, completion={usage.completion_tokens}, total={usage.total_tokens}")
+        else:
+            print(f"Usage info: {usage}")
 
-        from openai import OpenAI
-        #pbar.update(30)
+        if hasattr(usage, 'total_cost'):
+            print(f"Cost: ${usage.total_cost:.6f}")
 
-        client = OpenAI(
-            api_key=api_key,
-            base_url="https://generativelanguage.googleapis.com/v1beta/openai/"
-        )
+        created_time = getattr(response, 'created_at', None)
+        completed_time = getattr(response, 'completed_at', None)
+        total_time = (completed_time - created_time) if (created_time and completed_time) else 0
+        print(f"Total execution time - {LLM_LABELS[llm_type]}: {total_time} seconds")
 
-        response = client.chat.completions.create(
-            model=model,
-            messages=[
-                {"role": "system", "content": system_prompt},
-                {"role": "user", "content": user_prompt}
-            ],
-        )
-        #pbar.update(60)
+    except Exception as e:
+        print(f"Could not retrieve usage stats: {e}")
 
-        return response.choices[0].message.content
-    elif llm_type == "deepseek":
-        print("Using Deepseek LLM")
-        from google import genai
-        model=os.getenv("DEEPSEEK_MODEL")
-        api_key=os.getenv("DEEPSEEK_API_KEY")
+def _request_key(system_prompt, user_prompt, llm_type, temperature, max_tokens):
+    """Content hash identifying one completion request (cache and single-flight key)."""
+    return LLMCache.make_key(
+        llm_type, get_model(llm_type), system_prompt, user_prompt, temperature, max_tokens
+    )
 
-        from openai import OpenAI
-        #pbar.update(30)
 
-        client = OpenAI(
-            api_key=api_key,
-            base_url="https://api.deepseek.com"
-        )
+def _cache_get(key):
+    cache = get_llm_cache()
+    return cache.get(key) if cache else None
 
-        response = client.chat.completions.create(
-            model=model,
-            messages=[
-                {"role": "system", "content": system_prompt},
-                {"role": "user", "content": user_prompt}
-            ],
-        )
-        #pbar.update(60)
-
-        print("Response: ", response.choices[0].message.content)
-        print("---------------------------------")
-        print()
-        return response.choices[0].message.content
-    elif llm_type == "groq":
-        print("Using groq LLM")
-        from google import genai
-        model=os.getenv("GROQ_MODEL")
-        api_key=os.getenv("GROQ_API_KEY")
-
-        from openai import OpenAI
-        #pbar.update(30)
-
-        client = OpenAI(
-            api_key=api_key,
-            base_url="https://api.groq.com/openai/v1"
-        )
 
-        response = client.chat.completions.create(
-            model=model,
-            messages=[
-                {"role": "system", "content": system_prompt},
-                {"role": "user", "content": user_prompt}
-            ],
-        )
-        #pbar.update(60)
+def _cache_store(key, text):
+    cache = get_llm_cache()
+    if cache and key and text:
+        cache.set(key, text)
+
+
+def _rate_limit_cost(system_prompt, user_prompt, max_tokens):
+    """Estimated tokens a chat call counts against the provider's TPM budget."""
+    return estimate_tokens(system_prompt, user_prompt) + (max_tokens or 0)
+
+
+def _retry_after(error):
+    """Seconds a 429 response asks us to wait (defaults to 1s)."""
+    headers = getattr(getattr(error, "response", None), "headers", None) or {}
+    try:
+        return float(headers.get("retry-after", 1))
+    except (TypeError, ValueError):
+        return 1.0
+
+
+def _record_failure(llm_type, error):
+    """Count the failure against the provider and re-raise it as LLMProviderError."""
+    get_health(llm_type).record_failure()
+    if getattr(error, "status_code", None) == 429:
+        get_limiter(llm_type, get_model(llm_type)).backoff(_retry_after(error))
+    print(f"Error generating LLM response: {error}")
+    if isinstance(error, LLMProviderError):
+        return error
+    return LLMProviderError(llm_type, str(error))
+
+
+# -----------------------------
+# Chat completions
+# -----------------------------
+def generate_llm_response(system_prompt, user_prompt, llm_type="openai", temperature=0.7, max_tokens=500, cache=True):
+    """
+    Generate a completion. Responses are served from the persistent completion
+    cache when possible, and identical concurrent requests share one upstream
+    call. Pass cache=False for creative stages that should produce a fresh
+    answer every time. Raises LLMProviderError if the provider fails or
+    returns no text.
+    """
+    if llm_type not in LLM_TYPES:
+        print(f"LLM type {llm_type} not supported.")
+        return None
+
+    if not cache:
+        return _call_llm(system_prompt, user_prompt, llm_type, temperature, max_tokens)
+
+    key = _request_key(system_prompt, user_prompt, llm_type, temperature, max_tokens)
+    cached = _cache_get(key)
+    if cached is not None:
+        print(f"Using cached {LLM_LABELS[llm_type]} LLM response")
+        return cached
+
+    return llm_flight.do(key, _call_llm, system_prompt, user_prompt, llm_type, temperature, max_tokens, key)
+
+
+def _call_llm(system_prompt, user_prompt, llm_type, temperature, max_tokens, key=None):
+    print(f"Using {LLM_LABELS[llm_type]} LLM")
+    endpoint, request = _chat_request(system_prompt, user_prompt, llm_type, temperature, max_tokens)
+    # Queue wait is tracked by the limiter, not in the provider latency
+    get_limiter(llm_type, request["model"]).acquire(_rate_limit_cost(system_prompt, user_prompt, max_tokens))
+
+    start = time.perf_counter()
+    try:
+        response = _create(get_client(llm_type), endpoint, request)
+        _log_usage(llm_type, response)
+        text = _response_text(endpoint, response)
+        if not text:
+            raise LLMProviderError(llm_type, "empty response")
+    except Exception as e:
+        raise _record_failure(llm_type, e) from e
+    get_health(llm_type).record_success(time.perf_counter() - start)
+
+    _cache_store(key, text)
+    print("---------------------------------")
+    print()
+    return text
+
+
+async def agenerate_llm_response(system_prompt, user_prompt, llm_type="openai", temperature=0.7, max_tokens=500, cache=True):
+    """
+    Async counterpart of generate_llm_response. Uses the provider's async
+    client and waits on the provider's concurrency semaphore, so it never
+    blocks the event loop.
+    """
+    if llm_type not in LLM_TYPES:
+        print(f"LLM type {llm_type} not supported.")
+        return None
+
+    if not cache:
+        return await _acall_llm(system_prompt, user_prompt, llm_type, temperature, max_tokens)
+
+    key = _request_key(system_prompt, user_prompt, llm_type, temperature, max_tokens)
+    # SQLite cache I/O runs off the event loop (writes may wait on other workers' locks)
+    cached = await asyncio.to_thread(_cache_get, key)
+    if cached is not None:
+        print(f"Using cached {LLM_LABELS[llm_type]} LLM response")
+        return cached
+
+    return await llm_flight.ado(key, _acall_llm, system_prompt, user_prompt, llm_type, temperature, max_tokens, key)
+
 
-        return response.choices[0].message.content
+async def _acall_llm(system_prompt, user_prompt, llm_type, temperature, max_tokens, key=None):
+    print(f"Using {LLM_LABELS[llm_type]} LLM (async)")
+    endpoint, request = _chat_request(system_prompt, user_prompt, llm_type, temperature, max_tokens)
+    await get_limiter(llm_type, request["model"]).aacquire(_rate_limit_cost(system_prompt, user_prompt, max_tokens))
+
+    try:
+        async with get_semaphore(llm_type):
+            # Latency excludes time spent queued on our own semaphore
+            start = time.perf_counter()
+            response = await _create(get_async_client(llm_type), endpoint, request)
+        _log_usage(llm_type, response)
+        text = _response_text(endpoint, response)
+        if not text:
+            raise LLMProviderError(llm_type, "empty response")
+    except Exception as e:
+        raise _record_failure(llm_type, e) from e
+    get_health(llm_type).record_success(time.perf_counter() - start)
+
+    if key:
+        await asyncio.to_thread(_cache_store, key, text)
+    print("---------------------------------")
+    print()
+    return text
     
 
+# -----------------------------
+# Streaming completions
+# -----------------------------
+def _stream_delta(endpoint, event):
+    """Text delta carried by one streamed event, or None."""
+    if endpoint == "responses":
+        return event.delta if getattr(event, "type", None) == "response.output_text.delta" else None
+    if endpoint == "messages":
+        if getattr(event, "type", None) == "content_block_delta" and getattr(event.delta, "type", None) == "text_delta":
+            return event.delta.text
+        return None
+    if event.choices:
+        return event.choices[0].delta.content
+    return None
+
+
+def stream_llm_response(system_prompt, user_prompt, llm_type="openai", temperature=0.7, max_tokens=500, cache=True):
+    """
+    Streaming variant of generate_llm_response: yields text deltas as the
+    provider produces them. A cache hit is yielded as a single chunk, and the
+    completed text is written back to the cache.
+    """
+    if llm_type not in LLM_TYPES:
+        print(f"LLM type {llm_type} not supported.")
+        return
+
+    key = _request_key(system_prompt, user_prompt, llm_type, temperature, max_tokens) if cache else None
+    cached = _cache_get(key) if key else None
+    if cached is not None:
+        yield cached
+        return
+
+    print(f"Streaming {LLM_LABELS[llm_type]} LLM")
+    endpoint, request = _chat_request(system_prompt, user_prompt, llm_type, temperature, max_tokens)
+    get_limiter(llm_type, request["model"]).acquire(_rate_limit_cost(system_prompt, user_prompt, max_tokens))
+    parts = []
+    start = time.perf_counter()
+    try:
+        for event in _create(get_client(llm_type), endpoint, {**request, "stream": True}):
+            delta = _stream_delta(endpoint, event)
+            if delta:
+                parts.append(delta)
+                yield delta
+        if not parts:
+            raise LLMProviderError(llm_type, "empty response")
+    except Exception as e:
+        raise _record_failure(llm_type, e) from e
+    get_health(llm_type).record_success(time.perf_counter() - start)
+
+    _cache_store(key, "".join(parts))
+
+
+async def astream_llm_response(system_prompt, user_prompt, llm_type="openai", temperature=0.7, max_tokens=500, cache=True):
+    """
+    Async variant of stream_llm_response using the provider's async client.
+    """
+    if llm_type not in LLM_TYPES:
+        print(f"LLM type {llm_type} not supported.")
+        return
+
+    key = _request_key(system_prompt, user_prompt, llm_type, temperature, max_tokens) if cache else None
+    cached = await asyncio.to_thread(_cache_get, key) if key else None
+    if cached is not None:
+        yield cached
+        return
+
+    print(f"Streaming {LLM_LABELS[llm_type]} LLM (async)")
+    endpoint, request = _chat_request(system_prompt, user_prompt, llm_type, temperature, max_tokens)
+    await get_limiter(llm_type, request["model"]).aacquire(_rate_limit_cost(system_prompt, user_prompt, max_tokens))
+    parts = []
+    try:
+        async with get_semaphore(llm_type):
+            start = time.perf_counter()
+            stream = await _create(get_async_client(llm_type), endpoint, {**request, "stream": True})
+            async for event in stream:
+                delta = _stream_delta(endpoint, event)
+                if delta:
+                    parts.append(delta)
+                    yield delta
+        if not parts:
+            raise LLMProviderError(llm_type, "empty response")
+    except Exception as e:
+        raise _record_failure(llm_type, e) from e
+    get_health(llm_type).record_success(time.perf_counter() - start)
+
+    if key:
+        await asyncio.to_thread(_cache_store, key, "".join(parts))
+
+
 ##### Auudio to text and text to 
 
-import whisper
+# Whisper models are loaded once per process and size, then reused. Decoding
+# installs hooks on the model, so each model transcribes one file at a time.
+_stt_models = {}
+_stt_locks = {}
+_stt_registry_lock = threading.Lock()
+
+
+def _whisper_settings(model_size=None):
+    """(model size, device, int8 quantized) used for a Whisper model."""
+    device = os.getenv("WHISPER_DEVICE", "cpu")  # or "cuda" if you have a GPU available
+    # Dynamic int8 quantization only has CPU kernels
+    quantize = device == "cpu" and os.getenv("WHISPER_QUANTIZE", "false").lower() in ("1", "true", "yes")
+    return (
+        model_size or os.getenv("WHISPER_MODEL_SIZE", "base"),  # tiny, base, small, medium, large
+        device,
+        quantize,
+    )
+
+
+def _whisper_label(model_size=None):
+    size, device, quantize = _whisper_settings(model_size)
+    return f"whisper-{size}-{device}" + ("-int8" if quantize else "")
+
+
+def _set_torch_threads(threads):
+    """Set torch's intra-op thread count for this process (0 = leave torch's default)."""
+    if not threads:
+        return
+    try:
+        import torch
+        torch.set_num_threads(threads)
+    except ImportError:
+        pass
+
+
+def _quantize_whisper(model):
+    """Dynamic int8 quantization of the model's Linear layers (attention and MLP)."""
+    import torch
+
+    # whisper's Linear subclass only adds a dtype cast in forward(); quantize_dynamic
+    # matches exact types, so present those layers as plain nn.Linear
+    for module in model.modules():
+        if isinstance(module, torch.nn.Linear) and type(module) is not torch.nn.Linear:
+            module.__class__ = torch.nn.Linear
+    return torch.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+
+
+def _stt_lock(key):
+    with _stt_registry_lock:
+        return _stt_locks.setdefault(key, threading.Lock())
+
 
-def load_STT_model(llm_type="whisper"):
+def _load_whisper(model_size, device, quantize=False):
+    # whisper pulls in torch; only load it when transcription is actually used
+    import whisper
     import ssl
     import certifi
     ssl._create_default_https_context = lambda: ssl.create_default_context(cafile=certifi.where())
     # os.environ["PYTHONHTTPSVERIFY"] = "0"
-    if llm_type == "whisper":
-        """Load and return the Whisper model."""
+    try:
+        start = time.perf_counter()
+        model = whisper.load_model(
+            model_size,
+            device=device,
+            download_root=os.getenv("WHISPER_MODEL_DIR", "./models"),  # specify the directory to store models
+            in_memory=True  # set to True to load model into memory (default is False)
+            )
+        if quantize:
+            model = _quantize_whisper(model)
+        _set_torch_threads(int(os.getenv("WHISPER_TORCH_THREADS", "0")))
+        print(
+            f"Loaded Whisper {model_size} model on {device}{' (int8)' if quantize else ''} "
+            f"in {time.perf_counter() - start:.2f}s"
+        )
+        return model
+    except Exception as e:
+        print(f"Error loading model: {e}")
+        return None
+
+
+def load_STT_model(llm_type="whisper", model_size=None):
+    """Return the process-wide Whisper model, loading it on first use."""
+    if llm_type != "whisper":
+        return None
+
+    key = _whisper_settings(model_size)
+    model = _stt_models.get(key)
+    if model is None:
+        with _stt_lock(key):
+            model = _stt_models.get(key)
+            if model is None:
+                model = _load_whisper(*key)
+                if model is not None:
+                    _stt_models[key] = model
+    return model
+
+
+def preload_STT_model(model_size=None):
+    """Load the Whisper model ahead of the first request when WHISPER_PRELOAD is set."""
+    if os.getenv("WHISPER_PRELOAD", "false").lower() in ("1", "true", "yes"):
+        load_STT_model("whisper", model_size)
+
+
+def unload_STT_models():
+    with _stt_registry_lock:
+        _stt_models.clear()
+
+
+# -----------------------------
+# Chunked Whisper transcription
+# -----------------------------
+# Long audio is split on silence and the chunks are transcribed in a process
+# pool (one warm model per worker), then stitched back together in order.
+_stt_pool = None
+_stt_pool_key = None
+_stt_pool_lock = threading.Lock()
+
+
+def _stt_workers():
+    return int(os.getenv("WHISPER_WORKERS", "0")) or os.cpu_count() or 1
+
+
+def _stt_worker_threads(workers):
+    """Torch threads per pool worker: WHISPER_TORCH_THREADS, else the cores split evenly."""
+    return int(os.getenv("WHISPER_TORCH_THREADS", "0")) or max(1, (os.cpu_count() or 1) // workers)
+
+
+def _init_stt_worker(model_size, threads):
+    """Pool initializer: split the cores between workers and load the model once."""
+    load_STT_model("whisper", model_size)
+    _set_torch_threads(threads)
+
+
+def _transcribe_chunk(audio, model_size):
+    model = load_STT_model("whisper", model_size)
+    if model is None:
+        raise RuntimeError(f"{_whisper_label(model_size)} could not be loaded in the transcription worker")
+    return model.transcribe(audio, fp16=False)["text"]
+
+
+def _get_stt_pool(model_size=None):
+    global _stt_pool, _stt_pool_key
+    workers = _stt_workers()
+    key = (_whisper_settings(model_size), workers, _stt_worker_threads(workers))
+    with _stt_pool_lock:
+        if _stt_pool is None or _stt_pool_key != key:
+            if _stt_pool is not None:
+                _stt_pool.shutdown()
+            _stt_pool = ProcessPoolExecutor(
+                max_workers=workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_init_stt_worker,
+                initargs=(model_size, _stt_worker_threads(workers)),
+            )
+            _stt_pool_key = key
+    return _stt_pool
+
+
+def shutdown_stt_pool():
+    global _stt_pool, _stt_pool_key
+    with _stt_pool_lock:
+        if _stt_pool is not None:
+            _stt_pool.shutdown()
+        _stt_pool, _stt_pool_key = None, None
+
+
+def _stitch_transcripts(texts, overlaps, max_words=30):
+    """Join chunk transcripts in order, dropping words repeated across overlapping cuts."""
+    def norm(word):
+        return re.sub(r"\W", "", word.lower())
+
+    words = []
+    for text, overlap in zip(texts, overlaps):
+        new = (text or "").split()
+        if overlap and words:
+            tail = [norm(w) for w in words[-max_words:]]
+            head = [norm(w) for w in new[:max_words]]
+            for k in range(min(len(tail), len(head)), 0, -1):
+                if tail[-k:] == head[:k]:
+                    new = new[k:]
+                    break
+        words.extend(new)
+    return " ".join(words)
+
+
+def transcribe_audio_chunked(audio, model_size=None, chunk_seconds=None):
+    """Transcribe decoded 16 kHz audio in silence-aligned chunks across the worker pool."""
+    from core.audio import split_on_silence
+
+    chunk_seconds = chunk_seconds or float(os.getenv("WHISPER_CHUNK_SECONDS", "60"))
+    chunks = split_on_silence(audio, chunk_seconds=chunk_seconds)
+    pool = _get_stt_pool(model_size)
+    texts = pool.map(_transcribe_chunk, [audio[s:e] for s, e, _ in chunks], [model_size] * len(chunks))
+    return _stitch_transcripts(list(texts), [overlap for _, _, overlap in chunks])
+
+
+def _use_chunked(chunked, audio):
+    """Explicit flag, else WHISPER_CHUNKED (auto: long audio and more than one worker)."""
+    from core.audio import duration_seconds
+
+    if chunked is not None:
+        return chunked
+    mode = os.getenv("WHISPER_CHUNKED", "auto").lower()
+    if mode == "auto":
+        return _stt_workers() > 1 and duration_seconds(audio) >= float(os.getenv("WHISPER_CHUNKED_MIN_SECONDS", "120"))
+    return mode in ("1", "true", "yes")
+
+
+# -----------------------------
+# Audio preprocessing
+# -----------------------------
+def _trim_enabled(trim=None):
+    if trim is not None:
+        return trim
+    return os.getenv("AUDIO_TRIM_SILENCE", "true").lower() in ("1", "true", "yes")
+
+
+def preprocess_audio(audio_file_path, trim=None):
+    """
+    Decode audio once to 16 kHz mono and cut silence (unless trim is False /
+    AUDIO_TRIM_SILENCE=false). Returns the audio array, the kept speech
+    segments with their original timestamps, and the seconds removed.
+    """
+    from core.audio import load_audio, trim_silence, duration_seconds
+
+    start = time.perf_counter()
+    audio = load_audio(audio_file_path)
+    original_seconds = duration_seconds(audio)
+    if _trim_enabled(trim):
+        audio, segments = trim_silence(audio)
+    else:
+        segments = [{"start": 0.0, "end": original_seconds, "offset": 0.0}]
+    speech_seconds = duration_seconds(audio)
+
+    return {
+        "audio": audio,
+        "segments": segments,
+        "original_seconds": original_seconds,
+        "speech_seconds": speech_seconds,
+        "removed_seconds": original_seconds - speech_seconds,
+        "preprocess_seconds": time.perf_counter() - start,
+    }
+
+
+def _speech_upload(prepared, audio_file_path, tmp):
+    """
+    File to send an API backend for the trimmed speech: an MP3 in `tmp` (WAV
+    if ffmpeg cannot encode), or the original file when that upload would be
+    larger than the original or over AUDIO_UPLOAD_MAX_BYTES (OpenAI rejects
+    files over 25 MB).
+    """
+    from core.audio import write_mp3, write_wav
+
+    speech_path = os.path.join(tmp, "speech.mp3")
+    try:
+        write_mp3(speech_path, prepared["audio"])
+    except (OSError, subprocess.CalledProcessError) as e:
+        print(f"Could not encode speech as MP3, falling back to WAV: {e}")
+        speech_path = os.path.join(tmp, "speech.wav")
+        write_wav(speech_path, prepared["audio"])
+
+    size = os.path.getsize(speech_path)
+    limit = int(os.getenv("AUDIO_UPLOAD_MAX_BYTES", str(25 * 1024 * 1024)))
+    if size > os.path.getsize(audio_file_path) or size > limit:
+        print(f"Trimmed speech upload is {size / 1e6:.1f} MB, sending the original file instead")
+        return audio_file_path
+    return speech_path
+
+
+def _transcribe_whisper(prepared, model_size=None, chunked=None):
+    """Whisper on preprocessed audio; segment timestamps refer to the original file."""
+    from core.audio import original_time
+
+    audio = prepared["audio"]
+    if _use_chunked(chunked, audio):
         try:
-            model = whisper.load_model(
-                "base",  # model size: tiny, base, small, medium, large
-                device="cpu",  # or "cuda" if you have a GPU available
-                download_root="./models",  # specify the directory to store models
-                in_memory=True  # set to True to load model into memory (default is False)
-                )
-            return model
-        except Exception as e:
-            print(f"Error loading model: {e}")
-            return None
+            return {"text": transcribe_audio_chunked(audio, model_size), "segments": []}
+        except RuntimeError as e:  # model load failure in a worker, or a broken pool
+            print(f"Chunked transcription failed, transcribing in this process: {e}")
 
+    model = load_STT_model("whisper", model_size)
+    if model is None:
+        return None
+    with _stt_lock(_whisper_settings(model_size)):
+        result = model.transcribe(audio, fp16=False)
+    segments = [
+        {
+            "start": original_time(seg["start"], prepared["segments"]),
+            "end": original_time(seg["end"], prepared["segments"]),
+            "text": seg["text"],
+        }
+        for seg in result.get("segments", [])
+    ]
+    return {"text": result["text"], "segments": segments}
 
-def transcribe_audio(audio_file_path, llm_type="whisper"):
+
+def _transcription_model(llm_type, model_size=None):
+    """Model identity of a transcription backend (part of the transcript cache key)."""
     if llm_type == "whisper":
-        model = load_STT_model(llm_type)
-        if model is None:
-            return None
+        return _whisper_label(model_size)
+    if llm_type == "openai":
+        return get_model("openai", env_var="OPENAI_AUDIO_MODEL")
+    if llm_type == "google_openai":
+        return "gemini-2.0-flash"
+    return get_model("google")
 
+
+def _chunked_mode(llm_type, chunked):
+    """
+    Whisper's chunked setting as far as it can be known before decoding (chunked
+    results have no segments). "auto" resolves the same way for the same file
+    while the worker count and threshold are unchanged, so those are included.
+    """
+    if llm_type != "whisper":
+        return None
+    if chunked is not None:
+        return bool(chunked)
+    mode = os.getenv("WHISPER_CHUNKED", "auto").lower()
+    if mode == "auto":
+        return ["auto", _stt_workers() > 1, float(os.getenv("WHISPER_CHUNKED_MIN_SECONDS", "120"))]
+    return mode in ("1", "true", "yes")
+
+
+def _transcript_key(audio_file_path, llm_type, model_size, trim, chunked=None):
+    from core.audio import hash_audio_file
+
+    payload = json.dumps([
+        hash_audio_file(audio_file_path), llm_type, _transcription_model(llm_type, model_size), _trim_enabled(trim),
+        _chunked_mode(llm_type, chunked),
+    ])
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def transcribe_audio_detailed(audio_file_path, llm_type="whisper", model_size=None, chunked=None, trim=None):
+    """
+    Transcribe an audio file after decoding it once and trimming silence.
+    Only speech is sent to the backend (API backends get an MP3 of the speech
+    segments, or the original file when that would be a smaller upload).
+    Returns {"text", "segments", "speech_segments", "original_seconds",
+    "speech_seconds", "removed_seconds", "transcribe_seconds"}, with
+    timestamps in the original recording.
+
+    Results are cached by (audio content hash, backend, model, trimming,
+    Whisper chunked mode), so retries of the same file skip decoding,
+    uploading and transcription.
+    """
+    if llm_type not in ("whisper", "openai", "google_openai", "google"):
+        print(f"LLM type {llm_type} not supported for transcription.")
+        return None
+    if not audio_file_path:
+        return None
+
+    cache = get_transcript_cache()
+    key = _transcript_key(audio_file_path, llm_type, model_size, trim, chunked) if cache else None
+    cached = cache.get(key) if key else None
+    if cached is not None:
+        print(f"Using cached transcript for {os.path.basename(audio_file_path)}")
+        return {**json.loads(cached), "cached": True}
+
+    result = _transcribe_audio_uncached(audio_file_path, llm_type, model_size, chunked, trim)
+    if key and result and result.get("text"):
+        cache.set(key, json.dumps(result))
+    return result
+
+
+def _transcribe_audio_uncached(audio_file_path, llm_type, model_size, chunked, trim):
+    prepared = None
+    if llm_type == "whisper" or _trim_enabled(trim):
+        try:
+            prepared = preprocess_audio(audio_file_path, trim)
+        except Exception as e:
+            if llm_type == "whisper":
+                print(f"Error during transcription: {e}")
+                return None
+            print(f"Audio preprocessing failed, sending the original file: {e}")
+
+    start = time.perf_counter()
+    if llm_type == "whisper":
         try:
-            if audio_file_path:
-                result = model.transcribe(audio_file_path, fp16=False)
-                return result["text"]
+            result = _transcribe_whisper(prepared, model_size, chunked)
         except Exception as e:
             print(f"Error during transcription: {e}")
             return None
-    elif llm_type == "openai":
-        from openai import OpenAI
-        model=os.getenv("OPENAI_AUDIO_MODEL")
-        client = OpenAI()
-        audio_file = open(audio_file_path, "rb")
+    elif prepared is not None:
+        import tempfile
 
-        result = client.audio.transcriptions.create(
-            model=model,
-            file=audio_file,
-            response_format="text"
+        with tempfile.TemporaryDirectory() as tmp:
+            upload_path = _speech_upload(prepared, audio_file_path, tmp)
+            if upload_path == audio_file_path:
+                prepared = None  # the untrimmed recording is transcribed
+            result = _transcribe_file(upload_path, llm_type)
+    else:
+        result = _transcribe_file(audio_file_path, llm_type)
+    if result is None:
+        return None
+    transcribe_seconds = time.perf_counter() - start
+
+    if prepared is None:
+        return {**result, "speech_segments": [], "transcribe_seconds": transcribe_seconds}
+
+    original, removed = prepared["original_seconds"], prepared["removed_seconds"]
+    if original:
+        print(
+            f"Audio preprocessing: removed {removed:.1f}s of {original:.1f}s ({removed / original:.0%}), "
+            f"{original / max(prepared['speech_seconds'], 1e-6):.2f}x less audio, transcribed in {transcribe_seconds:.2f}s"
         )
+    return {
+        **result,
+        "speech_segments": prepared["segments"],
+        "original_seconds": original,
+        "speech_seconds": prepared["speech_seconds"],
+        "removed_seconds": removed,
+        "transcribe_seconds": transcribe_seconds,
+    }
+
+
+def transcribe_audio(audio_file_path, llm_type="whisper", model_size=None, chunked=None, trim=None):
+    result = transcribe_audio_detailed(audio_file_path, llm_type, model_size, chunked, trim)
+    return result["text"] if result else None
 
-        return result
-    elif llm_type == "google_openai":
-        from google import genai
-        model=os.getenv("GOOGLE_MODEL")
-        api_key=os.getenv("GOOGLE_API_KEY")
 
+def _transcribe_file(audio_file_path, llm_type):
+    """Send an audio file to an API transcription backend; returns {"text", "segments"}."""
+    if llm_type == "openai":
+        model = get_model("openai", env_var="OPENAI_AUDIO_MODEL")
+        client = get_client("openai")
+
+        with open(audio_file_path, "rb") as audio_file:
+            result = client.audio.transcriptions.create(
+                model=model,
+                file=audio_file,
+                response_format="text"
+            )
+
+        return {"text": result, "segments": []}
+    elif llm_type == "google_openai":
         import base64
-        from openai import OpenAI
 
-        client = OpenAI(
-            api_key=api_key,
-            base_url="https://generativelanguage.googleapis.com/v1beta/openai/"
-        )
+        client = get_client("google")
 
         if audio_file_path.endswith(".mp3"):
             audio_format = "mp3"
@@ -313,15 +809,11 @@ def transcribe_audio(audio_file_path, llm_type="whisper"):
         ],
         )
 
-        return response.choices[0].message.content
+        return {"text": response.choices[0].message.content, "segments": []}
     elif llm_type == "google":
-        from google import genai
-        model=os.getenv("GOOGLE_MODEL")
-        api_key=os.getenv("GOOGLE_API_KEY")
+        model = get_model("google")
 
-        from google import genai
-
-        client = genai.Client()
+        client = get_client("google_genai")
         myfile = client.files.upload(file=audio_file_path)
         prompt = 'Generate a transcript of the speech.'
 
@@ -330,26 +822,207 @@ def transcribe_audio(audio_file_path, llm_type="whisper"):
             contents=[prompt, myfile]
         )
 
-        return response.text
-    else:
-        print(f"LLM type {llm_type} not supported for transcription.")
-        return None
+        return {"text": response.text, "segments": []}
 
-def generate_embedding(text: str, llm_type="openai") -> List[float]:
+def _embedding_key(text, llm_type, model):
+    return hashlib.sha256(f"{llm_type}\0{model}\0{text}".encode("utf-8")).hexdigest()
+
+
+def _embedding_model():
+    """
+    (API model, extra request options, cache label) for OpenAI embeddings.
+    OPENAI_EMBEDDING_DIMENSIONS asks text-embedding-3 models for shorter vectors.
+    """
+    model = get_model("openai", env_var="OPENAI_EMBEDDING_MODEL")
+    dimensions = int(os.getenv("OPENAI_EMBEDDING_DIMENSIONS", "0"))
+    if dimensions:
+        return model, {"dimensions": dimensions}, f"{model}:{dimensions}"
+    return model, {}, model
+
+
+def _stored_embeddings(model, texts):
+    """(store, store keys, vectors already stored) for distinct texts; store is None when disabled."""
+    store = get_embedding_store()
+    if store is None:
+        return None, {}, {}
+    keys = {t: EmbeddingStore.make_key(model, t) for t in texts}
+    found = store.get_many(list(keys.values()))
+    return store, keys, {t: found[k] for t, k in keys.items() if k in found}
+
+
+def _embedding_backend(llm_type=None):
+    """Embedding backend: the explicit llm_type, else EMBEDDING_BACKEND (openai or local)."""
+    return llm_type or os.getenv("EMBEDDING_BACKEND", "openai")
+
+
+def generate_embedding(text: str, llm_type=None) -> List[float]:
     """
     Generate embedding vector for the given text using specified LLM.
+    Vectors are served from the persistent embedding store when present;
+    identical concurrent requests share one upstream call. llm_type="local"
+    embeds offline (see core.local_embeddings).
     """
+    llm_type = _embedding_backend(llm_type)
+    if llm_type == "local":
+        return get_local_embedder().embed([text])[0]
     if llm_type == "openai":
-        from openai import OpenAI
-        model=os.getenv("OPENAI_EMBEDDING_MODEL")
-        client = OpenAI()
+        model, options, label = _embedding_model()
+        client = get_client("openai")
 
-        response = client.embeddings.create(
-            model=model,
-            input=text
-        )
+        def embed():
+            get_limiter("embedding", model).acquire(estimate_tokens(text))
+            try:
+                response = client.embeddings.create(
+                    model=model,
+                    input=text,
+                    **options
+                )
+            except Exception as e:
+                if getattr(e, "status_code", None) == 429:
+                    get_limiter("embedding", model).backoff(_retry_after(e))
+                raise
+            return response.data[0].embedding
 
-        return response.data[0].embedding
+        store, keys, stored = _stored_embeddings(label, [text])
+        if text in stored:
+            return stored[text]
+        vector = embedding_flight.do(_embedding_key(text, llm_type, label), embed)
+        if store:
+            store.put(keys[text], vector)
+        return vector
     else:
         print(f"LLM type {llm_type} not supported for embeddings.")
-        return []
\ No newline at end of file
+        return []
+
+def _embedding_batches(texts):
+    """
+    Group texts into embedding requests under EMBEDDING_BATCH_MAX_TOKENS
+    (estimated) and EMBEDDING_BATCH_MAX_INPUTS.
+    """
+    max_tokens = int(os.getenv("EMBEDDING_BATCH_MAX_TOKENS", "100000"))
+    max_inputs = int(os.getenv("EMBEDDING_BATCH_MAX_INPUTS", "256"))
+    batch, tokens = [], 0
+    for text in texts:
+        cost = estimate_tokens(text)
+        if batch and (tokens + cost > max_tokens or len(batch) >= max_inputs):
+            yield batch
+            batch, tokens = [], 0
+        batch.append(text)
+        tokens += cost
+    if batch:
+        yield batch
+
+
+def generate_embeddings(texts: List[str], llm_type=None) -> List[List[float]]:
+    """
+    Embed many texts with as few requests as possible. Duplicates are sent
+    once; vectors come back in the order of `texts`.
+    """
+    llm_type = _embedding_backend(llm_type)
+    if llm_type == "local":
+        return list(get_local_embedder().embed(texts))
+    if llm_type != "openai":
+        print(f"LLM type {llm_type} not supported for embeddings.")
+        return [[] for _ in texts]
+
+    model, options, label = _embedding_model()
+    client = get_client("openai")
+
+    def embed(batch):
+        get_limiter("embedding", model).acquire(estimate_tokens(*batch))
+        try:
+            response = client.embeddings.create(model=model, input=batch, **options)
+        except Exception as e:
+            if getattr(e, "status_code", None) == 429:
+                get_limiter("embedding", model).backoff(_retry_after(e))
+            raise
+        return [item.embedding for item in sorted(response.data, key=lambda item: item.index)]
+
+    unique = list(dict.fromkeys(texts))
+    store, keys, vectors = _stored_embeddings(label, unique)
+    missing = [t for t in unique if t not in vectors]
+    for batch in _embedding_batches(missing):
+        key = _embedding_key("\0".join(batch), llm_type, label)
+        vectors.update(zip(batch, embedding_flight.do(key, embed, batch)))
+    if store:
+        store.put_many({keys[t]: vectors[t] for t in missing})
+    return [vectors[t] for t in texts]
+
+
+async def agenerate_embedding(text: str, llm_type=None) -> List[float]:
+    """
+    Async counterpart of generate_embedding.
+    """
+    llm_type = _embedding_backend(llm_type)
+    if llm_type == "local":
+        return get_local_embedder().embed([text])[0]
+    if llm_type == "openai":
+        model, options, label = _embedding_model()
+        client = get_async_client("openai")
+
+        async def embed():
+            await get_limiter("embedding", model).aacquire(estimate_tokens(text))
+            try:
+                async with get_semaphore("openai"):
+                    response = await client.embeddings.create(
+                        model=model,
+                        input=text,
+                        **options
+                    )
+            except Exception as e:
+                if getattr(e, "status_code", None) == 429:
+                    get_limiter("embedding", model).backoff(_retry_after(e))
+                raise
+            return response.data[0].embedding
+
+        # Store lookups and writes touch SQLite; keep them off the event loop
+        store, keys, stored = await asyncio.to_thread(_stored_embeddings, label, [text])
+        if text in stored:
+            return stored[text]
+        vector = await embedding_flight.ado(_embedding_key(text, llm_type, label), embed)
+        if store:
+            await asyncio.to_thread(store.put, keys[text], vector)
+        return vector
+    else:
+        print(f"LLM type {llm_type} not supported for embeddings.")
+        return []
+
+
+async def agenerate_embeddings(texts: List[str], llm_type=None) -> List[List[float]]:
+    """
+    Async counterpart of generate_embeddings; batches are sent concurrently.
+    """
+    llm_type = _embedding_backend(llm_type)
+    if llm_type == "local":
+        return list(get_local_embedder().embed(texts))
+    if llm_type != "openai":
+        print(f"LLM type {llm_type} not supported for embeddings.")
+        return [[] for _ in texts]
+
+    model, options, label = _embedding_model()
+    client = get_async_client("openai")
+
+    async def embed(batch):
+        await get_limiter("embedding", model).aacquire(estimate_tokens(*batch))
+        try:
+            async with get_semaphore("openai"):
+                response = await client.embeddings.create(model=model, input=batch, **options)
+        except Exception as e:
+            if getattr(e, "status_code", None) == 429:
+                get_limiter("embedding", model).backoff(_retry_after(e))
+            raise
+        return [item.embedding for item in sorted(response.data, key=lambda item: item.index)]
+
+    unique = list(dict.fromkeys(texts))
+    store, keys, vectors = await asyncio.to_thread(_stored_embeddings, label, unique)
+    missing = [t for t in unique if t not in vectors]
+    batches = list(_embedding_batches(missing))
+    results = await asyncio.gather(*(
+        embedding_flight.ado(_embedding_key("\0".join(batch), llm_type, label), embed, batch)
+        for batch in batches
+    ))
+    for batch, batch_vectors in zip(batches, results):
+        vectors.update(zip(batch, batch_vectors))
+    if store and missing:
+        await asyncio.to_thread(store.put_many, {keys[t]: vectors[t] for t in missing})
+    return [vectors[t] for t in texts]
@@ -0,0 +1,174 @@
+"""
+Per-provider health tracking: latency histograms and circuit breakers.
+
+core.model records every upstream call here; core.routing reads the p95
+latency to decide when to hedge and the breaker state to decide whether a
+provider may be tried at all.
+"""
+import math
+import os
+import threading
+import time
+from typing import Dict, List
+
+# Latency buckets: 10ms .. ~330s, ~20% apart
+BUCKET_BOUNDS = [0.01 * (1.2 ** i) for i in range(58)]
+
+HISTOGRAM_WINDOW = int(os.getenv("LLM_LATENCY_WINDOW", "500"))
+BREAKER_FAILURE_THRESHOLD = int(os.getenv("LLM_BREAKER_FAILURES", "5"))
+BREAKER_COOLDOWN_SECONDS = float(os.getenv("LLM_BREAKER_COOLDOWN_SECONDS", "30"))
+
+
+class LatencyHistogram:
+    """
+    Bucketed latency histogram. Counts are halved whenever the total passes
+    the window size, so quantiles track recent behaviour.
+    """
+
+    def __init__(self, window: int = HISTOGRAM_WINDOW):
+        self.window = window
+        self.counts = [0.0] * (len(BUCKET_BOUNDS) + 1)
+        self.total = 0.0
+        self._lock = threading.Lock()
+
+    def record(self, seconds: float):
+        idx = 0
+        if seconds > BUCKET_BOUNDS[0]:
+            idx = min(len(BUCKET_BOUNDS), int(math.ceil(math.log(seconds / BUCKET_BOUNDS[0], 1.2))))
+        with self._lock:
+            self.counts[idx] += 1
+            self.total += 1
+            if self.total > self.window:
+                self.counts = [c / 2 for c in self.counts]
+                self.total /= 2
+
+    def quantile(self, q: float):
+        """Upper bound of the bucket holding the q-quantile, or None if empty."""
+        with self._lock:
+            if not self.total:
+                return None
+            target = q * self.total
+            running = 0.0
+            for idx, count in enumerate(self.counts):
+                running += count
+                if running >= target:
+                    return BUCKET_BOUNDS[min(idx, len(BUCKET_BOUNDS) - 1)]
+        return BUCKET_BOUNDS[-1]
+
+    def samples(self) -> float:
+        with self._lock:
+            return self.total
+
+
+class CircuitBreaker:
+    """
+    Consecutive-failure circuit breaker. Opens after `failure_threshold`
+    failures in a row, rejects calls for `cooldown` seconds, then lets a
+    single trial call through (half-open) before closing again.
+    """
+
+    def __init__(self, failure_threshold: int = BREAKER_FAILURE_THRESHOLD, cooldown: float = BREAKER_COOLDOWN_SECONDS):
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+        self.state = "closed"
+        self.consecutive_failures = 0
+        self.opened_at = 0.0
+        self._trial_in_flight = False
+        self._trial_id = 0
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """
+        Ticket for one call, or None if the breaker rejects it: 0 while closed,
+        a trial id for the single half-open trial. Pass it to release() when
+        the call ends however it ends (success, failure, cache hit, cancelled).
+        """
+        with self._lock:
+            if self.state == "closed":
+                return 0
+            if self.state == "open" and time.monotonic() - self.opened_at >= self.cooldown:
+                self.state = "half_open"
+                self._trial_in_flight = False
+            if self.state == "half_open" and not self._trial_in_flight:
+                self._trial_in_flight = True
+                self._trial_id += 1
+                return self._trial_id
+            return None
+
+    def allow(self) -> bool:
+        """Whether acquire() would admit a call now (does not take the trial)."""
+        with self._lock:
+            if self.state == "closed":
+                return True
+            if self.state == "open":
+                return time.monotonic() - self.opened_at >= self.cooldown
+            return not self._trial_in_flight
+
+    def release(self, ticket):
+        """
+        End a call admitted by acquire(). A trial that finished without
+        recording a result frees the half-open slot for the next caller.
+        """
+        with self._lock:
+            if ticket and ticket == self._trial_id:
+                self._trial_in_flight = False
+
+    def record_success(self):
+        with self._lock:
+            self.state = "closed"
+            self.consecutive_failures = 0
+            self._trial_in_flight = False
+
+    def record_failure(self):
+        with self._lock:
+            self.consecutive_failures += 1
+            self._trial_in_flight = False
+            if self.state == "half_open" or self.consecutive_failures >= self.failure_threshold:
+                self.state = "open"
+                self.opened_at = time.monotonic()
+
+
+class ProviderHealth:
+    def __init__(self, name: str):
+        self.name = name
+        self.latency = LatencyHistogram()
+        self.breaker = CircuitBreaker()
+        self.successes = 0
+        self.failures = 0
+
+    def record_success(self, seconds: float):
+        self.latency.record(seconds)
+        self.breaker.record_success()
+        self.successes += 1
+
+    def record_failure(self):
+        self.breaker.record_failure()
+        self.failures += 1
+
+    def stats(self) -> Dict:
+        return {
+            "successes": self.successes,
+            "failures": self.failures,
+            "breaker": self.breaker.state,
+            "latency_samples": round(self.latency.samples(), 1),
+            "p50": self.latency.quantile(0.50),
+            "p95": self.latency.quantile(0.95),
+            "p99": self.latency.quantile(0.99),
+        }
+
+
+_health = {}
+_health_lock = threading.Lock()
+
+
+def get_health(llm_type: str) -> ProviderHealth:
+    health = _health.get(llm_type)
+    if health is None:
+        with _health_lock:
+            health = _health.setdefault(llm_type, ProviderHealth(llm_type))
+    return health
+
+
+def provider_health_stats(llm_types: List[str] = None) -> Dict[str, Dict]:
+    names = llm_types if llm_types is not None else list(_health)
+    return {name: get_health(name).stats() for name in names}
@@ -0,0 +1,227 @@
+"""
+Process-wide registry of provider SDK clients.
+
+Every LLM, embedding and transcription call goes through the clients built
+here, so each provider gets exactly one client per process and its HTTP
+keep-alive pool is reused across requests instead of paying a fresh TLS
+handshake on every call.
+
+Async clients and the per-provider concurrency semaphores are kept per event
+loop, since httpx async pools cannot be shared across loops.
+"""
+import asyncio
+import os
+import threading
+import weakref
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# -----------------------------
+# Provider settings
+# -----------------------------
+# llm_type -> client name + env var holding the model name
+LLM_TYPES = {
+    "openai": {"client": "openai", "model_env": "OPENAI_MODEL"},
+    "openai_reasoning": {"client": "openai", "model_env": "OPENAI_REASONING_MODEL"},
+    "claude": {"client": "anthropic", "model_env": "CLAUDE_MODEL"},
+    "google": {"client": "google", "model_env": "GOOGLE_MODEL"},
+    "deepseek": {"client": "deepseek", "model_env": "DEEPSEEK_MODEL"},
+    "groq": {"client": "groq", "model_env": "GROQ_MODEL"},
+}
+
+# client name -> SDK + credentials
+CLIENTS = {
+    "openai": {"sdk": "openai", "api_key_env": "OPENAI_API_KEY", "base_url": None},
+    "anthropic": {"sdk": "anthropic", "api_key_env": "ANTHROPIC_API_KEY", "base_url": None},
+    "google": {
+        "sdk": "openai",
+        "api_key_env": "GOOGLE_API_KEY",
+        "base_url": "https://generativelanguage.googleapis.com/v1beta/openai/",
+    },
+    "deepseek": {"sdk": "openai", "api_key_env": "DEEPSEEK_API_KEY", "base_url": "https://api.deepseek.com"},
+    "groq": {"sdk": "openai", "api_key_env": "GROQ_API_KEY", "base_url": "https://api.groq.com/openai/v1"},
+    "google_genai": {"sdk": "genai", "api_key_env": "GOOGLE_API_KEY", "base_url": None},
+}
+
+# Connection pool sizing. One pool per provider per process, so size it for
+# the number of concurrent requests a single worker is expected to serve.
+POOL_MAX_CONNECTIONS = int(os.getenv("LLM_POOL_MAX_CONNECTIONS", "32"))
+POOL_MAX_KEEPALIVE = int(os.getenv("LLM_POOL_MAX_KEEPALIVE", str(POOL_MAX_CONNECTIONS)))
+POOL_KEEPALIVE_EXPIRY = float(os.getenv("LLM_POOL_KEEPALIVE_EXPIRY", "60"))
+
+# Max in-flight async calls per provider per worker. Override per provider
+# with e.g. LLM_MAX_CONCURRENCY_OPENAI=4 or LLM_MAX_CONCURRENCY_GROQ=2.
+DEFAULT_MAX_CONCURRENCY = int(os.getenv("LLM_MAX_CONCURRENCY", "16"))
+
+_clients = {}
+_models = {}
+_lock = threading.Lock()
+
+# event loop -> {client name: async client / semaphore}
+_async_clients = weakref.WeakKeyDictionary()
+_semaphores = weakref.WeakKeyDictionary()
+
+
+def client_name(llm_type: str) -> str:
+    """Map an llm_type (or a bare client name) to its registry client name."""
+    if llm_type in LLM_TYPES:
+        return LLM_TYPES[llm_type]["client"]
+    if llm_type in CLIENTS:
+        return llm_type
+    raise ValueError(f"Unknown provider: {llm_type}")
+
+
+def _pool_limits():
+    import httpx
+
+    return httpx.Limits(
+        max_connections=POOL_MAX_CONNECTIONS,
+        max_keepalive_connections=POOL_MAX_KEEPALIVE,
+        keepalive_expiry=POOL_KEEPALIVE_EXPIRY,
+    )
+
+
+def _build_client(name: str):
+    settings = CLIENTS[name]
+    api_key = os.getenv(settings["api_key_env"])
+    base_url = settings["base_url"]
+
+    if settings["sdk"] == "openai":
+        from openai import OpenAI, DefaultHttpxClient
+
+        kwargs = {"http_client": DefaultHttpxClient(limits=_pool_limits())}
+        # The default OpenAI client keeps honouring OPENAI_BASE_URL on its own
+        if base_url:
+            kwargs["base_url"] = base_url
+        if api_key:
+            kwargs["api_key"] = api_key
+        return OpenAI(**kwargs)
+
+    if settings["sdk"] == "anthropic":
+        from anthropic import Anthropic, DefaultHttpxClient
+
+        return Anthropic(api_key=api_key, http_client=DefaultHttpxClient(limits=_pool_limits()))
+
+    if settings["sdk"] == "genai":
+        from google import genai
+
+        return genai.Client(api_key=api_key) if api_key else genai.Client()
+
+    raise ValueError(f"Unsupported SDK for provider {name}: {settings['sdk']}")
+
+
+def _build_async_client(name: str):
+    settings = CLIENTS[name]
+    api_key = os.getenv(settings["api_key_env"])
+    base_url = settings["base_url"]
+
+    if settings["sdk"] == "openai":
+        from openai import AsyncOpenAI, DefaultAsyncHttpxClient
+
+        kwargs = {"http_client": DefaultAsyncHttpxClient(limits=_pool_limits())}
+        if base_url:
+            kwargs["base_url"] = base_url
+        if api_key:
+            kwargs["api_key"] = api_key
+        return AsyncOpenAI(**kwargs)
+
+    if settings["sdk"] == "anthropic":
+        from anthropic import AsyncAnthropic, DefaultAsyncHttpxClient
+
+        return AsyncAnthropic(api_key=api_key, http_client=DefaultAsyncHttpxClient(limits=_pool_limits()))
+
+    if settings["sdk"] == "genai":
+        # google-genai exposes its async surface on the sync client
+        return get_client(name).aio
+
+    raise ValueError(f"Unsupported SDK for provider {name}: {settings['sdk']}")
+
+
+def get_client(llm_type: str):
+    """
+    Return the shared client for the given llm_type or client name,
+    building it on first use.
+    """
+    name = client_name(llm_type)
+    client = _clients.get(name)
+    if client is not None:
+        return client
+
+    with _lock:
+        client = _clients.get(name)
+        if client is None:
+            client = _build_client(name)
+            _clients[name] = client
+    return client
+
+
+def get_async_client(llm_type: str):
+    """
+    Return the shared async client for the given llm_type on the running
+    event loop, building it on first use.
+    """
+    name = client_name(llm_type)
+    loop = asyncio.get_running_loop()
+    clients = _async_clients.setdefault(loop, {})
+    if name not in clients:
+        clients[name] = _build_async_client(name)
+    return clients[name]
+
+
+def max_concurrency(llm_type: str) -> int:
+    """Configured concurrency limit for a provider."""
+    name = client_name(llm_type)
+    return int(os.getenv(f"LLM_MAX_CONCURRENCY_{name.upper()}", str(DEFAULT_MAX_CONCURRENCY)))
+
+
+def get_semaphore(llm_type: str) -> asyncio.Semaphore:
+    """Per-provider semaphore bounding in-flight async calls on this loop."""
+    name = client_name(llm_type)
+    loop = asyncio.get_running_loop()
+    semaphores = _semaphores.setdefault(loop, {})
+    if name not in semaphores:
+        semaphores[name] = asyncio.Semaphore(max_concurrency(name))
+    return semaphores[name]
+
+
+def get_model(llm_type: str, env_var: str = None, default: str = None) -> str:
+    """
+    Return the configured model name for an llm_type. The env var is read
+    once per process; pass env_var for non-chat models (embeddings, audio).
+    """
+    key = env_var or LLM_TYPES[llm_type]["model_env"]
+    if key not in _models:
+        _models[key] = os.getenv(key, default)
+    return _models[key]
+
+
+def reset_providers():
+    """Close and forget every cached client (used by tests and benchmarks)."""
+    with _lock:
+        for client in _clients.values():
+            close = getattr(client, "close", None)
+            if callable(close):
+                try:
+                    close()
+                except Exception as e:
+                    print(f"Error closing provider client: {e}")
+        _clients.clear()
+        _models.clear()
+        _async_clients.clear()
+        _semaphores.clear()
+
+
+async def aclose_providers():
+    """Close the async clients bound to the running event loop."""
+    clients = _async_clients.pop(asyncio.get_running_loop(), {})
+    for client in clients.values():
+        close = getattr(client, "close", None)
+        if close is None:
+            continue
+        try:
+            result = close()
+            if asyncio.iscoroutine(result):
+                await result
+        except Exception as e:
+            print(f"Error closing async provider client: {e}")
@@ -0,0 +1,244 @@
+"""
+Token-bucket rate-limit scheduler for outbound model calls.
+
+Every provider/model pair gets a requests-per-minute and a tokens-per-minute
+bucket (LLM_RPM_<LLM_TYPE> / LLM_TPM_<LLM_TYPE>, LLM_RPM_EMBEDDING, ...;
+unset or 0 means unlimited). Calls estimate their token cost before dispatch
+and queue until both buckets can cover it instead of hitting provider 429s.
+The queue is ordered by priority class, then arrival, so interactive
+/api/analyze traffic goes ahead of batch jobs.
+
+Queue wait is tracked here, separately from the provider latency recorded in
+core.provider_health.
+"""
+import asyncio
+import contextvars
+import heapq
+import itertools
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict
+from dotenv import load_dotenv
+
+from core.provider_health import LatencyHistogram
+
+load_dotenv()
+
+PRIORITIES = {"interactive": 0, "batch": 1}
+
+# Non-head async waiters re-check the queue this often
+ASYNC_POLL_SECONDS = 0.05
+
+_priority = contextvars.ContextVar("llm_priority", default="interactive")
+
+
+@contextmanager
+def llm_priority(name: str):
+    """Run the enclosed model calls in the given priority class."""
+    if name not in PRIORITIES:
+        raise ValueError(f"Unknown priority class: {name}")
+    token = _priority.set(name)
+    try:
+        yield
+    finally:
+        _priority.reset(token)
+
+
+def current_priority() -> str:
+    return _priority.get()
+
+
+def estimate_tokens(*texts: str) -> int:
+    """Rough prompt token estimate (~4 characters per token)."""
+    return sum(len(t or "") for t in texts) // 4 + 8
+
+
+class TokenBucket:
+    """Bucket refilled continuously at `per_minute` units per minute."""
+
+    def __init__(self, per_minute: float):
+        self.capacity = float(per_minute)
+        self.rate = per_minute / 60.0
+        self.level = self.capacity
+        self.updated = time.monotonic()
+
+    def _refill(self, now):
+        self.level = min(self.capacity, self.level + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_time(self, amount: float, now: float) -> float:
+        self._refill(now)
+        # A request larger than the whole bucket waits for a full bucket
+        amount = min(amount, self.capacity)
+        if self.level >= amount:
+            return 0.0
+        return (amount - self.level) / self.rate
+
+    def consume(self, amount: float):
+        self.level -= min(amount, self.capacity)
+
+    def drain(self):
+        self.level = 0.0
+        self.updated = time.monotonic()
+
+
+class RateLimiter:
+    """RPM + TPM buckets with a priority-ordered wait queue."""
+
+    def __init__(self, key: str, rpm: float, tpm: float):
+        self.key = key
+        self.rpm = rpm
+        self.tpm = tpm
+        self.requests = TokenBucket(rpm) if rpm else None
+        self.tokens = TokenBucket(tpm) if tpm else None
+        self.blocked_until = 0.0
+        self.queue_wait = LatencyHistogram()
+        self.counters = {"granted": 0, "queued": 0, "wait_seconds": 0.0, "backoffs": 0}
+        self.by_priority = {name: 0 for name in PRIORITIES}
+        self._queue = []
+        self._seq = itertools.count()
+        self._cond = threading.Condition()
+
+    @property
+    def unlimited(self) -> bool:
+        return self.requests is None and self.tokens is None
+
+    def _try_grant(self, ticket, cost) -> float:
+        """Grant the ticket if it is at the head and the buckets allow. Hold the lock."""
+        if self._queue[0] != ticket:
+            return ASYNC_POLL_SECONDS
+        now = time.monotonic()
+        wait = max(
+            self.blocked_until - now,
+            self.requests.wait_time(1, now) if self.requests else 0.0,
+            self.tokens.wait_time(cost, now) if self.tokens else 0.0,
+        )
+        if wait > 0:
+            return wait
+
+        if self.requests:
+            self.requests.consume(1)
+        if self.tokens:
+            self.tokens.consume(cost)
+        heapq.heappop(self._queue)
+        self._cond.notify_all()
+        return 0.0
+
+    def _enqueue(self, priority):
+        ticket = (PRIORITIES[priority], next(self._seq))
+        with self._cond:
+            heapq.heappush(self._queue, ticket)
+        return ticket
+
+    def _dequeue(self, ticket):
+        with self._cond:
+            if ticket in self._queue:
+                self._queue.remove(ticket)
+                heapq.heapify(self._queue)
+                self._cond.notify_all()
+
+    def _record(self, priority, waited):
+        with self._cond:
+            self.counters["granted"] += 1
+            self.counters["wait_seconds"] += waited
+            if waited > 0.001:
+                self.counters["queued"] += 1
+            self.by_priority[priority] += 1
+        self.queue_wait.record(waited)
+        if waited > 0.5:
+            print(f"Queued {waited:.2f}s for {self.key} rate limit ({priority})")
+
+    def acquire(self, cost: int, priority: str = None) -> float:
+        """Block until the call may be dispatched. Returns seconds queued."""
+        if self.unlimited:
+            return 0.0
+        priority = priority or current_priority()
+        start = time.monotonic()
+        ticket = self._enqueue(priority)
+        try:
+            with self._cond:
+                while True:
+                    wait = self._try_grant(ticket, cost)
+                    if not wait:
+                        break
+                    self._cond.wait(wait)
+        except BaseException:
+            self._dequeue(ticket)
+            raise
+        waited = time.monotonic() - start
+        self._record(priority, waited)
+        return waited
+
+    async def aacquire(self, cost: int, priority: str = None) -> float:
+        """Async variant of acquire; waits without blocking the event loop."""
+        if self.unlimited:
+            return 0.0
+        priority = priority or current_priority()
+        start = time.monotonic()
+        ticket = self._enqueue(priority)
+        try:
+            while True:
+                with self._cond:
+                    wait = self._try_grant(ticket, cost)
+                if not wait:
+                    break
+                await asyncio.sleep(min(wait, 1.0))
+        except BaseException:
+            self._dequeue(ticket)
+            raise
+        waited = time.monotonic() - start
+        self._record(priority, waited)
+        return waited
+
+    def backoff(self, seconds: float):
+        """Provider returned 429: hold the queue and empty the buckets."""
+        with self._cond:
+            self.blocked_until = max(self.blocked_until, time.monotonic() + seconds)
+            if self.requests:
+                self.requests.drain()
+            if self.tokens:
+                self.tokens.drain()
+            self.counters["backoffs"] += 1
+
+    def stats(self) -> Dict:
+        with self._cond:
+            counters = dict(self.counters)
+            queue_length = len(self._queue)
+            by_priority = dict(self.by_priority)
+        return {
+            "rpm": self.rpm,
+            "tpm": self.tpm,
+            **counters,
+            "queue_length": queue_length,
+            "by_priority": by_priority,
+            "queue_wait_p50": self.queue_wait.quantile(0.50),
+            "queue_wait_p95": self.queue_wait.quantile(0.95),
+        }
+
+
+_limiters = {}
+_limiters_lock = threading.Lock()
+
+
+def get_limiter(llm_type: str, model: str) -> RateLimiter:
+    """Limiter for a provider/model pair, configured from LLM_RPM_* / LLM_TPM_*."""
+    key = f"{llm_type}:{model}"
+    limiter = _limiters.get(key)
+    if limiter is None:
+        with _limiters_lock:
+            limiter = _limiters.get(key)
+            if limiter is None:
+                name = llm_type.upper()
+                limiter = RateLimiter(
+                    key,
+                    rpm=float(os.getenv(f"LLM_RPM_{name}", "0")),
+                    tpm=float(os.getenv(f"LLM_TPM_{name}", "0")),
+                )
+                _limiters[key] = limiter
+    return limiter
+
+
+def rate_limit_stats() -> Dict[str, Dict]:
+    return {key: limiter.stats() for key, limiter in list(_limiters.items()) if not limiter.unlimited}
@@ -0,0 +1,306 @@
+"""
+Per-stage provider routing with hedged requests and failover.
+
+Each pipeline stage has an ordered provider list (LLM_ROUTE_<STAGE>, e.g.
+LLM_ROUTE_GENERATION="openai,claude,groq"). The first provider whose circuit
+breaker allows it is called; if it has not answered by its recent p95
+latency, a hedged request goes to the next provider, and the first good
+answer wins. A failed call immediately fails over to the next provider.
+"""
+import asyncio
+import contextvars
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from typing import Dict, List
+from dotenv import load_dotenv
+
+from core.model import (
+    LLMProviderError,
+    generate_llm_response,
+    agenerate_llm_response,
+    astream_llm_response,
+)
+from core.provider_health import get_health, provider_health_stats
+from core.providers import LLM_TYPES
+
+load_dotenv()
+
+# Stage -> default provider order (single provider = previous behaviour)
+DEFAULT_ROUTES = {
+    "keywords": ["openai_reasoning"],
+    "factors": ["openai_reasoning"],
+    "skill_comparison": ["openai_reasoning"],
+    "generation": ["openai"],
+    "regex_fix": ["openai"],
+    "rewrite": ["openai"],
+}
+
+# Hedge after the provider's p95, but never sooner than the floor. Until a
+# provider has enough samples the default delay applies.
+HEDGE_MIN_SAMPLES = int(os.getenv("LLM_HEDGE_MIN_SAMPLES", "20"))
+HEDGE_DEFAULT_DELAY = float(os.getenv("LLM_HEDGE_DEFAULT_DELAY", "20"))
+HEDGE_MIN_DELAY = float(os.getenv("LLM_HEDGE_MIN_DELAY", "0.5"))
+HEDGE_QUANTILE = float(os.getenv("LLM_HEDGE_QUANTILE", "0.95"))
+
+_executor = ThreadPoolExecutor(
+    max_workers=int(os.getenv("LLM_HEDGE_THREADS", "32")),
+    thread_name_prefix="llm-hedge",
+)
+
+_counters_lock = threading.Lock()
+_counters = {"calls": 0, "hedges": 0, "failovers": 0, "unavailable": 0, "wins": {}}
+
+
+class LLMUnavailableError(LLMProviderError):
+    """Every provider routed for a stage failed or is circuit-broken."""
+
+    def __init__(self, stage, errors):
+        detail = "; ".join(f"{provider}: {error}" for provider, error in errors) or "all providers circuit-broken"
+        super().__init__(stage, f"no provider available ({detail})")
+        self.stage = stage
+        self.errors = errors
+
+
+def route_for(stage: str) -> List[str]:
+    """
+    Ordered provider list for a pipeline stage. Unknown llm types in
+    LLM_ROUTE_<STAGE> are dropped (with a warning); if none are left the
+    default route applies.
+    """
+    configured = os.getenv(f"LLM_ROUTE_{stage.upper()}")
+    if configured:
+        route = []
+        for provider in (p.strip() for p in configured.split(",") if p.strip()):
+            if provider in LLM_TYPES:
+                route.append(provider)
+            else:
+                print(f"Ignoring unknown llm type {provider!r} in LLM_ROUTE_{stage.upper()}")
+        if route:
+            return route
+    return list(DEFAULT_ROUTES.get(stage, ["openai"]))
+
+
+def hedge_delay(llm_type: str) -> float:
+    """Seconds to wait on a provider before hedging to the next one."""
+    histogram = get_health(llm_type).latency
+    if histogram.samples() < HEDGE_MIN_SAMPLES:
+        return HEDGE_DEFAULT_DELAY
+    return max(HEDGE_MIN_DELAY, histogram.quantile(HEDGE_QUANTILE))
+
+
+def _count(name, provider=None):
+    with _counters_lock:
+        if provider:
+            _counters["wins"][provider] = _counters["wins"].get(provider, 0) + 1
+        else:
+            _counters[name] += 1
+
+
+class _Candidates:
+    """Providers for a stage, handed out in order while their breakers allow."""
+
+    def __init__(self, stage):
+        self.remaining = route_for(stage)
+        self.tickets = {}
+
+    def next(self):
+        while self.remaining:
+            provider = self.remaining.pop(0)
+            ticket = get_health(provider).breaker.acquire()
+            if ticket is not None:
+                self.tickets[provider] = ticket
+                return provider
+            print(f"Skipping {provider}: circuit open")
+        return None
+
+    def release(self, provider):
+        """
+        Hand back the provider's breaker ticket once its call has ended. Calls
+        that record no result (cache hits, single-flight followers, cancelled
+        hedge losers) would otherwise hold a half-open trial forever.
+        """
+        get_health(provider).breaker.release(self.tickets.get(provider))
+
+
+def _generate(candidates, provider, *args, **kwargs):
+    try:
+        return generate_llm_response(*args, llm_type=provider, **kwargs)
+    finally:
+        candidates.release(provider)
+
+
+async def _agenerate(candidates, provider, *args, **kwargs):
+    try:
+        return await agenerate_llm_response(*args, llm_type=provider, **kwargs)
+    finally:
+        candidates.release(provider)
+
+
+def route_llm_response(stage, system_prompt, user_prompt, temperature=0.7, max_tokens=500, cache=True):
+    """
+    Generate a completion for a pipeline stage using its provider route,
+    hedging slow calls and failing over on errors.
+    """
+    _count("calls")
+    candidates = _Candidates(stage)
+    pending = {}
+    errors = []
+
+    def launch():
+        provider = candidates.next()
+        if provider is None:
+            return None
+        # Carry the caller's context (rate-limit priority class) into the worker
+        future = _executor.submit(
+            contextvars.copy_context().run, _generate, candidates, provider, system_prompt, user_prompt,
+            temperature=temperature, max_tokens=max_tokens, cache=cache,
+        )
+        pending[future] = provider
+        return provider
+
+    latest = launch()
+    while pending:
+        timeout = hedge_delay(latest) if candidates.remaining else None
+        done, _ = wait(pending, timeout=timeout, return_when=FIRST_COMPLETED)
+
+        if not done:
+            hedged = launch()
+            if hedged:
+                print(f"Hedging {stage}: {latest} slower than {timeout:.2f}s, also trying {hedged}")
+                _count("hedges")
+                latest = hedged
+            continue
+
+        for future in done:
+            provider = pending.pop(future)
+            try:
+                text = future.result()
+            except Exception as e:
+                errors.append((provider, e))
+                continue
+            _count("wins", provider)
+            return text
+
+        if not pending:
+            failover = launch()
+            if failover:
+                _count("failovers")
+                latest = failover
+
+    _count("unavailable")
+    raise LLMUnavailableError(stage, errors)
+
+
+async def aroute_llm_response(stage, system_prompt, user_prompt, temperature=0.7, max_tokens=500, cache=True):
+    """
+    Async variant of route_llm_response. Losing hedged requests are cancelled.
+    """
+    _count("calls")
+    candidates = _Candidates(stage)
+    pending = {}
+    errors = []
+
+    def launch():
+        provider = candidates.next()
+        if provider is None:
+            return None
+        task = asyncio.ensure_future(_agenerate(
+            candidates, provider, system_prompt, user_prompt,
+            temperature=temperature, max_tokens=max_tokens, cache=cache,
+        ))
+        pending[task] = provider
+        return provider
+
+    latest = launch()
+    try:
+        while pending:
+            timeout = hedge_delay(latest) if candidates.remaining else None
+            done, _ = await asyncio.wait(pending, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+
+            if not done:
+                hedged = launch()
+                if hedged:
+                    print(f"Hedging {stage}: {latest} slower than {timeout:.2f}s, also trying {hedged}")
+                    _count("hedges")
+                    latest = hedged
+                continue
+
+            for task in done:
+                provider = pending.pop(task)
+                try:
+                    text = task.result()
+                except asyncio.CancelledError as e:
+                    # A candidate cancelled from elsewhere (e.g. a shared call
+                    # whose callers all left) fails over like any other error
+                    if asyncio.current_task().cancelling():
+                        raise
+                    errors.append((provider, e))
+                    continue
+                except Exception as e:
+                    errors.append((provider, e))
+                    continue
+                _count("wins", provider)
+                return text
+
+            if not pending:
+                failover = launch()
+                if failover:
+                    _count("failovers")
+                    latest = failover
+    finally:
+        # A task cancelled before its first step never runs its own finally
+        for task, provider in pending.items():
+            task.cancel()
+            candidates.release(provider)
+
+    _count("unavailable")
+    raise LLMUnavailableError(stage, errors)
+
+
+async def astream_route_llm_response(stage, system_prompt, user_prompt, temperature=0.7, max_tokens=500, cache=True):
+    """
+    Streaming variant with failover only: if a provider fails before its
+    first token, the next provider in the route is streamed instead.
+    """
+    _count("calls")
+    candidates = _Candidates(stage)
+    errors = []
+
+    provider = candidates.next()
+    while provider:
+        started = False
+        try:
+            async for delta in astream_llm_response(
+                system_prompt, user_prompt,
+                llm_type=provider, temperature=temperature, max_tokens=max_tokens, cache=cache,
+            ):
+                started = True
+                yield delta
+            _count("wins", provider)
+            return
+        except Exception as e:
+            if started:
+                raise
+            errors.append((provider, e))
+        finally:
+            candidates.release(provider)
+
+        provider = candidates.next()
+        if provider:
+            _count("failovers")
+
+    _count("unavailable")
+    raise LLMUnavailableError(stage, errors)
+
+
+def routing_stats() -> Dict:
+    with _counters_lock:
+        counters = {**_counters, "wins": dict(_counters["wins"])}
+    providers = sorted({p for stage in DEFAULT_ROUTES for p in route_for(stage)})
+    return {
+        **counters,
+        "routes": {stage: route_for(stage) for stage in DEFAULT_ROUTES},
+        "hedge_delays": {p: hedge_delay(p) for p in providers},
+        "providers": provider_health_stats(providers),
+    }
@@ -0,0 +1,131 @@
+"""
+Single-flight coalescing of identical in-flight calls.
+
+Concurrent callers asking for the same key wait on one upstream call and all
+share its result (or its exception). Works for threads (do) and asyncio tasks
+(ado); async callers can also join a call started by a thread. A cancelled
+async caller leaves without affecting the others. Thread callers
+never wait on an asyncio leader, since that leader may need the very thread
+they would block.
+"""
+import asyncio
+import threading
+from concurrent.futures import Future
+from typing import Dict
+
+
+class SingleFlight:
+    """Coalesce identical concurrent calls into one execution per key."""
+
+    def __init__(self, name: str):
+        self.name = name
+        self._lock = threading.Lock()
+        self._calls = {}  # key -> (Future, "thread" | "async")
+        self._tasks = {}  # Future -> detached task running an async call
+        self._waiters = {}  # Future -> async callers awaiting it
+        self._counters = {"calls": 0, "executions": 0, "coalesced": 0}
+
+    def _join_or_lead(self, key, kind):
+        """Return (future, is_leader)."""
+        with self._lock:
+            self._counters["calls"] += 1
+            flight = self._calls.get(key)
+
+            if flight is not None and (kind == "async" or flight[1] == "thread"):
+                self._counters["coalesced"] += 1
+                return flight[0], False
+
+            future = Future()
+            if flight is None:
+                self._calls[key] = (future, kind)
+            self._counters["executions"] += 1
+            return future, True
+
+    def _finish(self, key, future):
+        with self._lock:
+            flight = self._calls.get(key)
+            if flight is not None and flight[0] is future:
+                del self._calls[key]
+
+    def do(self, key, fn, *args, **kwargs):
+        """Run fn(*args, **kwargs) once per in-flight key across threads."""
+        future, leader = self._join_or_lead(key, "thread")
+        if not leader:
+            return future.result()
+
+        try:
+            result = fn(*args, **kwargs)
+            future.set_result(result)
+            return result
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        finally:
+            self._finish(key, future)
+
+    async def ado(self, key, coro_fn, *args, **kwargs):
+        """
+        Await coro_fn(*args, **kwargs) once per in-flight key across tasks.
+        The call runs as a detached task that every caller (leader included)
+        awaits through shield, so cancelling one caller never cancels the
+        call for the others; it is cancelled once its last caller has left.
+        """
+        future, leader = self._join_or_lead(key, "async")
+        with self._lock:
+            if leader:
+                self._tasks[future] = asyncio.ensure_future(self._arun(key, future, coro_fn, args, kwargs))
+            self._waiters[future] = self._waiters.get(future, 0) + 1
+
+        cancelled = False
+        try:
+            return await asyncio.shield(asyncio.wrap_future(future))
+        except asyncio.CancelledError:
+            cancelled = True
+            raise
+        finally:
+            self._leave(key, future, cancelled)
+
+    async def _arun(self, key, future, coro_fn, args, kwargs):
+        try:
+            result = await coro_fn(*args, **kwargs)
+        except asyncio.CancelledError:
+            future.cancel()  # every caller has left; nobody awaits the result
+            raise
+        except Exception as e:
+            future.set_exception(e)
+        else:
+            future.set_result(result)
+        finally:
+            self._finish(key, future)
+            with self._lock:
+                self._tasks.pop(future, None)
+
+    def _leave(self, key, future, cancelled):
+        """Drop a waiter; cancel the call if the last waiter was cancelled."""
+        task = None
+        with self._lock:
+            self._waiters[future] -= 1
+            if self._waiters[future]:
+                return
+            del self._waiters[future]
+            if cancelled and not future.done():
+                task = self._tasks.get(future)
+                flight = self._calls.get(key)
+                if task is not None and flight is not None and flight[0] is future:
+                    del self._calls[key]  # no new caller may join a call being cancelled
+        if task is not None:
+            task.cancel()
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            stats = dict(self._counters)
+            stats["in_flight"] = len(self._calls)
+        return stats
+
+
+llm_flight = SingleFlight("llm")
+embedding_flight = SingleFlight("embedding")
+
+
+def singleflight_stats() -> Dict[str, Dict[str, int]]:
+    return {flight.name: flight.stats() for flight in (llm_flight, embedding_flight)}
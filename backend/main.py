@@ -3,11 +3,12 @@ from resume_match.enhance_resume import AIResumeMatcher
 from data.input import resume, jd
 from tqdm import tqdm
 import time
-from fpdf import FPDF
 import re
 
 def text_to_pdf(text, output_filename):
     """Convert text content to PDF file."""
+    from fpdf import FPDF
+
     pdf = FPDF()
     pdf.add_page()
     pdf.set_auto_page_break(auto=True, margin=15)
@@ -1,7 +1,6 @@
 import re
 from typing import List, Dict, Callable
 import numpy as np
-from sklearn.metrics.pairwise import cosine_similarity
 
 
 
@@ -175,6 +174,8 @@ class ATSScorer:
         jd_text: str,
         embed_fn: Callable[[str], List[float]]
     ) -> float:
+        from sklearn.metrics.pairwise import cosine_similarity
+
         r_emb = embed_fn(resume_text)
         jd_emb = embed_fn(jd_text)
 
@@ -193,6 +194,7 @@ class ATSScorer:
         ]        
     
     def semantic_score(self, resume_text, jd_text, embed_fn):
+        from sklearn.metrics.pairwise import cosine_similarity
 
         resume_chunks = self.embed_resume_chunks(self.extract_ats_text(resume_text), embed_fn)
         resume_embs = [embed_fn(c) for c in resume_chunks]
@@ -1,7 +1,6 @@
 import sys
 from pathlib import Path
 import re
-from sklearn.metrics.pairwise import cosine_similarity
 import numpy as np
 from typing import List, Dict
 
@@ -14,11 +13,11 @@ from resume_match.ats_scorer import ATSScorer
 from resume_match.skill_comparison import SkillComparison
 
 from resume_match.observability import init_observability
-# Initialize observability
-init_observability()
 
 class AICompetitor:
     def __init__(self, resume_text, job_description, difficulty_level):
+        # Tracing is set up on first use instead of at import
+        init_observability()
         self.resume_text = resume_text
         self.job_description = job_description
         self.difficulty_level = int(difficulty_level)
@@ -322,6 +321,8 @@ class AICompetitor:
         """
         Extract JD phrases that are semantically distant from the resume.
         """
+        from sklearn.metrics.pairwise import cosine_similarity
+
         jd_sentences = [
             s.strip() for s in re.split(r"[.\n]", jd_text) if len(s.strip()) > 20
         ]
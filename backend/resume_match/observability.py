@@ -1,14 +1,15 @@
-from opentelemetry.sdk import trace as trace_sdk
-from opentelemetry.sdk.trace.export import SimpleSpanProcessor
-from opentelemetry.exporter.otlp.proto.http.trace_exporter import (
-    OTLPSpanExporter as HTTPSpanExporter,
-)
-from openinference.instrumentation.openai import OpenAIInstrumentor
 import os
 from dotenv import load_dotenv
 
+_initialized = False
+
 def init_observability():
-    """Initialize Arize Phoenix observability for OpenAI."""
+    """Initialize Arize Phoenix observability for OpenAI (once per process)."""
+    global _initialized
+    if _initialized:
+        return
+    _initialized = True
+
     # Load environment variables from .env file
     load_dotenv()
     
@@ -19,6 +20,14 @@ def init_observability():
         return
     
     try:
+        # The OTel SDK and exporters are only imported when tracing is enabled
+        from opentelemetry.sdk import trace as trace_sdk
+        from opentelemetry.sdk.trace.export import SimpleSpanProcessor
+        from opentelemetry.exporter.otlp.proto.http.trace_exporter import (
+            OTLPSpanExporter as HTTPSpanExporter,
+        )
+        from openinference.instrumentation.openai import OpenAIInstrumentor
+
         # Set up OpenTelemetry headers with Phoenix API key
         os.environ["OTEL_EXPORTER_OTLP_HEADERS"] = f"api_key={phoenix_api_key}"
         
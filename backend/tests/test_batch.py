@@ -0,0 +1,77 @@
+"""
+Batch runs: only llm types the provider can batch are submitted, the rest
+are called directly, and a failed submission resolves its own requests to
+errors without dropping the other groups.
+
+    python -m unittest tests.test_batch
+"""
+import os
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+sys.path.append(str(Path(__file__).parent.parent))
+
+from core import batch
+from core.batch import LocalBatchProvider, OpenAIBatchProvider, run_batch
+from core.model import LLMProviderError
+
+
+def request(custom_id, llm_type):
+    return {
+        "custom_id": custom_id, "llm_type": llm_type, "cache": False,
+        "system_prompt": "Rewrite", "user_prompt": f"resume {custom_id}",
+    }
+
+
+class RejectingProvider(LocalBatchProvider):
+    """Local provider whose batch endpoint rejects one llm type."""
+
+    def __init__(self, root, rejected):
+        super().__init__(root=root)
+        self.rejected = rejected
+        self.submitted = []
+
+    def submit(self, llm_type, path, endpoint):
+        if llm_type == self.rejected:
+            raise RuntimeError("404 /batches not found")
+        self.submitted.append(llm_type)
+        return super().submit(llm_type, path, endpoint)
+
+
+class RunBatchTest(unittest.TestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.root = tmp.name
+        env = mock.patch.dict(os.environ, {"LLM_BATCH_DIR": tmp.name})
+        env.start()
+        self.addCleanup(env.stop)
+
+    def test_openai_provider_batches_openai_only(self):
+        provider = OpenAIBatchProvider(llm_types=["openai"])
+        self.assertTrue(provider.supports("openai"))
+        self.assertFalse(provider.supports("groq"))
+
+    def test_unsupported_llm_types_are_called_directly(self):
+        provider = RejectingProvider(self.root, rejected=None)
+        provider.supports = lambda llm_type: llm_type == "openai"
+        direct = mock.Mock(return_value="direct answer")
+        with mock.patch.object(batch, "generate_llm_response", direct):
+            results = run_batch([request("a", "openai"), request("b", "groq")], provider=provider, poll_seconds=0)
+        self.assertEqual(provider.submitted, ["openai"])
+        self.assertEqual(results["b"], "direct answer")
+        self.assertEqual(direct.call_args.kwargs["llm_type"], "groq")
+        self.assertEqual(results["a"], "resume a")
+
+    def test_failed_submission_only_fails_its_group(self):
+        provider = RejectingProvider(self.root, rejected="groq")
+        results = run_batch([request("a", "openai"), request("b", "groq")], provider=provider, poll_seconds=0)
+        self.assertEqual(results["a"], "resume a")
+        self.assertIsInstance(results["b"], LLMProviderError)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,47 @@
+"""
+Embedding store: vectors handed out must stay valid after their row is
+evicted and its slot reused, and are float32 whatever the storage dtype.
+
+    python -m unittest tests.test_embedding_store
+"""
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+import numpy as np
+
+sys.path.append(str(Path(__file__).parent.parent))
+
+from core.embedding_store import EmbeddingStore
+
+
+class EmbeddingStoreTest(unittest.TestCase):
+    def make_store(self, **kwargs):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        return EmbeddingStore(tmp.name, **kwargs)
+
+    def test_returned_vector_survives_slot_reuse(self):
+        store = self.make_store(max_vectors=1)
+        store.put("a", [1.0, 0.0, 0.0])
+        vector = store.get("a")
+        store.put("b", [0.0, 1.0, 0.0])  # evicts "a" and overwrites its slot
+        self.assertIsNone(store.get("a"))
+        np.testing.assert_array_equal(vector, [1.0, 0.0, 0.0])
+
+    def test_quantized_rows_come_back_as_unit_float32(self):
+        rng = np.random.default_rng(0)
+        vector = rng.normal(size=64)
+        vector /= np.linalg.norm(vector)
+        for dtype in ("float16", "int8"):
+            store = self.make_store(max_vectors=4, dtype=dtype)
+            store.put("a", vector.tolist())
+            stored = store.get("a")
+            self.assertEqual(stored.dtype, np.float32)
+            self.assertAlmostEqual(float(np.linalg.norm(stored)), 1.0, places=3)
+            self.assertGreater(float(stored @ vector), 0.999)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,47 @@
+"""
+KeywordMatcher counts must match a per-keyword re.findall with word
+boundaries: overlapping keywords are all found, but repeats of one keyword
+never overlap (over_optimization_penalty depends on these counts).
+
+    python -m unittest tests.test_keyword_matcher
+"""
+import random
+import re
+import sys
+import unittest
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).parent.parent))
+
+from app.services.keyword_matcher import KeywordMatcher
+
+
+def findall_counts(keywords, text):
+    return {
+        kw: len(re.findall(rf"(?<!\w){re.escape(kw.strip())}(?!\w)", text, re.I))
+        for kw in keywords
+    }
+
+
+class KeywordMatcherTest(unittest.TestCase):
+    def test_repeats_do_not_overlap(self):
+        self.assertEqual(KeywordMatcher(["a a"]).counts("a a a"), {"a a": 1})
+        self.assertEqual(KeywordMatcher(["++"]).counts("++++"), {"++": 2})
+        self.assertEqual(KeywordMatcher(["c++"]).counts("c++c++"), {"c++": 1})
+
+    def test_nested_keywords_are_counted(self):
+        keywords = ["machine learning", "machine", "learning"]
+        counts = KeywordMatcher(keywords).counts("Machine learning and machine-learning; learning")
+        self.assertEqual(counts, {"machine learning": 1, "machine": 2, "learning": 3})
+
+    def test_matches_findall_on_random_text(self):
+        keywords = ["a", "a a", "a b", "b", "++", "a++", "b a b"]
+        matcher = KeywordMatcher(keywords)
+        rng = random.Random(7)
+        for _ in range(500):
+            text = "".join(rng.choice(["a", "b", " ", "+", "A", "-"]) for _ in range(rng.randint(0, 30)))
+            self.assertEqual(matcher.counts(text), findall_counts(keywords, text), text)
+
+
+if __name__ == "__main__":
+    unittest.main()
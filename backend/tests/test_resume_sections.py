@@ -0,0 +1,73 @@
+"""
+Resume segmenter: which lines open a section (bare headings, "alias:" and
+"Alias Content" lines, but not prose), and the section mentions that
+ATSScorer.detect_sections / structure_score rely on.
+
+    python -m unittest tests.test_resume_sections
+"""
+import sys
+import unittest
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).parent.parent))
+
+from app.services.ats_scorer import ATSScorer
+from app.services.resume_sections import section_text, segment_resume
+
+RESUME = """Jane Doe
+## Summary
+Backend engineer building data platforms.
+
+Skills: Python, Go, Kafka
+
+Experience Acme Corp
+- Built the ingestion pipeline
+Experience with Kafka Streams and Flink
+
+EDUCATION
+BSc Computer Science
+"""
+
+
+class SegmentResumeTest(unittest.TestCase):
+    def setUp(self):
+        self.segments = segment_resume(RESUME)
+        self.names = [s["name"] for s in self.segments["sections"]]
+
+    def test_bare_heading(self):
+        summary = self.segments["sections"][0]
+        self.assertEqual(summary["name"], "SUMMARY")
+        self.assertEqual(summary["heading"], "Summary")
+        self.assertEqual(summary["text"], "Backend engineer building data platforms.")
+
+    def test_inline_content_after_colon(self):
+        self.assertEqual(section_text(self.segments, "SKILLS"), "Python, Go, Kafka")
+
+    def test_capitalised_heading_with_content_vs_prose(self):
+        experience = [s for s in self.segments["sections"] if s["name"] == "PROFESSIONAL EXPERIENCE"]
+        self.assertEqual(len(experience), 1)  # "Experience with Kafka ..." stays in the body
+        self.assertEqual(experience[0]["heading"], "Experience")
+        self.assertEqual(experience[0]["lines"], [
+            "Acme Corp", "- Built the ingestion pipeline", "Experience with Kafka Streams and Flink",
+        ])
+        self.assertEqual(experience[0]["bullets"], ["Built the ingestion pipeline"])
+        self.assertEqual(self.names, ["SUMMARY", "SKILLS", "PROFESSIONAL EXPERIENCE", "EDUCATION"])
+
+    def test_mentions_drive_detect_sections_and_structure_score(self):
+        scorer = ATSScorer()
+        self.assertEqual(
+            scorer.detect_sections(RESUME),
+            {"SUMMARY": True, "SKILLS": True, "PROFESSIONAL EXPERIENCE": True,
+             "EDUCATION": True, "PROJECTS": False, "CERTIFICATIONS": False},
+        )
+        self.assertEqual(scorer.structure_score(RESUME), 0)
+
+        # Mentions count anywhere, not only in headings
+        prose = "Ten years of experience; strong skills in SQL."
+        self.assertEqual(segment_resume(prose)["sections"], [])
+        self.assertEqual(segment_resume(prose)["mentions"], frozenset({"PROFESSIONAL EXPERIENCE", "SKILLS"}))
+        self.assertEqual(scorer.structure_score("Worked on things"), -35)
+
+
+if __name__ == "__main__":
+    unittest.main()
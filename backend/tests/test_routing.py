@@ -0,0 +1,140 @@
+"""
+Circuit breaker + routing: half-open trials must be released on every exit
+path (hedge losers cancelled, cache hits, failures), cancelled hedge losers
+must not cancel calls shared with other requests, and misspelled route
+entries must not reach the providers.
+
+    python -m unittest tests.test_routing
+"""
+import asyncio
+import os
+import sys
+import unittest
+from pathlib import Path
+from unittest import mock
+
+sys.path.append(str(Path(__file__).parent.parent))
+
+from core import provider_health, routing
+from core.provider_health import CircuitBreaker, get_health
+from core.singleflight import SingleFlight
+
+
+def open_then_half_open(provider):
+    """Trip the provider's breaker with a zero cooldown, so the next acquire is a trial."""
+    breaker = get_health(provider).breaker
+    breaker.cooldown = 0
+    for _ in range(breaker.failure_threshold):
+        breaker.record_failure()
+    return breaker
+
+
+class CircuitBreakerTest(unittest.TestCase):
+    def test_release_frees_unrecorded_trial(self):
+        breaker = CircuitBreaker(failure_threshold=1, cooldown=0)
+        breaker.record_failure()
+        ticket = breaker.acquire()
+        self.assertTrue(ticket)
+        self.assertIsNone(breaker.acquire())  # one trial at a time
+        breaker.release(ticket)
+        self.assertEqual(breaker.state, "half_open")
+        self.assertIsNotNone(breaker.acquire())
+
+    def test_stale_release_keeps_newer_trial(self):
+        breaker = CircuitBreaker(failure_threshold=1, cooldown=0)
+        closed_ticket = breaker.acquire()
+        breaker.record_failure()
+        trial = breaker.acquire()
+        breaker.release(closed_ticket)  # a call admitted while closed ends late
+        self.assertIsNone(breaker.acquire())
+        breaker.release(trial)
+        self.assertIsNotNone(breaker.acquire())
+
+
+class RoutingBreakerTest(unittest.TestCase):
+    def setUp(self):
+        provider_health._health.clear()
+        env = mock.patch.dict(os.environ, {"LLM_ROUTE_TEST": "openai,groq"})
+        env.start()
+        self.addCleanup(env.stop)
+        self.addCleanup(provider_health._health.clear)
+
+    def test_cancelled_hedge_loser_releases_half_open_trial(self):
+        breaker = open_then_half_open("openai")
+
+        async def fake_generate(system_prompt, user_prompt, llm_type, **kwargs):
+            if llm_type == "openai":
+                await asyncio.sleep(10)  # slow trial, loses the hedge
+            return f"answer from {llm_type}"
+
+        with mock.patch.object(routing, "agenerate_llm_response", fake_generate), \
+                mock.patch.object(routing, "hedge_delay", lambda provider: 0.01):
+            text = asyncio.run(routing.aroute_llm_response("test", "system", "user"))
+
+        self.assertEqual(text, "answer from groq")
+        self.assertEqual(breaker.state, "half_open")
+        self.assertTrue(breaker.allow())
+
+    def test_cancelled_hedge_loser_keeps_shared_call_for_other_caller(self):
+        flight = SingleFlight("test")
+
+        async def slow_openai():
+            await asyncio.sleep(0.1)
+            return "answer from openai"
+
+        async def fake_generate(system_prompt, user_prompt, llm_type, **kwargs):
+            if llm_type == "openai":
+                return await flight.ado((llm_type, user_prompt), slow_openai)
+            return f"answer from {llm_type}"
+
+        async def main():
+            # Another request is coalesced on the same openai prompt
+            other = asyncio.ensure_future(fake_generate("system", "user", "openai"))
+            await asyncio.sleep(0)
+            routed = await routing.aroute_llm_response("test", "system", "user")
+            return routed, await other
+
+        with mock.patch.object(routing, "agenerate_llm_response", fake_generate), \
+                mock.patch.object(routing, "hedge_delay", lambda provider: 0.01):
+            routed, other = asyncio.run(main())
+
+        self.assertEqual(routed, "answer from groq")
+        self.assertEqual(other, "answer from openai")
+
+    def test_cancelled_candidate_fails_over(self):
+        async def fake_generate(system_prompt, user_prompt, llm_type, **kwargs):
+            if llm_type == "openai":
+                raise asyncio.CancelledError()  # e.g. a shared call cancelled elsewhere
+            return f"answer from {llm_type}"
+
+        with mock.patch.object(routing, "agenerate_llm_response", fake_generate):
+            text = asyncio.run(routing.aroute_llm_response("test", "system", "user"))
+        self.assertEqual(text, "answer from groq")
+
+    def test_cache_hit_releases_half_open_trial(self):
+        breaker = open_then_half_open("openai")
+
+        async def cached_generate(system_prompt, user_prompt, llm_type, **kwargs):
+            return "cached answer"  # served without recording success or failure
+
+        with mock.patch.object(routing, "agenerate_llm_response", cached_generate):
+            self.assertEqual(asyncio.run(routing.aroute_llm_response("test", "s", "u")), "cached answer")
+        self.assertTrue(breaker.allow())
+
+        with mock.patch.object(routing, "generate_llm_response", lambda *a, **k: "cached answer"):
+            self.assertEqual(routing.route_llm_response("test", "s", "u"), "cached answer")
+        self.assertTrue(breaker.allow())
+
+
+class RouteValidationTest(unittest.TestCase):
+    def test_unknown_llm_types_are_dropped(self):
+        with mock.patch.dict(os.environ, {"LLM_ROUTE_GENERATION": "opneai, groq"}):
+            self.assertEqual(routing.route_for("generation"), ["groq"])
+
+    def test_all_unknown_falls_back_to_default(self):
+        with mock.patch.dict(os.environ, {"LLM_ROUTE_GENERATION": "opneai"}):
+            self.assertEqual(routing.route_for("generation"), routing.DEFAULT_ROUTES["generation"])
+
+
+if __name__ == "__main__":
+    unittest.main()
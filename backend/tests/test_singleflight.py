@@ -0,0 +1,82 @@
+"""
+Single-flight coalescing: cancelling one async caller (the leader included)
+must not cancel the shared call for the others.
+
+    python -m unittest tests.test_singleflight
+"""
+import asyncio
+import sys
+import unittest
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).parent.parent))
+
+from core.singleflight import SingleFlight
+
+
+class SingleFlightCancelTest(unittest.TestCase):
+    def test_cancelled_leader_keeps_call_for_follower(self):
+        flight = SingleFlight("test")
+        executions = []
+
+        async def upstream():
+            executions.append(1)
+            await asyncio.sleep(0.05)
+            return "answer"
+
+        async def main():
+            leader = asyncio.ensure_future(flight.ado("k", upstream))
+            await asyncio.sleep(0.01)
+            follower = asyncio.ensure_future(flight.ado("k", upstream))
+            await asyncio.sleep(0.01)
+            leader.cancel()
+            with self.assertRaises(asyncio.CancelledError):
+                await leader
+            return await follower
+
+        self.assertEqual(asyncio.run(main()), "answer")
+        self.assertEqual(len(executions), 1)
+        self.assertEqual(flight.stats()["in_flight"], 0)
+
+    def test_call_is_cancelled_when_every_caller_left(self):
+        flight = SingleFlight("test")
+        finished = []
+
+        async def upstream():
+            await asyncio.sleep(10)
+            finished.append(1)
+
+        async def main():
+            callers = [asyncio.ensure_future(flight.ado("k", upstream)) for _ in range(2)]
+            await asyncio.sleep(0.01)
+            for caller in callers:
+                caller.cancel()
+            await asyncio.gather(*callers, return_exceptions=True)
+            await asyncio.sleep(0.01)
+            self.assertEqual(flight.stats()["in_flight"], 0)
+            # A new call with the same key starts a fresh execution
+            async def fresh():
+                return "fresh"
+            return await flight.ado("k", fresh)
+
+        self.assertEqual(asyncio.run(main()), "fresh")
+        self.assertEqual(finished, [])
+
+    def test_exception_reaches_every_caller(self):
+        flight = SingleFlight("test")
+
+        async def upstream():
+            await asyncio.sleep(0.01)
+            raise ValueError("boom")
+
+        async def main():
+            return await asyncio.gather(
+                flight.ado("k", upstream), flight.ado("k", upstream), return_exceptions=True
+            )
+
+        results = asyncio.run(main())
+        self.assertTrue(all(isinstance(r, ValueError) for r in results))
+
+
+if __name__ == "__main__":
+    unittest.main()
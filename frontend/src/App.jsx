@@ -1,10 +1,26 @@
 import { useState } from 'react';
-import { analyzeResume } from './services/api';
+import { analyzeResumeStream } from './services/api';
 import UploadSection from './components/UploadSection';
 import ResultsSection from './components/ResultsSection';
 import EnhancedResume from './components/EnhancedResume';
 import { Loader2, FileCheck } from 'lucide-react';
 
+const STAGE_LABELS = {
+  parsing: () => 'Parsing resume...',
+  keyword_extraction: () => 'Extracting ATS keywords...',
+  factors: () => 'Identifying key factors...',
+  generation: () => 'Generating enhanced resume...',
+  regex_fix: () => 'Fixing ATS formatting issues...',
+  scoring: (data) => `Scoring attempt ${data.attempt}...`,
+  rewrite: () => 'Closing semantic gaps...',
+  skill_comparison: () => 'Comparing skills...',
+  final_scoring: () => 'Computing final ATS score...',
+  analysis: () => 'Preparing recommendations...',
+};
+
+// Stages that stream a fresh resume draft
+const RESUME_STAGES = ['generation', 'regex_fix', 'rewrite'];
+
 function App() {
   const [resumeFile, setResumeFile] = useState(null);
   const [fileName, setFileName] = useState('');
@@ -12,6 +28,8 @@ function App() {
   const [results, setResults] = useState(null);
   const [loading, setLoading] = useState(false);
   const [error, setError] = useState('');
+  const [stage, setStage] = useState('');
+  const [streamedResume, setStreamedResume] = useState('');
 
   const handleFileChange = (e) => {
     const file = e.target.files[0];
@@ -41,9 +59,20 @@ function App() {
     setLoading(true);
     setError('');
     setResults(null);
+    setStage('');
+    setStreamedResume('');
+
+    const handleStreamEvent = (eventName, data) => {
+      if (eventName === 'stage') {
+        setStage(STAGE_LABELS[data.stage]?.(data) || data.stage);
+        if (RESUME_STAGES.includes(data.stage)) setStreamedResume('');
+      } else if (eventName === 'token') {
+        setStreamedResume((prev) => prev + data.text);
+      }
+    };
 
     try {
-      const analysisResults = await analyzeResume(resumeFile, jobDescription);
+      const analysisResults = await analyzeResumeStream(resumeFile, jobDescription, handleStreamEvent);
       setResults(analysisResults);
     } catch (err) {
       setError(err.message || 'An error occurred during analysis');
@@ -132,8 +161,13 @@ function App() {
             {loading && (
               <div className="card flex flex-col items-center justify-center py-12 mt-6">
                 <Loader2 className="w-16 h-16 text-primary-600 animate-spin mb-4" />
-                <p className="text-lg font-medium text-gray-700">Analyzing your resume...</p>
+                <p className="text-lg font-medium text-gray-700">{stage || 'Analyzing your resume...'}</p>
                 <p className="text-sm text-gray-500 mt-2">This may take a few moments</p>
+                {streamedResume && (
+                  <pre className="mt-6 w-full max-h-96 overflow-y-auto whitespace-pre-wrap text-sm text-gray-800 bg-gray-50 p-4 rounded-lg">
+                    {streamedResume}
+                  </pre>
+                )}
               </div>
             )}
           </div>
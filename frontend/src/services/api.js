@@ -28,6 +28,60 @@ export const analyzeResume = async (resumeFile, jobDescription) => {
   }
 };
 
+// Streams /api/analyze/stream (Server-Sent Events over a POST body).
+// onEvent(eventName, data) is called for every stage/token/score event;
+// resolves with the final result payload.
+export const analyzeResumeStream = async (resumeFile, jobDescription, onEvent) => {
+  const formData = new FormData();
+  formData.append('resume', resumeFile);
+  formData.append('job_description', jobDescription);
+
+  let response;
+  try {
+    response = await fetch(`${API_BASE_URL}/api/analyze/stream`, {
+      method: 'POST',
+      body: formData,
+    });
+  } catch (error) {
+    throw new Error('No response from server. Please ensure the backend is running.');
+  }
+
+  if (!response.ok) {
+    const body = await response.json().catch(() => ({}));
+    throw new Error(body.detail || 'Analysis failed');
+  }
+
+  const reader = response.body.getReader();
+  const decoder = new TextDecoder();
+  let buffer = '';
+
+  while (true) {
+    const { done, value } = await reader.read();
+    if (done) break;
+    buffer += decoder.decode(value, { stream: true });
+
+    let boundary;
+    while ((boundary = buffer.indexOf('\n\n')) !== -1) {
+      const raw = buffer.slice(0, boundary);
+      buffer = buffer.slice(boundary + 2);
+
+      let eventName = 'message';
+      let data = '';
+      for (const line of raw.split('\n')) {
+        if (line.startsWith('event:')) eventName = line.slice(6).trim();
+        else if (line.startsWith('data:')) data += line.slice(5).trim();
+      }
+      const payload = data ? JSON.parse(data) : null;
+
+      if (eventName === 'result') return payload;
+      if (eventName === 'error') throw new Error(payload?.detail || 'Analysis failed');
+      onEvent?.(eventName, payload);
+    }
+  }
+
+  throw new Error('Analysis stream ended unexpectedly');
+};
+
 export const checkHealth = async () => {
   try {
     const response = await api.get('/api/health');